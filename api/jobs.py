@@ -0,0 +1,116 @@
+"""Bulk generation jobs: submit a CSV, follow per-row progress, download a ZIP of the PDFs."""
+import asyncio
+import io
+import itertools
+import json
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.jobs import BulkJob, JobRunningError, get_job_manager
+from core.llm_providers import is_provider_configured
+from core.normalizer import iter_csv_batches
+from templates.registry import DEFAULT_TEMPLATE_ID
+from config.settings import settings
+
+router = APIRouter()
+
+
+async def submit_csv_job(file: UploadFile, template_id: str) -> BulkJob:
+    """
+    Start a job for the rows of an uploaded CSV (held in memory, parsed as the job runs).
+
+    Rows after the first chunk that fail to parse fail the job, not the request.
+    """
+    # Fail the request up front rather than every row of the job
+    if not is_provider_configured():
+        raise HTTPException(status_code=500, detail=f"{settings.llm_provider} API key not configured")
+
+    content = await file.read()
+    # The first chunk is parsed up front so unreadable files are rejected here;
+    # the job reads the remaining rows as it runs
+    batches = iter_csv_batches(io.BytesIO(content))
+    try:
+        first = await asyncio.to_thread(next, batches, None)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV: {e}")
+    if not first:
+        raise HTTPException(status_code=400, detail="No valid products found in CSV")
+    briefs = itertools.chain(first, itertools.chain.from_iterable(batches))
+    return await get_job_manager().submit(briefs, template_id)
+
+
+async def _get_job(job_id: str) -> BulkJob:
+    job = await get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def zip_response(job: BulkJob) -> StreamingResponse:
+    """Stream the job's ZIP; entries are sent as their PDFs finish."""
+    filename = f"onepagers_{job.id[:8]}.zip"
+    return StreamingResponse(
+        job.stream_zip(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@router.post("/api/jobs", status_code=202, tags=["Jobs"])
+async def create_job(file: UploadFile = File(...), template_id: str = Form(DEFAULT_TEMPLATE_ID)):
+    """
+    Start generating onepagers for every row of a CSV in the background.
+
+    A `template_id` column overrides the template per row.
+    """
+    job = await submit_csv_job(file, template_id)
+    return {
+        **job.summary(),
+        "status_url": f"/api/jobs/{job.id}",
+        "events_url": f"/api/jobs/{job.id}/events",
+        "download_url": f"/api/jobs/{job.id}/download",
+    }
+
+
+@router.get("/api/jobs/{job_id}", tags=["Jobs"])
+async def get_job(job_id: str):
+    """Job status with per-row progress (poll this, or subscribe to /events)."""
+    return (await _get_job(job_id)).summary(include_rows=True)
+
+
+@router.post("/api/jobs/{job_id}/resume", status_code=202, tags=["Jobs"])
+async def resume_job(job_id: str):
+    """
+    Run a stopped job again: failed rows and rows without a PDF are processed,
+    finished rows are kept (also for jobs interrupted by a server restart).
+    """
+    try:
+        job = await get_job_manager().resume(job_id)
+    except JobRunningError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.summary()
+
+
+@router.get("/api/jobs/{job_id}/events", tags=["Jobs"])
+async def job_events(job_id: str):
+    """Server-sent events: one `row` event per finished row, then a final `job` event."""
+    job = await _get_job(job_id)
+
+    async def _events():
+        async for event in job.follow():
+            yield f"event: row\ndata: {json.dumps(event['row'])}\n\n"
+        yield f"event: job\ndata: {json.dumps(job.summary())}\n\n"
+
+    return StreamingResponse(_events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.get("/api/jobs/{job_id}/download", tags=["Jobs"])
+async def download_job(job_id: str):
+    """ZIP of every PDF of the job, streamed while the job is still running."""
+    return zip_response(await _get_job(job_id))
@@ -9,25 +9,16 @@ import sys
 from pathlib import Path
 import tempfile
 import os
-import requests
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.normalizer import normalize_csv
-from core.copy_generator import generate_copy
-from core.renderer import render_pdf
-from core.qc_engine import check_quality
-from templates.template_01_minimal import Template01Minimal
-from templates.template_02_modern import Template02Modern
-from templates.template_03_dense import Template03Dense
-from templates.template_04_corporate import Template04Corporate
-from templates.template_05_creative import Template05Creative
-from templates.template_06_tech import Template06Tech
-from templates.template_07_elegant import Template07Elegant
-from templates.template_08_bold import Template08Bold
-from templates.template_09_minimalist import Template09Minimalist
-from templates.template_10_showcase import Template10Showcase
+from core.copy_generator import generate_copy_checked_async
+from core.llm_providers import close_providers, is_provider_configured
+from core.render_service import get_render_service
+from core.qc_engine import merge_layout_checks
+from templates.registry import DEFAULT_TEMPLATE_ID, get_template, get_template_classes
+from api.jobs import submit_csv_job, zip_response
 from models.product_brief import ProductBrief, ProductType, TargetAudience
 from config.settings import settings
 
@@ -50,6 +41,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],  # The frontend revalidates previews with If-None-Match
 )
 
 
@@ -80,6 +72,8 @@ class HealthResponse(BaseModel):
     status: str
     api_version: str
     gemini_configured: bool
+    llm_provider: str
+    llm_configured: bool
 
 
 @app.get("/", tags=["Root"])
@@ -98,74 +92,23 @@ async def health_check():
     return {
         "status": "healthy",
         "api_version": "1.0.0",
-        "gemini_configured": bool(settings.google_api_key)
+        "gemini_configured": bool(settings.google_api_key),
+        "llm_provider": settings.llm_provider,
+        "llm_configured": is_provider_configured()
     }
 
 
 @app.post("/api/generate/from-csv", tags=["Generation"])
-async def generate_from_csv(file: UploadFile = File(...)):
+async def generate_from_csv(file: UploadFile = File(...), template_id: str = Form(DEFAULT_TEMPLATE_ID)):
     """
     Generate onepagers from uploaded CSV file.
     
-    Returns a ZIP file with all generated PDFs.
+    Returns a ZIP file with all generated PDFs, streamed as they are rendered.
+    A `template_id` column selects the template per row. Rows that fail are
+    listed in the ZIP's manifest.json. For progress reporting use /api/jobs.
     """
-    try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
-        
-        # Normalize CSV
-        briefs = normalize_csv(tmp_path)
-        
-        if not briefs:
-            raise HTTPException(status_code=400, detail="No valid products found in CSV")
-        
-        # Generate PDFs (default to template_01, can be enhanced to read from CSV)
-        template = Template01Minimal()  # TODO: Add template selection from CSV
-        pdf_files = []
-        
-        for brief in briefs:
-            try:
-                # Generate copy
-                slot_limits = template.get_slot_limits()
-                copy = generate_copy(brief, slot_limits)
-                
-                # Generate PDF
-                pdf_bytes = render_pdf(template, copy, brief.name)
-                
-                # Save to temp file
-                pdf_filename = f"{brief.product_id}_{template.template_id}_{brief.language}.pdf"
-                pdf_path = os.path.join(tempfile.gettempdir(), pdf_filename)
-                with open(pdf_path, "wb") as f:
-                    f.write(pdf_bytes)
-                
-                pdf_files.append((pdf_path, pdf_filename))
-                
-            except Exception as e:
-                # Continue with other products if one fails
-                continue
-        
-        # Cleanup CSV temp file
-        os.unlink(tmp_path)
-        
-        if not pdf_files:
-            raise HTTPException(status_code=500, detail="Failed to generate any PDFs")
-        
-        # For now, return first PDF (we'll add ZIP support later)
-        # TODO: Create ZIP file with all PDFs
-        pdf_path, pdf_filename = pdf_files[0]
-        
-        return FileResponse(
-            pdf_path,
-            media_type="application/pdf",
-            filename=pdf_filename,
-            headers={"Content-Disposition": f"attachment; filename={pdf_filename}"}
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    job = await submit_csv_job(file, template_id)
+    return zip_response(job)
 
 
 @app.post("/api/generate/from-json", response_model=GenerationResponse, tags=["Generation"])
@@ -177,8 +120,8 @@ async def generate_from_json(product: ProductInput):
     """
     try:
         # Validate API key
-        if not settings.google_api_key:
-            raise HTTPException(status_code=500, detail="Gemini API key not configured")
+        if not is_provider_configured():
+            raise HTTPException(status_code=500, detail=f"{settings.llm_provider} API key not configured")
         
         # Create ProductBrief
         brief = ProductBrief(
@@ -196,15 +139,12 @@ async def generate_from_json(product: ProductInput):
         # Select template
         template = get_template(product.template_id)
         
-        # Generate copy
-        slot_limits = template.get_slot_limits()
-        copy = generate_copy(brief, slot_limits)
-        
-        # Quality control
-        qc_result = check_quality(template, copy)
+        # Generate copy and run quality control (failed slots are retried on the quality model)
+        copy, qc_result = await generate_copy_checked_async(brief, template)
         
-        # Generate PDF
-        pdf_bytes = render_pdf(template, copy, brief.name)
+        # Generate PDF; layout QC runs on the same layout pass
+        pdf_bytes, layout_checks = await get_render_service().render_checked(template, copy, brief.name)
+        qc_result = merge_layout_checks(qc_result, layout_checks)
         
         # Save to temp file
         filename = f"{brief.product_id}_{template.template_id}_{brief.language}.pdf"
@@ -329,27 +269,25 @@ async def get_templates():
     }
 
 
-def get_template(template_id: str):
-    """Get template instance by ID."""
-    templates = {
-        "template_01": Template01Minimal,
-        "template_02": Template02Modern,
-        "template_03": Template03Dense,
-        "template_04": Template04Corporate,
-        "template_05": Template05Creative,
-        "template_06": Template06Tech,
-        "template_07": Template07Elegant,
-        "template_08": Template08Bold,
-        "template_09": Template09Minimalist,
-        "template_10": Template10Showcase,
-    }
-    template_class = templates.get(template_id, Template01Minimal)
-    return template_class()
+@app.on_event("startup")
+def start_render_service():
+    """Spawn the render workers with every template's stylesheet and fonts preloaded."""
+    get_render_service(get_template_classes()).start()
+
+
+@app.on_event("shutdown")
+def stop_render_service():
+    get_render_service().shutdown()
+
+
+@app.on_event("shutdown")
+async def close_llm_providers():
+    await close_providers()
 
 
 # Web Scraping endpoint
-from core.web_scraper import scrape_product_data
-from core.variant_generator import generate_variant_headlines, reorder_features_for_variant
+from core.web_scraper import scrape_product_data_async
+from core.variant_generator import generate_variant_headlines_async, reorder_features_for_variant
 from pydantic import HttpUrl
 
 
@@ -380,15 +318,15 @@ class VariantGenerationResponse(BaseModel):
 @app.post("/api/scrape", response_model=ScrapeResponse, tags=["Scraping"])
 async def scrape_website(request: ScrapeRequest):
     """
-    Scrape product data from a website URL using Gemini API.
+    Scrape product data from a website URL using the configured LLM.
     
-    Fetches webpage content and uses Gemini to extract structured product information.
+    Fetches webpage content and uses the LLM to extract structured product information.
     """
     try:
-        if not settings.google_api_key:
-            raise HTTPException(status_code=500, detail="Gemini API key not configured")
+        if not is_provider_configured():
+            raise HTTPException(status_code=500, detail=f"{settings.llm_provider} API key not configured")
         
-        scraped_data = scrape_product_data(request.url)
+        scraped_data = await scrape_product_data_async(request.url)
         
         return ScrapeResponse(
             success=True,
@@ -414,11 +352,11 @@ async def generate_variants(request: VariantGenerationRequest):
     Generate 3 truly different variants with unique headlines, taglines, and feature ordering.
     """
     try:
-        if not settings.google_api_key:
-            raise HTTPException(status_code=500, detail="Gemini API key not configured")
+        if not is_provider_configured():
+            raise HTTPException(status_code=500, detail=f"{settings.llm_provider} API key not configured")
         
         # Generate different headlines/taglines using AI
-        variant_data = generate_variant_headlines(
+        variant_data = await generate_variant_headlines_async(
             request.productName,
             request.description,
             request.audience,
@@ -459,9 +397,20 @@ async def generate_variants(request: VariantGenerationRequest):
 
 
 # Include preview router
-from api.preview import router as preview_router
+from api.preview import router as preview_router, warm_previews
 app.include_router(preview_router)
 
+# Include bulk job router
+from api.jobs import router as jobs_router
+app.include_router(jobs_router)
+
+
+@app.on_event("startup")
+def warm_template_previews():
+    """Render every template's default preview so the gallery is served from memory."""
+    warm_previews()
+
+
 # Include auth router
 from api.auth import router as auth_router
 app.include_router(auth_router)
@@ -485,6 +434,8 @@ async def get_postermywall_templates(request: PosterMyWallTemplatesRequest):
     Proxy endpoint to fetch templates from PosterMyWall API.
     This bypasses CORS restrictions by calling the API from the backend.
     """
+    import requests
+    
     try:
         # Get API key from environment or settings
         api_key = (
@@ -1,71 +1,156 @@
 """Template preview generation for frontend."""
-from fastapi import APIRouter, HTTPException
+import asyncio
+import gzip
+import json
+import threading
+from collections import OrderedDict
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional, Tuple
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from templates.base import BaseTemplate
+from core.copy_cache import make_cache_key
 from core.copy_generator import CopySlots
-from templates.template_01_minimal import Template01Minimal
-from templates.template_02_modern import Template02Modern
-from templates.template_03_dense import Template03Dense
-from templates.template_04_corporate import Template04Corporate
-from templates.template_05_creative import Template05Creative
-from templates.template_06_tech import Template06Tech
-from templates.template_07_elegant import Template07Elegant
-from templates.template_08_bold import Template08Bold
-from templates.template_09_minimalist import Template09Minimalist
-from templates.template_10_showcase import Template10Showcase
-
-def get_template(template_id: str):
-    """Get template instance by ID."""
-    templates = {
-        "template_01": Template01Minimal,
-        "template_02": Template02Modern,
-        "template_03": Template03Dense,
-        "template_04": Template04Corporate,
-        "template_05": Template05Creative,
-        "template_06": Template06Tech,
-        "template_07": Template07Elegant,
-        "template_08": Template08Bold,
-        "template_09": Template09Minimalist,
-        "template_10": Template10Showcase,
-    }
-    template_class = templates.get(template_id, Template01Minimal)
-    return template_class()
+from templates.registry import get_template, template_ids
+from config.settings import settings
 
 router = APIRouter()
 
+SAMPLE_COPY = {
+    "title": "Sample Product Title",
+    "intro": "This is a sample introduction text to show how the template looks. It demonstrates the layout and styling.",
+    "usp_1": "Key Feature One",
+    "usp_2": "Key Feature Two",
+    "usp_3": "Key Feature Three",
+    "usp_4": None,
+    "usp_5": None,
+}
+
+# Bodies smaller than this are sent uncompressed
+GZIP_MIN_SIZE = 1024
+
+# (template_id, sample digest) -> (response body, gzipped body or None, ETag), least recently used first
+_previews: "OrderedDict[Tuple[str, str], Tuple[bytes, Optional[bytes], str]]" = OrderedDict()
+_previews_lock = threading.Lock()
+
 
 class PreviewRequest(BaseModel):
     template_id: str
     sample_data: Optional[dict] = None
 
 
-@router.post("/api/templates/preview", tags=["Templates"])
-async def generate_preview(request: PreviewRequest):
-    """Generate a preview HTML for a template."""
+def _sample_copy(sample_data: Optional[dict]) -> Dict[str, Optional[str]]:
+    """Sample copy with the caller's values for known slots."""
+    sample_data = sample_data or {}
+    return {slot: sample_data.get(slot, default) for slot, default in SAMPLE_COPY.items()}
+
+
+def _render_preview(template_id: str, sample_data: Optional[dict]) -> Tuple[bytes, Optional[bytes], str]:
+    """
+    JSON body, gzipped body and strong ETag of a preview, memoized by template and sample digest.
+    
+    The body is compressed once, when it is memoized; small bodies are not
+    compressed (None). The ETag covers the template version, so it changes
+    when the markup does.
+    """
+    from core.renderer import template_version
+    
+    template = get_template(template_id)
+    copy_data = _sample_copy(sample_data)
+    digest = make_cache_key(copy_data)
+    key = (template_id, digest)
+    with _previews_lock:
+        cached = _previews.get(key)
+        if cached is not None:
+            _previews.move_to_end(key)
+            return cached
+    
+    html = template.render_html(CopySlots(**copy_data), "Sample Product")
+    body = json.dumps({"html": html, "template_id": template_id}).encode("utf-8")
+    gzipped = gzip.compress(body) if len(body) >= GZIP_MIN_SIZE else None
+    etag = f'"{make_cache_key(template.template_id, template_version(template), digest)[:32]}"'
+    with _previews_lock:
+        _previews[key] = (body, gzipped, etag)
+        while len(_previews) > settings.preview_cache_size:
+            _previews.popitem(last=False)
+    return body, gzipped, etag
+
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header allows gzip (a q=0 weight refuses it)."""
+    for coding in (accept_encoding or "").split(","):
+        name, *params = [part.strip().lower() for part in coding.split(";")]
+        if name not in ("gzip", "*"):
+            continue
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    return float(param[2:]) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+async def _preview_response(request: Request, template_id: str, sample_data: Optional[dict], cache_control: str) -> Response:
     try:
-        template = get_template(request.template_id)
-        
-        # Use sample data or defaults
-        sample_copy = CopySlots(
-            title=request.sample_data.get("title", "Sample Product Title") if request.sample_data else "Sample Product Title",
-            intro=request.sample_data.get("intro", "This is a sample introduction text to show how the template looks. It demonstrates the layout and styling.") if request.sample_data else "This is a sample introduction text to show how the template looks. It demonstrates the layout and styling.",
-            usp_1=request.sample_data.get("usp_1", "Key Feature One") if request.sample_data else "Key Feature One",
-            usp_2=request.sample_data.get("usp_2", "Key Feature Two") if request.sample_data else "Key Feature Two",
-            usp_3=request.sample_data.get("usp_3", "Key Feature Three") if request.sample_data else "Key Feature Three",
-            usp_4=request.sample_data.get("usp_4", None) if request.sample_data else None,
-            usp_5=request.sample_data.get("usp_5", None) if request.sample_data else None
-        )
-        
-        html = template.render_html(sample_copy, "Sample Product")
-        
-        return {"html": html, "template_id": request.template_id}
-        
+        # Templates with feature images draw them on a miss; keep that off the event loop
+        body, gzipped, etag = await asyncio.to_thread(_render_preview, template_id, sample_data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if gzipped is not None and _accepts_gzip(request.headers.get("accept-encoding")):
+        # Strong ETags are per representation, so the gzipped body has its own
+        body = gzipped
+        etag = f'{etag[:-1]}-gzip"'
+        headers["Content-Encoding"] = "gzip"
+    headers["ETag"] = etag
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def warm_previews() -> int:
+    """Render the default preview of every template (the gallery page); returns the count."""
+    for template_id in template_ids():
+        _render_preview(template_id, None)
+    return len(template_ids())
 
+
+@router.post("/api/templates/preview", tags=["Templates"])
+async def generate_preview(preview: PreviewRequest, request: Request):
+    """Generate a preview HTML for a template (answers If-None-Match with 304)."""
+    return await _preview_response(request, preview.template_id, preview.sample_data, "no-cache")
+
+
+@router.get("/api/templates/{template_id}/preview", tags=["Templates"])
+async def get_preview(
+    template_id: str,
+    request: Request,
+    title: Optional[str] = None,
+    intro: Optional[str] = None,
+    usp_1: Optional[str] = None,
+    usp_2: Optional[str] = None,
+    usp_3: Optional[str] = None,
+    usp_4: Optional[str] = None,
+    usp_5: Optional[str] = None,
+):
+    """Cacheable preview: sample copy comes from query parameters; omitted slots use the defaults."""
+    given = {
+        "title": title, "intro": intro,
+        "usp_1": usp_1, "usp_2": usp_2, "usp_3": usp_3, "usp_4": usp_4, "usp_5": usp_5,
+    }
+    sample_data = {slot: value for slot, value in given.items() if value is not None}
+    return await _preview_response(request, template_id, sample_data, f"public, max-age={settings.preview_max_age}")
@@ -17,20 +17,45 @@ class Settings(BaseSettings):
     
     # LLM Model Selection
     gemini_model: str = "gemini-2.5-pro"  # Options: gemini-2.5-pro, gemini-2.5-flash
+    gemini_fast_model: str = "gemini-2.5-flash"  # Fast tier for short slots (see model routing)
     openai_model: str = "gpt-4-turbo-preview"
     anthropic_model: str = "claude-3-opus-20240229"
     
     # Default LLM Provider (gemini, openai, anthropic)
+    # Offline stand-ins for load/regression testing: synthetic, replay, record, http
     llm_provider: str = "gemini"
     
+    # Offline LLM stand-ins (see core/llm_offline.py)
+    llm_fixture_dir: str = "./data/llm_fixtures"
+    llm_synthetic_latency: str = "0"  # e.g. fixed:0.2, uniform:0.1,0.8, lognormal:-0.7,0.5
+    llm_synthetic_seed: int = 0
+    llm_replay_miss: str = "error"  # error or synthetic
+    llm_record_provider: str = "gemini"
+    llm_standin_url: str = "http://127.0.0.1:8765"
+    
     # Generation Settings
     default_language: str = "en"
     default_template: str = "template_01"
     max_variants: int = 3
+    copy_generation_mode: str = "structured"  # Options: structured (one JSON call), per_slot
+    # Derive max output tokens from slot limits (per-slot calls also get stop sequences;
+    # JSON calls rely on the token cap and the text fitter)
+    slot_output_limits_enabled: bool = True
+    chars_per_token: float = 3.5
+    # Extra output tokens per call on top of the slot-derived budget
+    llm_output_token_headroom: int = 16
+    # Model name prefixes of thinking models; their reasoning counts toward the output
+    # cap, so they get llm_thinking_token_budget on top of the answer budget
+    llm_thinking_models: str = "gemini-2.5,gemini-3,o1,o3,o4,gpt-5"
+    llm_thinking_token_budget: int = 2048
     variant_generation_enabled: bool = True
     
     # Quality Control
-    min_font_size: int = 10
+    min_font_size: int = 10  # pt, checked on the laid-out document
+    max_pages: int = 1
+    text_fit_enabled: bool = True  # Predict overflow from font metrics in QC; trim what escalation cannot fit
+    text_metrics_font: str = ""  # TTF/OTF used when none of a slot's font families is installed; searched in common font dirs if empty
+    layout_qc_enabled: bool = True  # Page count / overflow / font size checks on the rendered layout
     qc_auto_fix_enabled: bool = True
     qc_max_iterations: int = 3
     qc_strict_mode: bool = False
@@ -55,7 +80,63 @@ class Settings(BaseSettings):
     # Performance
     cache_enabled: bool = True
     cache_ttl: int = 3600
+    cache_dir: str = "./data/cache"
+    cache_max_entries: int = 50000
     batch_size: int = 10
+    csv_chunk_size: int = 10000  # CSV rows parsed at a time (bounds normalizer memory)
+    
+    # Pipeline (copy -> QC -> render stages connected by bounded queues)
+    pipeline_copy_concurrency: int = 4  # LLM batch requests in flight
+    pipeline_qc_concurrency: int = 8  # products in QC (escalation calls the LLM)
+    pipeline_render_concurrency: int = 0  # renders in flight; 0 = render workers
+    pipeline_queue_size: int = 64  # products buffered between two stages
+    
+    # Render service (worker processes for PDF rendering)
+    render_pool_enabled: bool = True  # False renders in a thread of the calling process
+    render_workers: int = 0  # 0 = one per CPU core
+    render_max_pending: int = 0  # queued + running jobs; 0 = 4 per worker
+    
+    # Rendered PDF cache (LRU under a byte budget)
+    render_cache_enabled: bool = True
+    render_cache_dir: str = "./data/cache/renders"
+    render_cache_max_bytes: int = 512 * 1024 * 1024
+    
+    # Template previews (HTML for the frontend gallery)
+    preview_cache_size: int = 512  # rendered previews kept in memory
+    preview_max_age: int = 3600  # Cache-Control max-age of GET previews, seconds
+    
+    # Batch runs (CLI runs and API jobs are recorded here and can be resumed)
+    run_store_path: str = "./data/runs/runs.sqlite3"
+    
+    # Bulk generation jobs (API)
+    bulk_job_ttl: int = 3600  # seconds a finished job and its PDFs stay downloadable
+    job_output_dir: str = "./data/runs/jobs"  # PDFs of API jobs, one directory per job
+    
+    # Asset store (remote images are prefetched here; renders never use the network)
+    asset_store_dir: str = "./data/assets"
+    asset_prefetch_enabled: bool = True
+    asset_fetch_timeout: float = 10.0
+    image_cache_dir: str = "./data/assets/images"  # Locally drawn feature images
+    
+    # Model routing between fast and quality tiers
+    model_routing_enabled: bool = True
+    model_routing_file: str = "./config/model_routing.json"
+    qc_escalation_enabled: bool = True  # Regenerate QC-failing slots with the quality model
+    
+    # LLM Governor (shared by every LLM call in the process)
+    llm_rate_limit_rps: float = 5.0  # 0 disables the token bucket
+    llm_rate_limit_burst: int = 10
+    llm_initial_concurrency: int = 8
+    llm_min_concurrency: int = 1
+    llm_max_concurrency: int = 32
+    llm_target_latency: float = 20.0  # seconds; slower calls shrink the concurrency limit
+    llm_max_retries: int = 4
+    llm_backoff_base: float = 1.0
+    llm_backoff_max: float = 30.0
+    
+    # Hedged requests: resend a slot call that is slower than this latency percentile
+    llm_hedging_enabled: bool = False
+    llm_hedge_percentile: float = 90.0
     
     # Logging
     log_level: str = "INFO"
@@ -1,16 +1,37 @@
 """Core processing modules for the Onepager Generation Agent."""
-from .normalizer import normalize_csv, normalize_json
-from .copy_generator import generate_copy, CopySlots
-from .renderer import render_pdf
-from .qc_engine import check_quality, QCResult
+import importlib
+
+# Submodules are imported on first attribute access (PEP 562), so importing
+# one core module does not load pandas, WeasyPrint or the LLM clients
+_LAZY = {
+    "normalize_csv": ".normalizer",
+    "normalize_json": ".normalizer",
+    "generate_copy": ".copy_generator",
+    "generate_copy_async": ".copy_generator",
+    "generate_copy_batch": ".copy_generator",
+    "CopySlots": ".copy_generator",
+    "render_pdf": ".renderer",
+    "check_quality": ".qc_engine",
+    "QCResult": ".qc_engine",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "normalize_csv",
     "normalize_json",
     "generate_copy",
+    "generate_copy_async",
+    "generate_copy_batch",
     "CopySlots",
     "render_pdf",
     "check_quality",
     "QCResult",
 ]
-
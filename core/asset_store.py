@@ -0,0 +1,206 @@
+"""Local content-addressed asset store and the network-free url_fetcher used by render_pdf."""
+import hashlib
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from config.settings import settings
+
+
+# src="..." / href="..." attributes and CSS url(...) references to remote resources
+_REMOTE_URL = re.compile(
+    r"""(?:src|href)\s*=\s*["'](https?://[^"']+)["']|url\(\s*["']?(https?://[^"')\s]+)["']?\s*\)""",
+    re.IGNORECASE
+)
+
+
+class AssetNotAvailable(LookupError):
+    """A remote asset was requested during render but is not in the store."""
+
+
+def extract_asset_urls(html: str) -> List[str]:
+    """Remote (http/https) URLs referenced by a document, in order, without duplicates."""
+    urls = []
+    for match in _REMOTE_URL.finditer(html):
+        url = (match.group(1) or match.group(2)).replace("&amp;", "&")
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+class AssetStore:
+    """
+    Assets on local disk, addressed by the SHA-256 of their bytes.
+
+    Layout:
+        blobs/ab/<digest>          asset bytes
+        urls/cd/<sha256(url)>.json {"url", "digest", "mime_type"}
+
+    Several processes (render workers) can share one store; writes are
+    atomic renames.
+    """
+
+    def __init__(self, root: Union[str, Path], memory_entries: int = 256):
+        self.root = Path(root)
+        self.memory_entries = memory_entries
+        self._memory: Dict[str, Tuple[bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / digest
+
+    def _url_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / "urls" / key[:2] / f"{key}.json"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+
+    def put(self, data: bytes) -> str:
+        """Store bytes; returns their digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not path.exists():
+            self._write_atomic(path, data)
+        return digest
+
+    def put_url(self, url: str, data: bytes, mime_type: str) -> str:
+        """Store an asset and map url to it; returns the digest."""
+        digest = self.put(data)
+        entry = {"url": url, "digest": digest, "mime_type": mime_type}
+        self._write_atomic(self._url_path(url), json.dumps(entry).encode("utf-8"))
+        return digest
+
+    def has_url(self, url: str) -> bool:
+        return url in self._memory or self._url_path(url).exists()
+
+    def get_url(self, url: str) -> Optional[Tuple[bytes, str]]:
+        """(bytes, mime_type) for url, or None if it was never stored."""
+        cached = self._memory.get(url)
+        if cached is not None:
+            return cached
+        url_path = self._url_path(url)
+        if not url_path.exists():
+            return None
+        entry = json.loads(url_path.read_text(encoding="utf-8"))
+        blob_path = self._blob_path(entry["digest"])
+        if not blob_path.exists():
+            return None
+        result = (blob_path.read_bytes(), entry["mime_type"])
+        with self._lock:
+            if len(self._memory) >= self.memory_entries:
+                self._memory.pop(next(iter(self._memory)))
+            self._memory[url] = result
+        return result
+
+    def prefetch(self, urls: Iterable[str], timeout: float = 10.0, max_workers: int = 8) -> Dict[str, bool]:
+        """
+        Download assets that are not stored yet.
+
+        Returns url -> available for every requested URL. Failed downloads
+        are reported, not raised; the render then skips that asset.
+        """
+        urls = list(dict.fromkeys(urls))
+        missing = [url for url in urls if not self.has_url(url)]
+        status = {url: True for url in urls}
+
+        def _fetch(url: str) -> bool:
+            import httpx
+            
+            try:
+                response = httpx.get(url, timeout=timeout, follow_redirects=True)
+                response.raise_for_status()
+            except Exception as e:
+                print(f"Failed to prefetch asset {url}: {e}")
+                return False
+            mime_type = response.headers.get("content-type", "application/octet-stream").split(";")[0].strip()
+            self.put_url(url, response.content, mime_type)
+            return True
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+                for url, ok in zip(missing, executor.map(_fetch, missing)):
+                    status[url] = ok
+        return status
+
+
+_store: Optional[AssetStore] = None
+_store_lock = threading.Lock()
+
+
+def get_asset_store() -> AssetStore:
+    """Return the process-wide asset store (settings.asset_store_dir)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AssetStore(settings.asset_store_dir)
+    return _store
+
+
+def prefetch_assets(html: str) -> Dict[str, bool]:
+    """Fill the asset store with every remote asset a document references (run before rendering)."""
+    if not settings.asset_prefetch_enabled:
+        return {}
+    return get_asset_store().prefetch(extract_asset_urls(html), timeout=settings.asset_fetch_timeout)
+
+
+def _remote_asset(url: str) -> Tuple[bytes, str]:
+    asset = get_asset_store().get_url(url)
+    if asset is None:
+        raise AssetNotAvailable(f"Asset not in local store (no network during render): {url}")
+    return asset
+
+
+def _is_remote(url: str) -> bool:
+    return url.lower().startswith(("http://", "https://"))
+
+
+def _fetch_local(url: str, timeout: int = 10, ssl_context=None) -> dict:
+    """url_fetcher function for WeasyPrint < 66 (returns a dict)."""
+    if not _is_remote(url):
+        from weasyprint import default_url_fetcher
+        return default_url_fetcher(url, timeout=timeout, ssl_context=ssl_context)
+    data, mime_type = _remote_asset(url)
+    return {"string": data, "mime_type": mime_type, "redirected_url": url}
+
+
+_fetcher_class = None
+
+
+def _local_fetcher_class():
+    """weasyprint.urls.URLFetcher subclass serving remote URLs from the store (WeasyPrint >= 66)."""
+    global _fetcher_class
+    if _fetcher_class is None:
+        from weasyprint.urls import URLFetcher, URLFetcherResponse
+
+        class LocalURLFetcher(URLFetcher):
+            def fetch(self, url, headers=None):
+                if not _is_remote(url):
+                    return super().fetch(url, headers)
+                data, mime_type = _remote_asset(url)
+                return URLFetcherResponse(url, data, {"Content-Type": mime_type})
+
+        _fetcher_class = LocalURLFetcher
+    return _fetcher_class
+
+
+def local_url_fetcher():
+    """
+    WeasyPrint url_fetcher that never touches the network (one per HTML/CSS object).
+
+    data: and file: URLs are handled by WeasyPrint's own fetching; remote
+    URLs are served from the asset store and fail fast if not prefetched.
+    WeasyPrint 66 replaced fetcher functions returning dicts with
+    weasyprint.urls.URLFetcher objects; both are supported.
+    """
+    import weasyprint.urls
+
+    if not hasattr(weasyprint.urls, "URLFetcher"):
+        return _fetch_local
+    return _local_fetcher_class()()
@@ -0,0 +1,153 @@
+"""Incremental catalog regeneration: a manifest of what every PDF in an output directory was built from."""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from pydantic import BaseModel, Field
+from models.product_brief import ProductBrief
+from core.copy_cache import make_cache_key
+from core.copy_generator import copy_fingerprint, copy_models
+from core.renderer import template_version
+
+
+MANIFEST_NAME = "catalog_manifest.json"
+
+# Bump when the fingerprint recipe changes so every product is regenerated once
+MANIFEST_VERSION = 1
+
+
+def pdf_filename(brief: ProductBrief, template_id: str) -> str:
+    """Output file name of a product's onepager (also its manifest key)."""
+    return f"{brief.product_id}_{template_id}_{brief.language}.pdf"
+
+
+def brief_fingerprint(brief: ProductBrief, template) -> str:
+    """
+    Stable hash of everything a product's PDF depends on.
+
+    Covers the whole brief (metadata too, e.g. price and images), the
+    template version and the copy inputs (slot limits, routed models and
+    prompt version), so editing any of them marks the product changed.
+    """
+    return make_cache_key(
+        brief.model_dump_json(),
+        template.template_id,
+        template_version(template),
+        copy_fingerprint(brief, template),
+    )
+
+
+class ManifestEntry(BaseModel):
+    """What one generated PDF was built from."""
+    product_id: str
+    template_id: str
+    language: str
+    fingerprint: str
+    template_version: str
+    models: List[str] = Field(default_factory=list)
+    qc_status: Optional[str] = None
+    generated_at: float
+
+
+class CatalogDiff(BaseModel):
+    """New catalog vs. manifest; the lists hold PDF file names."""
+    unchanged: List[str] = Field(default_factory=list)
+    changed: List[str] = Field(default_factory=list)
+    added: List[str] = Field(default_factory=list)
+    removed: List[str] = Field(default_factory=list)
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "unchanged": len(self.unchanged),
+            "changed": len(self.changed),
+            "added": len(self.added),
+            "removed": len(self.removed),
+        }
+
+
+class CatalogManifest:
+    """
+    Manifest of the PDFs in an output directory, keyed by file name.
+
+    A refresh diffs the new catalog against it and regenerates only new and
+    changed products; unchanged products keep their PDFs. Products whose PDF
+    was deleted count as changed.
+    """
+
+    def __init__(self, output_dir: Union[str, Path]):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_NAME
+        self.entries: Dict[str, ManifestEntry] = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = {
+                    filename: ManifestEntry.model_validate(entry)
+                    for filename, entry in data.get("entries", {}).items()
+                }
+
+    def diff(self, briefs: Iterable[ProductBrief], template) -> CatalogDiff:
+        """Classify every brief, and every entry of the template that is missing from briefs."""
+        diff = CatalogDiff()
+        for _ in self.select(briefs, template, diff):
+            pass
+        return diff
+
+    def select(self, briefs: Iterable[ProductBrief], template, diff: CatalogDiff) -> Iterator[ProductBrief]:
+        """
+        Yield the new and changed briefs of a (streamed) catalog.
+
+        Every brief is classified into diff as it passes; diff.removed is
+        filled in once briefs are exhausted, against the entries as they were
+        when selection started (products recorded meanwhile are not removed).
+        """
+        # PDFs of other templates in the same directory are left alone
+        known = [filename for filename, entry in self.entries.items() if entry.template_id == template.template_id]
+        seen = set()
+        for brief in briefs:
+            filename = pdf_filename(brief, template.template_id)
+            seen.add(filename)
+            entry = self.entries.get(filename)
+            if entry is None:
+                diff.added.append(filename)
+            elif entry.fingerprint != brief_fingerprint(brief, template) or not (self.output_dir / filename).exists():
+                diff.changed.append(filename)
+            else:
+                diff.unchanged.append(filename)
+                continue
+            yield brief
+        diff.removed = [filename for filename in known if filename not in seen]
+
+    def record(self, brief: ProductBrief, template, qc_status: Optional[str] = None) -> None:
+        """Record a freshly generated PDF."""
+        self.entries[pdf_filename(brief, template.template_id)] = ManifestEntry(
+            product_id=brief.product_id,
+            template_id=template.template_id,
+            language=brief.language,
+            fingerprint=brief_fingerprint(brief, template),
+            template_version=template_version(template),
+            models=copy_models(brief, template),
+            qc_status=qc_status,
+            generated_at=time.time(),
+        )
+
+    def remove(self, filenames: List[str], delete_files: bool = False) -> None:
+        """Forget products that left the catalog (and delete their PDFs if asked)."""
+        for filename in filenames:
+            self.entries.pop(filename, None)
+            if delete_files:
+                (self.output_dir / filename).unlink(missing_ok=True)
+
+    def save(self) -> None:
+        """Write the manifest atomically (a crash never leaves a truncated file)."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": MANIFEST_VERSION,
+            "entries": {filename: entry.model_dump() for filename, entry in sorted(self.entries.items())},
+        }
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,138 @@
+"""Persistent, content-addressed cache for generated copy (local SQLite)."""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Union
+from config.settings import settings
+
+
+def make_cache_key(*parts) -> str:
+    """Build a stable SHA-256 key from JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CopyCache:
+    """
+    On-disk cache mapping a content hash to generated copy.
+
+    Entries expire after `ttl` seconds and the least recently used entries
+    are evicted once more than `max_entries` are stored.
+    """
+
+    def __init__(self, db_path: Union[str, Path], ttl: int, max_entries: int):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS copy_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_copy_cache_accessed ON copy_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return cached value for key, or None on miss/expiry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM copy_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at = row
+            if self.ttl > 0 and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM copy_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                self.evictions += 1
+                return None
+            self._conn.execute(
+                "UPDATE copy_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Dict) -> None:
+        """Store value under key and enforce TTL / size limits."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO copy_cache (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones over the limit."""
+        if self.ttl > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM copy_cache WHERE created_at < ?", (now - self.ttl,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+        if self.max_entries > 0:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM copy_cache").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM copy_cache WHERE key IN ("
+                    "SELECT key FROM copy_cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM copy_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and current entry count."""
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM copy_cache").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+        }
+
+
+_copy_cache: Optional[CopyCache] = None
+_copy_cache_lock = threading.Lock()
+
+
+def get_copy_cache() -> Optional[CopyCache]:
+    """Return the process-wide copy cache, or None when caching is disabled."""
+    global _copy_cache
+    if not settings.cache_enabled:
+        return None
+    with _copy_cache_lock:
+        if _copy_cache is None:
+            _copy_cache = CopyCache(
+                Path(settings.cache_dir) / "copy_cache.sqlite3",
+                ttl=settings.cache_ttl,
+                max_entries=settings.cache_max_entries
+            )
+    return _copy_cache
@@ -1,13 +1,38 @@
 """Slot-based copy generation using LLM (Gemini/OpenAI/Claude)."""
-import google.generativeai as genai
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel
 from models.product_brief import ProductBrief
 from config.settings import settings
+from core.copy_cache import get_copy_cache, make_cache_key
+from core.llm_providers import GenerationOptions, LLMProvider, agenerate_text, default_model, generate_text, get_provider
+from core.model_router import FAST, QUALITY, model_for_tier, route_tier
+from core.singleflight import SingleFlight
+from core.text_fitter import fit_text
+from core.text_metrics import box_char_limit, fit_to_box, slot_box
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+import json
+import re
 import time
 
 
+# Bump whenever prompt wording changes so cached copy is regenerated
+PROMPT_VERSION = "2"
+
+
+# Sampling temperature per slot type: short headline slots benefit from more variety
+SLOT_TEMPERATURES = {"title": 0.8, "intro": 0.5, "usp": 0.6, "cta": 0.7}
+
+# Single-line slots end at the first newline; paragraphs at the first blank line
+SLOT_STOP_SEQUENCES = {"title": ["\n"], "usp": ["\n"], "cta": ["\n"], "intro": ["\n\n"]}
+
+# Approximate JSON overhead per slot (key, quotes, separators) in tokens
+JSON_TOKENS_PER_SLOT = 8
+
+# Concurrent identical LLM calls (duplicate CSV rows, simultaneous users) share one request
+_in_flight_calls = SingleFlight()
+
+
 class CopySlots(BaseModel):
     """Generated copy slots for a template."""
     title: str
@@ -19,18 +44,6 @@ class CopySlots(BaseModel):
     usp_5: Optional[str] = None
 
 
-def _get_gemini_client():
-    """Initialize Gemini API client."""
-    if not settings.google_api_key:
-        raise ValueError("GOOGLE_API_KEY not set in environment")
-    genai.configure(api_key=settings.google_api_key)
-    # Ensure model name includes 'models/' prefix if not already present
-    model_name = settings.gemini_model
-    if not model_name.startswith("models/"):
-        model_name = f"models/{model_name}"
-    return genai.GenerativeModel(model_name)
-
-
 def _create_prompt(brief: ProductBrief, slot_type: str, max_chars: int) -> str:
     """Create prompt for a specific copy slot."""
     
@@ -84,102 +97,851 @@ Generate ONLY the USP text, nothing else."""
     return slot_prompts.get(slot_type, slot_prompts["intro"])
 
 
-def generate_copy(brief: ProductBrief, template_slots: Dict[str, int]) -> CopySlots:
+def _create_cta_prompt(brief: ProductBrief, max_chars: int) -> str:
+    """Create prompt for a call-to-action slot."""
+    return f"""Generate a call-to-action button text for a {brief.type.value} onepager.
+
+Product/Service: {brief.name}
+Target Audience: {brief.target_audience.value}
+
+Requirements:
+- Maximum {max_chars} characters
+- Action-oriented (e.g., "Start Free Trial", "Request Demo", "Learn More")
+- Professional tone
+
+Generate ONLY the CTA text, nothing else."""
+
+
+def _create_slot_prompt(brief: ProductBrief, slot_type: str, max_chars: int) -> str:
+    """Create the per-slot prompt, including the CTA special case."""
+    if slot_type == "cta":
+        return _create_cta_prompt(brief, max_chars)
+    return _create_prompt(brief, slot_type, max_chars)
+
+
+def _create_structured_prompt(brief: ProductBrief, tasks: List[Tuple[str, str, int]]) -> str:
+    """Create a single prompt asking for every slot as one JSON object."""
+    slot_lines = []
+    for slot_name, slot_type, max_chars in tasks:
+        if slot_type == "title":
+            guidance = "compelling, professional headline"
+        elif slot_type == "intro":
+            guidance = "concise introduction paragraph with a clear value proposition"
+        elif slot_type == "cta":
+            guidance = "action-oriented call-to-action button text"
+        else:
+            guidance = "unique selling point focused on ONE key benefit or feature"
+        slot_lines.append(f'- "{slot_name}": {guidance} (maximum {max_chars} characters)')
+
+    usp_note = ""
+    if sum(1 for _, slot_type, _ in tasks if slot_type == "usp") > 1:
+        usp_note = "\n- Each USP must cover a DIFFERENT benefit or feature"
+
+    example = ", ".join(f'"{slot_name}": "..."' for slot_name, _, _ in tasks)
+
+    return f"""Generate the copy for a {brief.type.value} onepager.
+
+Product/Service: {brief.name}
+Description: {brief.description}
+Category: {brief.category or 'N/A'}
+Features: {', '.join(brief.features) if brief.features else 'N/A'}
+Target Audience: {brief.target_audience.value}
+
+Slots to fill:
+{chr(10).join(slot_lines)}
+
+Requirements:
+- Respect every character limit
+- Professional, clear, and engaging tone
+- Suitable for {brief.target_audience.value} audience
+- No marketing fluff or exaggerated claims{usp_note}
+
+Return ONLY valid JSON with exactly these keys:
+{{{example}}}"""
+
+
+def _structured_schema(tasks: List[Tuple[str, str, int]]) -> Dict:
+    """Response schema for the structured prompt: one string per slot."""
+    return {
+        "type": "object",
+        "properties": {
+            slot_name: {"type": "string", "maxLength": max_chars}
+            for slot_name, _, max_chars in tasks
+        },
+        "required": [slot_name for slot_name, _, _ in tasks],
+    }
+
+
+def _parse_json_object(response_text: str):
+    """Parse a JSON answer, tolerating markdown code fences around it."""
+    try:
+        return json.loads(response_text)
+    except json.JSONDecodeError:
+        # Model may still wrap the JSON in markdown code fences
+        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        if not json_match:
+            return None
+        try:
+            return json.loads(json_match.group(0))
+        except json.JSONDecodeError:
+            return None
+
+
+def _parse_structured_response(response_text: str, template_slots: Dict[str, int]) -> Dict[str, str]:
+    """
+    Validate a structured (JSON) response against the template slots.
+    
+    Only slots that are requested by the template and came back as non-empty
+    strings are returned; anything else is left for the per-slot fallback.
+    """
+    data = _parse_json_object(response_text)
+    if not isinstance(data, dict):
+        return {}
+    return _validate_slots(data, template_slots)
+
+
+def _validate_slots(data: Dict, template_slots: Dict[str, int]) -> Dict[str, str]:
+    """Keep requested slots that are non-empty strings, clipped to their limits."""
+    slots = {}
+    for slot_name, max_chars in template_slots.items():
+        value = data.get(slot_name)
+        if isinstance(value, str) and value.strip():
+            slots[slot_name] = fit_text(value, max_chars)
+    return slots
+
+
+def _token_budget(max_chars: int) -> int:
+    """Output tokens needed for max_chars characters, with a small safety margin."""
+    return int(max_chars / settings.chars_per_token * 1.2) + 1
+
+
+def _slot_generation_options(slot_type: str, max_chars: int) -> GenerationOptions:
+    """Generation config for a single slot derived from its character limit."""
+    if not settings.slot_output_limits_enabled:
+        return GenerationOptions()
+    return GenerationOptions(
+        max_output_tokens=_token_budget(max_chars) + settings.llm_output_token_headroom,
+        temperature=SLOT_TEMPERATURES.get(slot_type),
+        stop_sequences=SLOT_STOP_SEQUENCES.get(slot_type)
+    )
+
+
+def _json_generation_options(tasks: List[Tuple[str, str, int]], schema: Dict, products: int = 1) -> GenerationOptions:
+    """Generation config for a JSON answer covering `products` x `tasks` slots."""
+    options = GenerationOptions(json_mode=True, response_schema=schema)
+    if settings.slot_output_limits_enabled:
+        per_product = sum(_token_budget(max_chars) + JSON_TOKENS_PER_SLOT for _, _, max_chars in tasks)
+        options.max_output_tokens = per_product * products + settings.llm_output_token_headroom
+        options.temperature = SLOT_TEMPERATURES["usp"]
+    return options
+
+
+def _build_slot_tasks(template_slots: Dict[str, int]) -> List[Tuple[str, str, int]]:
+    """Turn template slot limits into (slot_name, slot_type, max_chars) tasks."""
+    tasks = []
+    
+    if "title" in template_slots:
+        tasks.append(("title", "title", template_slots["title"]))
+    
+    if "intro" in template_slots:
+        tasks.append(("intro", "intro", template_slots["intro"]))
+    
+    # Generate USPs
+    usp_count = sum(1 for k in template_slots.keys() if k.startswith("usp_"))
+    for i in range(1, usp_count + 1):
+        slot_key = f"usp_{i}"
+        if slot_key in template_slots:
+            tasks.append((slot_key, "usp", template_slots[slot_key]))
+    
+    # CTA removed - no longer generating or displaying CTA buttons
+    # (User requested removal - no "Request Demo" or similar buttons)
+    
+    return tasks
+
+
+def _routed_provider(slot_type: str, brief: ProductBrief, template_id: Optional[str], tier: Optional[str] = None) -> LLMProvider:
+    """Provider/model for a slot according to the routing policy (or a forced tier)."""
+    tier = tier or route_tier(slot_type, template_id, brief.target_audience.value)
+    return get_provider(model=model_for_tier(tier))
+
+
+def _route_tasks(
+    brief: ProductBrief,
+    tasks: List[Tuple[str, str, int]],
+    template_id: Optional[str],
+    tier: Optional[str] = None
+) -> Dict[LLMProvider, List[Tuple[str, str, int]]]:
+    """Group slot tasks by the provider/model they are routed to."""
+    groups: Dict[LLMProvider, List[Tuple[str, str, int]]] = {}
+    for task in tasks:
+        groups.setdefault(_routed_provider(task[1], brief, template_id, tier), []).append(task)
+    return groups
+
+
+def _routing_signature(brief: ProductBrief, template_slots: Dict[str, int], template_id: Optional[str]) -> List[str]:
+    """Model name each slot routes to, in slot order (part of the cache key)."""
+    provider_name = settings.llm_provider
+    signature = []
+    for _, slot_type, _ in _build_slot_tasks(template_slots):
+        tier = route_tier(slot_type, template_id, brief.target_audience.value)
+        signature.append(model_for_tier(tier, provider_name) or default_model(provider_name))
+    return signature
+
+
+def _copy_cache_key(brief: ProductBrief, template_slots: Dict[str, int], template_id: Optional[str] = None) -> str:
+    """Stable cache key over brief content, slot limits, models and prompt version."""
+    return make_cache_key(
+        {
+            "type": brief.type.value,
+            "name": brief.name,
+            "description": brief.description,
+            "category": brief.category,
+            "features": brief.features,
+            "target_audience": brief.target_audience.value,
+            "language": brief.language,
+        },
+        template_slots,
+        settings.llm_provider,
+        _routing_signature(brief, template_slots, template_id),
+        settings.copy_generation_mode,
+        PROMPT_VERSION
+    )
+
+
+def copy_fingerprint(brief: ProductBrief, template) -> str:
+    """Hash of everything a brief's copy for a template depends on (the copy cache key)."""
+    return _copy_cache_key(brief, template.get_slot_limits(), template.template_id)
+
+
+def copy_models(brief: ProductBrief, template) -> List[str]:
+    """Models the template's slots are routed to for a brief."""
+    return sorted(set(_routing_signature(brief, template.get_slot_limits(), template.template_id)))
+
+
+def _call_key(prompt: str, options: GenerationOptions, provider: LLMProvider) -> str:
+    """Coalescing key: provider/model, prompt and the requested slot spec."""
+    return make_cache_key(provider.name, provider.model, prompt, options.model_dump())
+
+
+def _call_llm(prompt: str, options: GenerationOptions, provider: LLMProvider) -> str:
+    """generate_text, coalesced with identical calls already in flight."""
+    return _in_flight_calls.do(
+        _call_key(prompt, options, provider), generate_text, prompt, options, provider=provider
+    )
+
+
+async def _acall_llm(prompt: str, options: GenerationOptions, provider: LLMProvider) -> str:
+    """agenerate_text, coalesced with identical calls already in flight."""
+    return await _in_flight_calls.ado(
+        _call_key(prompt, options, provider), agenerate_text, prompt, options, provider=provider
+    )
+
+
+def get_coalescing_stats() -> Dict[str, int]:
+    """How many LLM calls were executed vs. saved by single-flight coalescing."""
+    return _in_flight_calls.stats()
+
+
+def _get_cached_copy(brief: ProductBrief, template_slots: Dict[str, int], template_id: Optional[str]):
+    """Look up copy in the on-disk cache. Returns (cache, cache_key, cached_copy)."""
+    cache = get_copy_cache()
+    if not cache:
+        return None, None, None
+    cache_key = _copy_cache_key(brief, template_slots, template_id)
+    cached = cache.get(cache_key)
+    return cache, cache_key, CopySlots(**cached) if cached is not None else None
+
+
+def _store_cached_copy(cache, cache_key: Optional[str], copy: CopySlots, template_slots: Dict[str, int]) -> None:
+    """Cache copy if every slot was filled; empty slots come from failed calls."""
+    if cache and all(getattr(copy, slot_name, None) for slot_name in template_slots):
+        cache.set(cache_key, copy.model_dump())
+
+
+def generate_copy(
+    brief: ProductBrief,
+    template_slots: Dict[str, int],
+    template_id: Optional[str] = None
+) -> CopySlots:
     """
     Generate copy for all template slots using LLM.
     
+    Results are served from the on-disk copy cache when `cache_enabled` is set.
+    
     Args:
         brief: ProductBrief object
         template_slots: Dict mapping slot names to max character limits
             e.g., {"title": 60, "intro": 200, "usp_1": 80, ...}
+        template_id: Template the copy is for; used by model routing
     
     Returns:
         CopySlots object with generated copy
     """
-    if settings.llm_provider == "gemini":
-        return _generate_with_gemini(brief, template_slots)
-    else:
-        raise NotImplementedError(f"LLM provider '{settings.llm_provider}' not implemented yet")
+    cache, cache_key, cached = _get_cached_copy(brief, template_slots, template_id)
+    if cached is not None:
+        return cached
+    
+    copy = CopySlots(**_generate_with_llm(brief, template_slots, template_id))
+    _store_cached_copy(cache, cache_key, copy, template_slots)
+    return copy
+
+
+async def generate_copy_async(
+    brief: ProductBrief,
+    template_slots: Dict[str, int],
+    template_id: Optional[str] = None
+) -> CopySlots:
+    """
+    Async variant of generate_copy for use inside the event loop.
+    
+    Uses the SDK's native async calls, so no thread is held per slot.
+    """
+    cache, cache_key, cached = _get_cached_copy(brief, template_slots, template_id)
+    if cached is not None:
+        return cached
+    
+    copy = CopySlots(**await _generate_with_llm_async(brief, template_slots, template_id))
+    _store_cached_copy(cache, cache_key, copy, template_slots)
+    return copy
 
 
-def _generate_with_gemini(brief: ProductBrief, template_slots: Dict[str, int]) -> CopySlots:
-    """Generate copy using Gemini API - optimized with parallel calls."""
-    model = _get_gemini_client()
+def _generate_with_llm(
+    brief: ProductBrief,
+    template_slots: Dict[str, int],
+    template_id: Optional[str] = None,
+    tier: Optional[str] = None
+) -> Dict[str, str]:
+    """
+    Generate copy using the configured LLM provider; returns text by slot name.
+    
+    Slots are routed to a model tier (or all forced to `tier`). In "structured"
+    mode each routed group of slots is requested in a single JSON call and
+    only slots missing from that answer are generated with per-slot calls. In
+    "per_slot" mode each slot gets its own call, executed in parallel.
+    """
+    tasks = _build_slot_tasks(template_slots)
+    groups = _route_tasks(brief, tasks, template_id, tier)
     
     generated = {}
+    start_time = time.time()
     
-    def _get_text_from_response(response):
-        """Extract text from Gemini API response."""
+    def _generate_group(provider: LLMProvider, group_tasks: List[Tuple[str, str, int]]):
+        """Structured call for the slots routed to one provider."""
         try:
-            if hasattr(response, 'text'):
-                return response.text.strip()
-            elif hasattr(response, 'candidates') and response.candidates:
-                return response.candidates[0].content.parts[0].text.strip()
-            else:
-                return str(response).strip()
+            response_text = _call_llm(
+                _create_structured_prompt(brief, group_tasks),
+                _json_generation_options(group_tasks, _structured_schema(group_tasks)),
+                provider
+            )
+            return _parse_structured_response(
+                response_text, {slot_name: max_chars for slot_name, _, max_chars in group_tasks}
+            )
         except Exception as e:
-            raise ValueError(f"Failed to extract text from Gemini response: {e}")
+            # Fall through to per-slot generation for every slot
+            print(f"Structured copy generation failed, falling back to per-slot calls: {e}")
+            return {}
     
     def _generate_slot(slot_name: str, slot_type: str, max_chars: int):
         """Generate a single slot - used for parallel execution."""
         try:
-            if slot_type == "cta":
-                prompt = f"""Generate a call-to-action button text for a {brief.type.value} onepager.
+            provider = _routed_provider(slot_type, brief, template_id, tier)
+            prompt = _create_slot_prompt(brief, slot_type, max_chars)
+            text = _call_llm(prompt, _slot_generation_options(slot_type, max_chars), provider)
+            return slot_name, fit_text(text, max_chars)
+        except Exception as e:
+            # Retries are exhausted at this point; leave the slot empty for QC to flag
+            print(f"Failed to generate slot '{slot_name}': {e}")
+            return slot_name, ""
+    
+    if settings.copy_generation_mode == "structured" and tasks:
+        if len(groups) == 1:
+            generated = _generate_group(*next(iter(groups.items())))
+        else:
+            with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+                for group_result in executor.map(lambda item: _generate_group(*item), groups.items()):
+                    generated.update(group_result)
+    
+    missing_tasks = [task for task in tasks if task[0] not in generated]
+    
+    # Execute remaining API calls in parallel
+    if missing_tasks:
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            # Submit all tasks
+            future_to_slot = {
+                executor.submit(_generate_slot, slot_name, slot_type, max_chars): slot_name
+                for slot_name, slot_type, max_chars in missing_tasks
+            }
+            
+            # Collect results as they complete
+            for future in as_completed(future_to_slot):
+                slot_name, text = future.result()
+                generated[slot_name] = text
+    
+    elapsed_time = time.time() - start_time
+    print(
+        f"Generated {len(tasks)} slots in {elapsed_time:.2f} seconds "
+        f"({settings.copy_generation_mode}, {len(groups)} model group(s), {len(missing_tasks)} per-slot calls)"
+    )
+    
+    return generated
+
 
+async def _generate_with_llm_async(
+    brief: ProductBrief,
+    template_slots: Dict[str, int],
+    template_id: Optional[str] = None,
+    tier: Optional[str] = None
+) -> Dict[str, str]:
+    """Async counterpart of _generate_with_llm built on the providers' async calls."""
+    tasks = _build_slot_tasks(template_slots)
+    groups = _route_tasks(brief, tasks, template_id, tier)
+    
+    generated = {}
+    start_time = time.time()
+    
+    async def _generate_group(provider: LLMProvider, group_tasks: List[Tuple[str, str, int]]):
+        try:
+            response_text = await _acall_llm(
+                _create_structured_prompt(brief, group_tasks),
+                _json_generation_options(group_tasks, _structured_schema(group_tasks)),
+                provider
+            )
+            return _parse_structured_response(
+                response_text, {slot_name: max_chars for slot_name, _, max_chars in group_tasks}
+            )
+        except Exception as e:
+            print(f"Structured copy generation failed, falling back to per-slot calls: {e}")
+            return {}
+    
+    async def _generate_slot(slot_name: str, slot_type: str, max_chars: int):
+        try:
+            provider = _routed_provider(slot_type, brief, template_id, tier)
+            prompt = _create_slot_prompt(brief, slot_type, max_chars)
+            text = await _acall_llm(prompt, _slot_generation_options(slot_type, max_chars), provider)
+            return slot_name, fit_text(text, max_chars)
+        except Exception as e:
+            # Retries are exhausted at this point; leave the slot empty for QC to flag
+            print(f"Failed to generate slot '{slot_name}': {e}")
+            return slot_name, ""
+    
+    if settings.copy_generation_mode == "structured" and tasks:
+        for group_result in await asyncio.gather(*(
+            _generate_group(provider, group_tasks) for provider, group_tasks in groups.items()
+        )):
+            generated.update(group_result)
+    
+    missing_tasks = [task for task in tasks if task[0] not in generated]
+    
+    if missing_tasks:
+        results = await asyncio.gather(*(
+            _generate_slot(slot_name, slot_type, max_chars)
+            for slot_name, slot_type, max_chars in missing_tasks
+        ))
+        generated.update(dict(results))
+    
+    elapsed_time = time.time() - start_time
+    print(
+        f"Generated {len(tasks)} slots in {elapsed_time:.2f} seconds "
+        f"({settings.copy_generation_mode}, {len(groups)} model group(s), {len(missing_tasks)} per-slot calls, async)"
+    )
+    
+    return generated
+
+
+def _create_batch_prompt(briefs: List[ProductBrief], tasks: List[Tuple[str, str, int]]) -> str:
+    """Create one prompt covering several products; shared instructions appear once."""
+    slot_lines = "\n".join(
+        f'- "{slot_name}": maximum {max_chars} characters ({slot_type})'
+        for slot_name, slot_type, max_chars in tasks
+    )
+    product_blocks = []
+    for i, brief in enumerate(briefs, 1):
+        product_blocks.append(
+            f"""[{i}]
+Type: {brief.type.value}
 Product/Service: {brief.name}
-Target Audience: {brief.target_audience.value}
+Description: {brief.description}
+Category: {brief.category or 'N/A'}
+Features: {', '.join(brief.features) if brief.features else 'N/A'}
+Target Audience: {brief.target_audience.value}"""
+        )
+    example = ", ".join(f'"{slot_name}": "..."' for slot_name, _, _ in tasks)
+
+    return f"""Generate onepager copy for each of the {len(briefs)} products below. Treat every product independently.
+
+Slots to fill for EVERY product:
+{slot_lines}
+
+Slot guidance:
+- title: compelling, professional headline
+- intro: concise introduction paragraph with a clear value proposition
+- usp: unique selling point focused on ONE key benefit or feature; each USP must cover a DIFFERENT benefit
 
 Requirements:
-- Maximum {max_chars} characters
-- Action-oriented (e.g., "Start Free Trial", "Request Demo", "Learn More")
-- Professional tone
+- Respect every character limit
+- Professional, clear, and engaging tone suited to each product's target audience
+- No marketing fluff or exaggerated claims
 
-Generate ONLY the CTA text, nothing else."""
-            else:
-                prompt = _create_prompt(brief, slot_type, max_chars)
-            
-            response = model.generate_content(prompt)
-            text = _get_text_from_response(response)
-            return slot_name, text[:max_chars]
-        except Exception as e:
-            # Return empty string on error, will be caught by QC
-            return slot_name, ""
+Products:
+{chr(10).join(product_blocks)}
+
+Return ONLY valid JSON with one entry per product, using the product number as "id":
+{{"products": [{{"id": "1", {example}}}, ...]}}"""
+
+
+def _batch_schema(count: int, tasks: List[Tuple[str, str, int]]) -> Dict:
+    """Response schema for a batch prompt of `count` products."""
+    return {
+        "type": "object",
+        "properties": {
+            "products": {
+                "type": "array",
+                "prefixItems": [
+                    {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string", "enum": [str(i)]},
+                            **_structured_schema(tasks)["properties"],
+                        },
+                    }
+                    for i in range(1, count + 1)
+                ],
+            }
+        },
+    }
+
+
+def _parse_batch_response(response_text: str, count: int, template_slots: Dict[str, int]) -> Dict[int, CopySlots]:
+    """
+    Split a batch answer into per-product CopySlots.
     
-    # Prepare all slot generation tasks
-    tasks = []
+    Returns {product_index: CopySlots} for products whose every slot came
+    back filled; incomplete products are left out so they can be re-queued.
+    """
+    data = _parse_json_object(response_text)
+    products = data.get("products") if isinstance(data, dict) else None
+    if not isinstance(products, list):
+        return {}
     
-    if "title" in template_slots:
-        tasks.append(("title", "title", template_slots["title"]))
+    results = {}
+    for item in products:
+        if not isinstance(item, dict):
+            continue
+        try:
+            index = int(str(item.get("id", "")).strip("[] "))
+        except ValueError:
+            continue
+        if not 1 <= index <= count or index in results:
+            continue
+        slots = _validate_slots(item, template_slots)
+        if len(slots) == len(template_slots):
+            results[index] = CopySlots(**slots)
+    return results
+
+
+def _batch_provider(batch_briefs: List[ProductBrief], tasks: List[Tuple[str, str, int]], template_id: Optional[str]) -> LLMProvider:
+    """A batch shares one request, so it uses the highest tier any of its slots routes to."""
+    tiers = {
+        route_tier(slot_type, template_id, brief.target_audience.value)
+        for brief in batch_briefs
+        for _, slot_type, _ in tasks
+    }
+    return get_provider(model=model_for_tier(QUALITY if QUALITY in tiers else FAST))
+
+
+def _plan_batches(
+    briefs: List[ProductBrief],
+    template_slots: Dict[str, int],
+    batch_size: Optional[int],
+    template_id: Optional[str] = None
+):
+    """
+    Resolve cache hits and group the remaining unique briefs into batches.
     
-    if "intro" in template_slots:
-        tasks.append(("intro", "intro", template_slots["intro"]))
+    Returns (results, cache, key_by_index, batches) where results holds cached
+    copy by input index and batches is a list of lists of (cache_key, brief).
+    """
+    cache = get_copy_cache()
+    results: Dict[int, CopySlots] = {}
+    key_by_index: Dict[int, str] = {}
+    pending: Dict[str, ProductBrief] = {}
     
-    # Generate USPs
-    usp_count = sum(1 for k in template_slots.keys() if k.startswith("usp_"))
-    for i in range(1, usp_count + 1):
-        slot_key = f"usp_{i}"
-        if slot_key in template_slots:
-            tasks.append((slot_key, "usp", template_slots[slot_key]))
+    for i, brief in enumerate(briefs):
+        cache_key = _copy_cache_key(brief, template_slots, template_id)
+        key_by_index[i] = cache_key
+        if cache_key in pending:
+            continue
+        cached = cache.get(cache_key) if cache else None
+        if cached is not None:
+            results[i] = CopySlots(**cached)
+        else:
+            pending[cache_key] = brief
     
-    # CTA removed - no longer generating or displaying CTA buttons
-    # (User requested removal - no "Request Demo" or similar buttons)
+    size = max(1, batch_size or settings.batch_size)
+    items = list(pending.items())
+    batches = [items[i:i + size] for i in range(0, len(items), size)]
+    return results, cache, key_by_index, batches
+
+
+def _collect_batches(briefs, results, key_by_index, generated: Dict[str, CopySlots]) -> List[CopySlots]:
+    """Assemble per-brief results in input order."""
+    for i in range(len(briefs)):
+        if i not in results:
+            results[i] = generated[key_by_index[i]]
+    return [results[i] for i in range(len(briefs))]
+
+
+def generate_copy_batch(
+    briefs: List[ProductBrief],
+    template_slots: Dict[str, int],
+    batch_size: Optional[int] = None,
+    template_id: Optional[str] = None
+) -> List[CopySlots]:
+    """
+    Generate copy for many briefs, packing up to `batch_size` products per request.
+    
+    Cached briefs and duplicates are not sent. Products missing from a batch
+    answer, or with unfilled slots, are re-queued through generate_copy.
+    
+    Args:
+        briefs: ProductBrief objects (order is preserved in the result)
+        template_slots: Dict mapping slot names to max character limits
+        batch_size: Products per request; defaults to settings.batch_size
+        template_id: Template the copy is for; used by model routing
+    
+    Returns:
+        List of CopySlots, one per brief
+    """
+    results, cache, key_by_index, batches = _plan_batches(briefs, template_slots, batch_size, template_id)
+    tasks = _build_slot_tasks(template_slots)
+    generated: Dict[str, CopySlots] = {}
+    
+    def _run_batch(batch) -> int:
+        """Generate one batch; returns how many products had to be re-queued."""
+        batch_briefs = [brief for _, brief in batch]
+        batch_results = {}
+        if len(batch) > 1:
+            try:
+                response_text = _call_llm(
+                    _create_batch_prompt(batch_briefs, tasks),
+                    _json_generation_options(tasks, _batch_schema(len(batch), tasks), products=len(batch)),
+                    _batch_provider(batch_briefs, tasks, template_id)
+                )
+                batch_results = _parse_batch_response(response_text, len(batch), template_slots)
+            except Exception as e:
+                print(f"Batch copy generation failed for {len(batch)} products: {e}")
+        
+        requeued = 0
+        for index, (cache_key, brief) in enumerate(batch, 1):
+            copy = batch_results.get(index)
+            if copy is None:
+                # Re-queue on its own (structured call + per-slot fallback)
+                requeued += 1
+                copy = generate_copy(brief, template_slots, template_id)
+            else:
+                _store_cached_copy(cache, cache_key, copy, template_slots)
+            generated[cache_key] = copy
+        return requeued
     
-    # Execute all API calls in parallel
     start_time = time.time()
-    with ThreadPoolExecutor(max_workers=6) as executor:
-        # Submit all tasks
-        future_to_slot = {
-            executor.submit(_generate_slot, slot_name, slot_type, max_chars): slot_name
-            for slot_name, slot_type, max_chars in tasks
-        }
+    requeued = 0
+    if batches:
+        with ThreadPoolExecutor(max_workers=min(len(batches), settings.llm_max_concurrency)) as executor:
+            requeued = sum(executor.map(_run_batch, batches))
+    
+    print(
+        f"Generated copy for {len(briefs)} products in {time.time() - start_time:.2f} seconds "
+        f"({len(batches)} batch requests, {requeued} re-queued)"
+    )
+    return _collect_batches(briefs, results, key_by_index, generated)
+
+
+async def generate_copy_batch_async(
+    briefs: List[ProductBrief],
+    template_slots: Dict[str, int],
+    batch_size: Optional[int] = None,
+    template_id: Optional[str] = None
+) -> List[CopySlots]:
+    """Async variant of generate_copy_batch; batches are awaited concurrently."""
+    results, cache, key_by_index, batches = _plan_batches(briefs, template_slots, batch_size, template_id)
+    tasks = _build_slot_tasks(template_slots)
+    generated: Dict[str, CopySlots] = {}
+    
+    async def _run_batch(batch):
+        batch_briefs = [brief for _, brief in batch]
+        batch_results = {}
+        if len(batch) > 1:
+            try:
+                response_text = await _acall_llm(
+                    _create_batch_prompt(batch_briefs, tasks),
+                    _json_generation_options(tasks, _batch_schema(len(batch), tasks), products=len(batch)),
+                    _batch_provider(batch_briefs, tasks, template_id)
+                )
+                batch_results = _parse_batch_response(response_text, len(batch), template_slots)
+            except Exception as e:
+                print(f"Batch copy generation failed for {len(batch)} products: {e}")
         
-        # Collect results as they complete
-        for future in as_completed(future_to_slot):
-            slot_name, text = future.result()
-            generated[slot_name] = text
+        for index, (cache_key, brief) in enumerate(batch, 1):
+            copy = batch_results.get(index)
+            if copy is None:
+                copy = await generate_copy_async(brief, template_slots, template_id)
+            else:
+                _store_cached_copy(cache, cache_key, copy, template_slots)
+            generated[cache_key] = copy
     
-    elapsed_time = time.time() - start_time
-    print(f"Generated {len(tasks)} slots in {elapsed_time:.2f} seconds (parallel)")
+    await asyncio.gather(*(_run_batch(batch) for batch in batches))
+    return _collect_batches(briefs, results, key_by_index, generated)
+
+
+_QC_SLOT_CHECK_PREFIXES = ("text_overflow_", "missing_required_", "predicted_overflow_", "layout_overflow_")
+
+
+def fit_copy_to_template(template, copy: CopySlots) -> CopySlots:
+    """
+    Trim slots that are predicted (from font metrics) to overflow their box.
     
-    return CopySlots(**generated)
+    Last resort after QC and escalation: predicted overflow is reported by
+    QC and regenerated with a box-derived limit first, so this only trims
+    copy the quality model could not fit either.
+    """
+    if not settings.text_fit_enabled:
+        return copy
+    text_boxes = template.get_text_boxes()
+    trimmed = {}
+    for slot_name in template.get_slot_limits():
+        box = slot_box(text_boxes, slot_name)
+        text = getattr(copy, slot_name, None)
+        if box is None or not text:
+            continue
+        fitted = fit_to_box(text, box)
+        if fitted != text:
+            trimmed[slot_name] = fitted
+    if not trimmed:
+        return copy
+    print(f"Trimmed {len(trimmed)} slot(s) to fit the template: {', '.join(trimmed)}")
+    return copy.model_copy(update=trimmed)
 
+
+def trimmed_slots(before: CopySlots, after: CopySlots) -> List[str]:
+    """QC fix notes for slots fit_copy_to_template shortened."""
+    return [
+        f"Trimmed {slot_name} to fit its box"
+        for slot_name, value in before.model_dump().items()
+        if value and getattr(after, slot_name) != value
+    ]
+
+
+def _failed_slots(qc_result) -> List[str]:
+    """Slot names behind failing per-slot QC checks."""
+    slots = []
+    for check in qc_result.checks:
+        if check.status != "fail":
+            continue
+        for prefix in _QC_SLOT_CHECK_PREFIXES:
+            if check.check_name.startswith(prefix):
+                slots.append(check.check_name[len(prefix):])
+    return slots
+
+
+def _escalation_plan(template, copy: CopySlots, qc_result) -> Dict[str, int]:
+    """Slot limits to regenerate on the quality tier, or {} if there is nothing to escalate."""
+    if not settings.qc_escalation_enabled or qc_result.overall_status != "fail":
+        return {}
+    slot_limits = template.get_slot_limits()
+    text_boxes = template.get_text_boxes()
+    plan = {}
+    for slot in _failed_slots(qc_result):
+        if slot not in slot_limits:
+            continue
+        limit = slot_limits[slot]
+        box = slot_box(text_boxes, slot)
+        text = getattr(copy, slot, None)
+        if box is not None and text:
+            # Within the character limit but too wide for the box: ask for what the box holds
+            limit = min(limit, box_char_limit(text, box))
+        plan[slot] = limit
+    return plan
+
+
+def _merge_escalated(
+    brief: ProductBrief,
+    template,
+    copy: CopySlots,
+    regenerated: Dict[str, str]
+) -> CopySlots:
+    """Merge regenerated slots into copy and refresh the cache entry."""
+    template_slots = template.get_slot_limits()
+    merged = CopySlots(**{**copy.model_dump(), **{k: v for k, v in regenerated.items() if v}})
+    cache = get_copy_cache()
+    if cache:
+        _store_cached_copy(cache, _copy_cache_key(brief, template_slots, template.template_id), merged, template_slots)
+    return merged
+
+
+def escalate_failed_slots(brief: ProductBrief, template, copy: CopySlots, qc_result) -> CopySlots:
+    """
+    Regenerate the slots that failed QC with the quality-tier model.
+    
+    Args:
+        brief: ProductBrief the copy was generated from
+        template: Template instance the copy is for
+        copy: Generated copy
+        qc_result: QCResult from core.qc_engine.check_quality
+    
+    Returns:
+        Copy with failed slots replaced (unchanged if nothing failed)
+    """
+    plan = _escalation_plan(template, copy, qc_result)
+    if not plan:
+        return copy
+    print(f"Escalating {len(plan)} slot(s) to the quality model after QC failure: {', '.join(plan)}")
+    regenerated = _generate_with_llm(brief, plan, template.template_id, tier=QUALITY)
+    return _merge_escalated(brief, template, copy, regenerated)
+
+
+async def escalate_failed_slots_async(brief: ProductBrief, template, copy: CopySlots, qc_result) -> CopySlots:
+    """Async variant of escalate_failed_slots."""
+    plan = _escalation_plan(template, copy, qc_result)
+    if not plan:
+        return copy
+    print(f"Escalating {len(plan)} slot(s) to the quality model after QC failure: {', '.join(plan)}")
+    regenerated = await _generate_with_llm_async(brief, plan, template.template_id, tier=QUALITY)
+    return _merge_escalated(brief, template, copy, regenerated)
+
+
+def _fit_checked(template, generated: CopySlots, copy: CopySlots, qc_result):
+    """Trim what still overflows after escalation and re-run QC if the copy changed."""
+    from core.qc_engine import check_quality  # qc_engine imports this module
+    
+    fitted = fit_copy_to_template(template, copy)
+    if fitted is generated:
+        return fitted, qc_result
+    qc_result = check_quality(template, fitted)
+    qc_result.fixes_applied = trimmed_slots(copy, fitted)
+    return fitted, qc_result
+
+
+def generate_copy_checked(brief: ProductBrief, template):
+    """
+    Generate copy for a template, run QC, escalate failing slots once and
+    trim whatever still overflows its box.
+    
+    Returns:
+        (CopySlots, QCResult) after any escalation
+    """
+    from core.qc_engine import check_quality  # qc_engine imports this module
+    
+    generated = generate_copy(brief, template.get_slot_limits(), template.template_id)
+    qc_result = check_quality(template, generated)
+    copy = escalate_failed_slots(brief, template, generated, qc_result)
+    return _fit_checked(template, generated, copy, qc_result)
+
+
+async def generate_copy_checked_async(brief: ProductBrief, template):
+    """Async variant of generate_copy_checked."""
+    from core.qc_engine import check_quality  # qc_engine imports this module
+    
+    generated = await generate_copy_async(brief, template.get_slot_limits(), template.template_id)
+    qc_result = check_quality(template, generated)
+    copy = await escalate_failed_slots_async(brief, template, generated, qc_result)
+    return _fit_checked(template, generated, copy, qc_result)
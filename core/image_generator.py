@@ -1,41 +1,144 @@
-"""Image generation for templates using AI."""
-import os
-import requests
-from typing import Optional, List
-from config.settings import settings
+"""Image generation for templates (drawn locally with Pillow, no external services)."""
 import base64
-from io import BytesIO
-from PIL import Image
 import hashlib
+import os
+import threading
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Tuple
+from config.settings import settings
+
+if TYPE_CHECKING:
+    from PIL import ImageDraw
+
+
+# Bump when the drawing code changes so memoized images are regenerated
+IMAGE_STYLE_VERSION = "1"
+
+# Card palettes (background, accent) picked by digest
+PALETTES = [
+    ("#667eea", "#ffffff"),
+    ("#764ba2", "#f3e8ff"),
+    ("#2c3e50", "#ecf0f1"),
+    ("#11998e", "#e0fff4"),
+    ("#f5576c", "#fff0f3"),
+    ("#4facfe", "#eaf6ff"),
+    ("#434343", "#f5f5f5"),
+    ("#fa709a", "#fff7e6"),
+]
+
+_write_lock = threading.Lock()
+
+
+def stable_digest(*parts) -> str:
+    """SHA-256 over the parts; identical in every process (unlike the salted built-in hash())."""
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def _load_font(size: int):
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.load_default(size=size)
+    except (TypeError, OSError):
+        # Pillow without FreeType support: fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+def _wrap_text(draw: "ImageDraw.ImageDraw", text: str, font, max_width: int, max_lines: int = 3):
+    """Greedy word wrap to max_width pixels; extra lines are dropped."""
+    lines, line = [], ""
+    for word in text.split():
+        candidate = f"{line} {word}".strip()
+        if draw.textlength(candidate, font=font) <= max_width or not line:
+            line = candidate
+        else:
+            lines.append(line)
+            line = word
+            if len(lines) == max_lines:
+                return lines
+    if line:
+        lines.append(line)
+    return lines[:max_lines]
+
+
+def draw_feature_card(text: str, size: Tuple[int, int] = (400, 300), seed: str = "") -> bytes:
+    """
+    Draw placeholder art for a feature: palette background, soft shapes and the text.
+    
+    Deterministic for the same (text, size, seed) and Pillow version.
+    
+    Returns:
+        PNG bytes
+    """
+    # Pillow is only needed once a card is drawn (not to import the API)
+    from PIL import Image, ImageColor, ImageDraw
+
+    width, height = size
+    digest = bytes.fromhex(stable_digest(IMAGE_STYLE_VERSION, text, seed))
+    background, accent = PALETTES[digest[0] % len(PALETTES)]
+    
+    image = Image.new("RGBA", size, background)
+    overlay = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay)
+    accent_rgb = ImageColor.getrgb(accent)[:3]
+    
+    # Soft circles placed by digest bytes
+    for i in range(4):
+        cx = digest[1 + i * 3] * width // 255
+        cy = digest[2 + i * 3] * height // 255
+        radius = (min(width, height) // 6) + digest[3 + i * 3] * min(width, height) // 510
+        draw.ellipse((cx - radius, cy - radius, cx + radius, cy + radius), fill=accent_rgb + (40 + i * 10,))
+    image = Image.alpha_composite(image, overlay)
+    
+    # Feature text, centered
+    if text:
+        draw = ImageDraw.Draw(image)
+        font = _load_font(max(12, min(width, height) // 10))
+        lines = _wrap_text(draw, text, font, int(width * 0.8))
+        line_height = font.getbbox("Ag")[3] + 6
+        y = (height - line_height * len(lines)) // 2
+        for line in lines:
+            x = (width - draw.textlength(line, font=font)) // 2
+            draw.text((x, y), line, font=font, fill=accent)
+            y += line_height
+    
+    buffer = BytesIO()
+    image.convert("RGB").save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def get_feature_image(text: str, size: Tuple[int, int] = (400, 300), seed: str = "") -> bytes:
+    """
+    PNG for a feature card, memoized to settings.image_cache_dir by stable digest.
+    """
+    key = stable_digest(IMAGE_STYLE_VERSION, text, size[0], size[1], seed)
+    path = Path(settings.image_cache_dir) / key[:2] / f"{key}.png"
+    if path.exists():
+        return path.read_bytes()
+    
+    data = draw_feature_card(text, size, seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _write_lock:
+        # Render workers share the directory: per-process temp name, atomic rename
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+    return data
 
 
 def generate_image_from_text(prompt: str, style: str = "professional") -> Optional[bytes]:
     """
     Generate image from text prompt.
     
-    For now, uses placeholder service. In production, integrate with:
+    Draws placeholder art locally (see draw_feature_card). In production,
+    replace with a real image generation API:
     - DALL-E 3 (OpenAI)
     - Stable Diffusion API
     - Midjourney API
-    - Or use placeholder images with feature-based selection
     """
-    # For MVP: Use placeholder images based on keywords
-    # In production, replace with actual AI image generation API
-    
-    # Hash the prompt to get consistent placeholder
-    prompt_hash = hashlib.md5(prompt.encode()).hexdigest()
-    
-    # Use placeholder service (replace with real API)
-    placeholder_url = f"https://via.placeholder.com/800x600/667eea/ffffff?text={prompt[:50]}"
-    
-    try:
-        response = requests.get(placeholder_url, timeout=10)
-        if response.status_code == 200:
-            return response.content
-    except Exception as e:
-        print(f"Error generating placeholder image: {e}")
-    
-    return None
+    return get_feature_image(prompt[:50], size=(800, 600), seed=style)
 
 
 def generate_feature_icon(feature_text: str) -> Optional[str]:
@@ -82,17 +185,19 @@ def generate_feature_icon(feature_text: str) -> Optional[str]:
     
     # Default icons
     default_icons = ["✨", "🚀", "💡", "⭐", "🎯", "🔥", "💎", "🌟"]
-    return default_icons[hash(feature_text) % len(default_icons)]
+    return default_icons[int(stable_digest(feature_text), 16) % len(default_icons)]
 
 
-def get_feature_image_url(feature: str, product_name: str) -> str:
+@lru_cache(maxsize=512)
+def get_feature_image_url(feature: str, product_name: str, size: Tuple[int, int] = (400, 300)) -> str:
     """
-    Generate a data URL or URL for feature image.
-    For now, returns placeholder with feature text.
+    Return a data: URL with a locally drawn image for a feature.
+    
+    Inline data keeps the browser preview working and lets WeasyPrint
+    render without any network access.
     """
-    # Encode feature text for placeholder
-    encoded_text = feature.replace(" ", "+")[:30]
-    return f"https://via.placeholder.com/400x300/667eea/ffffff?text={encoded_text}"
+    data = get_feature_image(feature[:30], size=size, seed=product_name)
+    return "data:image/png;base64," + base64.b64encode(data).decode("ascii")
 
 
 def create_svg_icon(icon_type: str, color: str = "#667eea") -> str:
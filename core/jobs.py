@@ -0,0 +1,368 @@
+"""Background bulk-generation jobs: per-row progress and a ZIP of the PDFs streamed as rows finish."""
+import asyncio
+import io
+import json
+import shutil
+import time
+import zipfile
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from pydantic import BaseModel
+from models.product_brief import ProductBrief
+from core.pipeline import OnepagerItem, build_onepager_pipeline
+from core import run_store
+from core.run_store import get_run_store, is_pending, restore_item, stream_into_run
+from templates.registry import get_template
+from config.settings import settings
+
+
+# Row states; done and failed are final
+PENDING, COPY, QC, RENDERING, DONE, FAILED = "pending", "copy", "qc", "rendering", "done", "failed"
+
+# Pipeline stage -> row state while the row is in it
+_STAGE_STATES = {"copy": COPY, "qc": QC, "render": RENDERING}
+
+
+class JobRow(BaseModel):
+    """Progress of one product in a bulk job."""
+    index: int
+    product_id: str
+    name: str
+    template_id: str
+    status: str = PENDING
+    filename: Optional[str] = None
+    qc_status: Optional[str] = None
+    error: Optional[str] = None
+
+
+def _filename(index: int, brief: ProductBrief, template_id: str, seen: Set[str]) -> str:
+    """PDF name of a stored item; names repeated in the CSV (seen so far) are prefixed with the row number."""
+    filename = f"{brief.product_id}_{template_id}_{brief.language}.pdf"
+    if filename in seen:
+        filename = f"{index + 1}_{filename}"
+    seen.add(filename)
+    return filename
+
+
+class BulkJob:
+    """
+    One CSV upload being turned into PDFs in the background.
+
+    Rows move pending -> copy -> qc -> rendering -> done/failed. Every final row
+    state is appended to an event log, which progress subscribers and ZIP
+    downloads follow (each with its own cursor), so any number of clients
+    can watch one job.
+
+    A job is an "api" run in the run store and writes its PDFs under
+    settings.job_output_dir, so it outlives the process: after a restart it
+    is loaded from the store (BulkJob.load) and can be resumed (see
+    JobManager.resume).
+    """
+
+    def __init__(self, run: dict):
+        self.id = run["run_id"]
+        self.template_id = run["template_id"]
+        self.created_at = run["created_at"]
+        self.directory = Path(settings.job_output_dir) / self.id
+        self.error: Optional[str] = None
+        self.events: List[dict] = []
+        self._changed = asyncio.Condition()
+        self._task: Optional[asyncio.Task] = None
+        self._source: Optional[Iterable[ProductBrief]] = None
+        self.pipeline = None
+        self.rows: List[JobRow] = []
+        self._filenames: Set[str] = set()
+
+        self.status = run["status"]
+        self.finished_at: Optional[float] = run["finished_at"]
+        if self.status == "running":
+            # Recorded as running, but no process is running it any more
+            self.status = "interrupted"
+            self.finished_at = time.time()
+
+    def _load_rows(self) -> None:
+        """Rebuild rows and final-state events from the stored items (SQLite; run it in a thread)."""
+        for record in get_run_store().iter_items(self.id):
+            row = JobRow(
+                index=record["idx"],
+                product_id=record["product_id"],
+                name=record["brief"].name,
+                template_id=record["template_id"],
+                filename=_filename(record["idx"], record["brief"], record["template_id"], self._filenames),
+                qc_status=record["qc"].overall_status if record["qc"] else None,
+            )
+            if not is_pending(record):
+                row.status = DONE
+            elif record["status"] == run_store.FAILED:
+                row.status = FAILED
+                row.error = f"{record['failed_stage']}: {record['error']}"
+            if row.status in (DONE, FAILED):
+                self.events.append({"event": "row", "row": row.model_dump()})
+            self.rows.append(row)
+
+    @classmethod
+    async def load(cls, job_id: str) -> Optional["BulkJob"]:
+        """A job recorded by an earlier request or process, or None if there is no such job."""
+        run = await asyncio.to_thread(get_run_store().get_run, job_id)
+        # CLI runs share the store but are not jobs
+        if run is None or run["kind"] != "api":
+            return None
+        job = cls(run)
+        await asyncio.to_thread(job._load_rows)
+        return job
+
+    @classmethod
+    async def create(cls, briefs: Iterable[ProductBrief], template_id: str) -> "BulkJob":
+        """
+        Record a new job; per-row template_id metadata overrides template_id.
+
+        briefs may be a stream (e.g. a CSV reader): rows are recorded as they
+        are read once the job runs, and the pipeline starts with the first ones.
+        """
+        store = get_run_store()
+        run_id = await asyncio.to_thread(store.create_run, "api", template_id=template_id)
+        job = cls(await asyncio.to_thread(store.get_run, run_id))
+        job._source = briefs
+        job.status = "queued"
+        job.finished_at = None
+        return job
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def summary(self, include_rows: bool = False) -> dict:
+        counts = {state: 0 for state in (PENDING, COPY, QC, RENDERING, DONE, FAILED)}
+        for row in self.rows:
+            counts[row.status] += 1
+        summary = {
+            "job_id": self.id,
+            "status": self.status,
+            "template_id": self.template_id,
+            "total": len(self.rows),
+            "completed": counts[DONE] + counts[FAILED],
+            "counts": counts,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+        if self.pipeline is not None:
+            summary["pipeline"] = self.pipeline.stats()
+        if include_rows:
+            summary["rows"] = [row.model_dump() for row in self.rows]
+        return summary
+
+    def pdf_path(self, index: int) -> Path:
+        return self.directory / self.rows[index].filename
+
+    # ---- progress ---------------------------------------------------------
+
+    async def _emit(self, event: dict) -> None:
+        async with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    async def _set_row(self, row: JobRow, status: str, **fields) -> None:
+        row.status = status
+        for name, value in fields.items():
+            setattr(row, name, value)
+        if status in (DONE, FAILED):
+            await self._emit({"event": "row", "row": row.model_dump()})
+
+    async def follow(self) -> AsyncIterator[dict]:
+        """Yield every event from the start, then new ones as they happen, until the job ends."""
+        cursor = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: cursor < len(self.events) or self.finished)
+                events = self.events[cursor:]
+                finished = self.finished
+            cursor += len(events)
+            for event in events:
+                yield event
+            if finished and cursor >= len(self.events):
+                return
+
+    # ---- processing -------------------------------------------------------
+
+    async def _on_stage(self, item: OnepagerItem, stage: str) -> None:
+        await self._set_row(self.rows[item.index], _STAGE_STATES[stage])
+
+    async def _after_stage(self, item: OnepagerItem, stage: str) -> None:
+        await asyncio.to_thread(get_run_store().record_stage, self.id, item, stage)
+
+    def _add_rows(self, batch: List[Tuple[int, ProductBrief, str]]) -> None:
+        for index, brief, template_id in batch:
+            self.rows.append(JobRow(
+                index=index,
+                product_id=brief.product_id,
+                name=brief.name,
+                template_id=template_id,
+                filename=_filename(index, brief, template_id, self._filenames),
+            ))
+
+    async def _new_items(self, briefs: Iterable[ProductBrief]) -> AsyncIterator[OnepagerItem]:
+        """Record rows as they are read (see run_store.stream_into_run) and hand them to the pipeline."""
+        items = (
+            (brief, get_template(brief.metadata.get("template_id") or self.template_id).template_id)
+            for brief in briefs
+        )
+        async for record in stream_into_run(get_run_store(), self.id, items, on_recorded=self._add_rows):
+            yield restore_item(record, get_template(record["template_id"]), self.pdf_path(record["idx"]))
+
+    def _pending_items(self) -> Iterator[OnepagerItem]:
+        """Unfinished rows as pipeline items, read from the store as the pipeline takes them."""
+        for record in get_run_store().iter_items(self.id):
+            if is_pending(record):
+                yield restore_item(record, get_template(record["template_id"]), self.pdf_path(record["idx"]))
+
+    async def run(self) -> None:
+        """Push every unfinished row through the copy -> QC -> render pipeline (see core.pipeline)."""
+        self.status = "running"
+        store = get_run_store()
+        try:
+            await asyncio.to_thread(store.set_run_status, self.id, "running")
+            await asyncio.to_thread(self.directory.mkdir, parents=True, exist_ok=True)
+            source, self._source = self._source, None
+            items = self._new_items(source) if source is not None else self._pending_items()
+            self.pipeline = build_onepager_pipeline(on_stage=self._on_stage, after_stage=self._after_stage)
+            async for item in self.pipeline.run(items):
+                row = self.rows[item.index]
+                if item.error:
+                    await self._set_row(row, FAILED, error=f"{item.failed_stage}: {item.error}")
+                else:
+                    await self._set_row(row, DONE, qc_status=item.qc.overall_status if item.qc else None)
+            self.status = "done"
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+            for row in self.rows:
+                if row.status not in (DONE, FAILED):
+                    await self._set_row(row, FAILED, error=f"Job failed: {e}")
+        finally:
+            await asyncio.to_thread(store.set_run_status, self.id, self.status)
+            async with self._changed:
+                self.finished_at = time.time()
+                self._changed.notify_all()
+
+    def start(self) -> None:
+        """Run the job in the background; rows that are not done start over from pending."""
+        self.status = "queued"
+        self.error = None
+        self.finished_at = None
+        for row in self.rows:
+            if row.status != DONE:
+                row.status = PENDING
+                row.error = None
+        self.events = [event for event in self.events if event["row"]["status"] == DONE]
+        self._task = asyncio.create_task(self.run())
+
+    # ---- download ---------------------------------------------------------
+
+    async def stream_zip(self) -> AsyncIterator[bytes]:
+        """
+        ZIP of every PDF, written in completion order as rows finish.
+
+        Entries are stored uncompressed (PDFs are already compressed); a
+        manifest.json with every row's final state closes the archive.
+        """
+        sink = _ZipSink()
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+            async for event in self.follow():
+                if event["event"] != "row" or event["row"]["status"] != DONE:
+                    continue
+                row = event["row"]
+                pdf_bytes = await asyncio.to_thread(self.pdf_path(row["index"]).read_bytes)
+                archive.writestr(row["filename"], pdf_bytes)
+                yield sink.take()
+            archive.writestr("manifest.json", json.dumps(self.summary(include_rows=True), indent=2))
+        yield sink.take()
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only, unseekable buffer; zipfile then writes a streamable archive."""
+
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer.extend(data)
+        return len(data)
+
+    def take(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class JobRunningError(Exception):
+    """Raised when resuming a job that is still running."""
+
+
+class JobManager:
+    """
+    Bulk jobs, loaded from the run store on first access.
+
+    Finished jobs (records and PDFs) are deleted settings.bulk_job_ttl seconds after they end.
+    """
+
+    def __init__(self):
+        self.jobs: Dict[str, BulkJob] = {}
+
+    def _prune(self) -> None:
+        """Delete expired jobs (SQLite and file I/O; run it in a thread)."""
+        store = get_run_store()
+        for job_id in store.expired_runs("api", time.time() - settings.bulk_job_ttl):
+            job = self.jobs.get(job_id)
+            if job is not None and job.running:
+                continue
+            self.jobs.pop(job_id, None)
+            store.delete_run(job_id)
+            shutil.rmtree(Path(settings.job_output_dir) / job_id, ignore_errors=True)
+
+    async def submit(self, briefs: Iterable[ProductBrief], template_id: str) -> BulkJob:
+        """Start a job in the running event loop; per-row template_id metadata overrides template_id."""
+        await asyncio.to_thread(self._prune)
+        job = await BulkJob.create(briefs, template_id)
+        self.jobs[job.id] = job
+        job.start()
+        return job
+
+    async def get(self, job_id: str) -> Optional[BulkJob]:
+        job = self.jobs.get(job_id)
+        if job is None:
+            job = await BulkJob.load(job_id)
+            if job is None:
+                return None
+            # Another request may have loaded it meanwhile
+            job = self.jobs.setdefault(job_id, job)
+        return job
+
+    async def resume(self, job_id: str) -> Optional[BulkJob]:
+        """Run a job's failed and unfinished rows again; rows with a PDF are kept."""
+        job = await self.get(job_id)
+        if job is None:
+            return None
+        if job.running:
+            raise JobRunningError(f"Job {job_id} is still running")
+        job.start()
+        return job
+
+
+_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    """Return the process-wide job manager."""
+    global _manager
+    if _manager is None:
+        _manager = JobManager()
+    return _manager
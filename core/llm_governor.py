@@ -0,0 +1,317 @@
+"""Process-wide governor for LLM calls: rate limit, adaptive concurrency and retries."""
+import asyncio
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+from config.settings import settings
+
+
+# HTTP status codes worth retrying (rate limited / transient server errors)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Exception class names raised by the provider SDKs for transient failures
+RETRYABLE_EXCEPTION_NAMES = {
+    "ResourceExhausted",
+    "TooManyRequests",
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+    "InternalServerError",
+    "RateLimitError",
+    "APITimeoutError",
+    "APIConnectionError",
+    "ReadTimeout",
+    "ConnectTimeout",
+    "TimeoutError",
+}
+
+
+def _status_code(exc: Exception) -> Optional[int]:
+    """Best-effort HTTP status code of a provider exception."""
+    for attr in ("status_code", "code", "http_status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_rate_limited(exc: Exception) -> bool:
+    """True if the exception signals a provider rate limit / quota error."""
+    return (
+        _status_code(exc) == 429
+        or type(exc).__name__ in ("ResourceExhausted", "TooManyRequests", "RateLimitError")
+    )
+
+
+def is_retryable(exc: Exception) -> bool:
+    """True if the call that raised exc may succeed when retried."""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    if _status_code(exc) in RETRYABLE_STATUS_CODES:
+        return True
+    return type(exc).__name__ in RETRYABLE_EXCEPTION_NAMES
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """Extract a server-provided retry delay (Retry-After header or gRPC RetryInfo)."""
+    value = getattr(exc, "retry_after", None)
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        header = headers.get("retry-after") or headers.get("Retry-After")
+        if header:
+            try:
+                return float(header)
+            except ValueError:
+                pass
+
+    # google.api_core errors carry RetryInfo as text, e.g. "retry_delay { seconds: 17 }"
+    match = re.search(r"retry_delay\s*\{\s*seconds:\s*(\d+)", str(exc))
+    if match:
+        return float(match.group(1))
+    return None
+
+
+class LLMGovernor:
+    """
+    Shared limiter for every outbound LLM call in the process.
+
+    - A token bucket caps the request rate (`rate` per second, `burst` deep).
+    - An AIMD concurrency limit grows by ~1 per window of fast successes and
+      shrinks multiplicatively on slow calls, errors and rate limiting.
+    - Retryable failures are retried with full-jitter exponential backoff;
+      a Retry-After hint pauses the whole bucket, not only the failing caller.
+
+    Sync callers (threads) and async callers (event loop tasks) share the
+    same limits via `call` and `acall`.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        target_latency: float,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+    ):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.min_limit = max(min_limit, 1)
+        self.max_limit = max(max_limit, self.min_limit)
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._lock = threading.Lock()
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._waiters = deque()
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.rate_limited = 0
+
+    # ---- token bucket -------------------------------------------------
+
+    def _reserve_token(self) -> float:
+        """Reserve one token; returns how long the caller must wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    # ---- concurrency limit ----------------------------------------------
+
+    def _grant_waiters(self) -> None:
+        """Hand free slots to queued waiters. Caller holds the lock."""
+        while self._waiters and self._in_flight < int(self._limit):
+            waiter = self._waiters.popleft()
+            self._in_flight += 1
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+            else:
+                loop, future = waiter
+                loop.call_soon_threadsafe(self._resolve_waiter, future)
+
+    def _resolve_waiter(self, future: asyncio.Future) -> None:
+        """Complete an async waiter, or give the slot back if it was cancelled."""
+        if future.cancelled():
+            self._release()
+        elif not future.done():
+            future.set_result(None)
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if not self._waiters and self._in_flight < int(self._limit):
+                self._in_flight += 1
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def _aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._waiters and self._in_flight < int(self._limit):
+                self._in_flight += 1
+                return
+            future = loop.create_future()
+            entry = (loop, future)
+            self._waiters.append(entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    raise
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._grant_waiters()
+
+    def _on_success(self, latency: float) -> None:
+        with self._lock:
+            if latency > self.target_latency:
+                self._limit = max(self.min_limit, self._limit * 0.9)
+            else:
+                self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+            self._grant_waiters()
+
+    def _on_failure(self, exc: Exception) -> Optional[float]:
+        """Shrink the limit after a failure; returns the delay before retrying."""
+        delay = retry_after_seconds(exc)
+        with self._lock:
+            if is_rate_limited(exc):
+                self.rate_limited += 1
+                self._limit = max(self.min_limit, self._limit * 0.5)
+                if delay is not None:
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            else:
+                self._limit = max(self.min_limit, self._limit * 0.75)
+        return delay
+
+    def _backoff(self, attempt: int, exc: Exception) -> Optional[float]:
+        """Delay before the next attempt, or None if the error should be raised."""
+        delay = self._on_failure(exc)
+        if attempt >= self.max_retries or not is_retryable(exc):
+            self.failures += 1
+            return None
+        self.retries += 1
+        if delay is not None:
+            return delay
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    # ---- public API -----------------------------------------------------
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking LLM call under the governor's limits."""
+        attempt = 0
+        while True:
+            wait = self._reserve_token()
+            if wait > 0:
+                time.sleep(wait)
+            self._acquire()
+            self.calls += 1
+            start = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                self._release()
+                delay = self._backoff(attempt, exc)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self._release()
+            self._on_success(time.monotonic() - start)
+            return result
+
+    async def acall(self, fn: Callable, *args, **kwargs) -> Any:
+        """Await an async LLM call (fn returns an awaitable) under the governor's limits."""
+        attempt = 0
+        while True:
+            wait = self._reserve_token()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await self._aacquire()
+            self.calls += 1
+            start = time.monotonic()
+            try:
+                result = await fn(*args, **kwargs)
+            except asyncio.CancelledError:
+                self._release()
+                raise
+            except Exception as exc:
+                self._release()
+                delay = self._backoff(attempt, exc)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self._release()
+            self._on_success(time.monotonic() - start)
+            return result
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of current limits and counters."""
+        with self._lock:
+            return {
+                "concurrency_limit": round(self._limit, 2),
+                "in_flight": self._in_flight,
+                "queued": len(self._waiters),
+                "calls": self.calls,
+                "retries": self.retries,
+                "failures": self.failures,
+                "rate_limited": self.rate_limited,
+            }
+
+
+_governor: Optional[LLMGovernor] = None
+_governor_lock = threading.Lock()
+
+
+def get_governor() -> LLMGovernor:
+    """Return the process-wide LLM governor, creating it from settings on first use."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = LLMGovernor(
+                rate=settings.llm_rate_limit_rps,
+                burst=settings.llm_rate_limit_burst,
+                initial_limit=settings.llm_initial_concurrency,
+                min_limit=settings.llm_min_concurrency,
+                max_limit=settings.llm_max_concurrency,
+                target_latency=settings.llm_target_latency,
+                max_retries=settings.llm_max_retries,
+                backoff_base=settings.llm_backoff_base,
+                backoff_max=settings.llm_backoff_max,
+            )
+    return _governor
@@ -0,0 +1,256 @@
+"""Offline LLM stand-ins: deterministic synthetic answers, recorded fixtures and an HTTP stand-in.
+
+Selected with LLM_PROVIDER:
+- synthetic: deterministic text derived from a hash of the prompt
+- replay:    answers served from the fixture store (llm_fixture_dir)
+- record:    calls llm_record_provider and writes every answer to the fixture store
+- http:      posts prompts to a local stand-in server (scripts/llm_standin.py)
+
+Synthetic and replay answers are delayed according to llm_synthetic_latency,
+so load tests see realistic timing without network access.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+import httpx
+from config.settings import settings
+from core.llm_providers import GenerationOptions, LLMProvider, get_provider, record_target_provider
+
+
+_WORDS = [
+    "smart", "reliable", "secure", "fast", "modern", "scalable", "simple", "powerful",
+    "automated", "insightful", "flexible", "seamless", "efficient", "trusted", "innovative",
+    "workflow", "analytics", "platform", "solution", "teams", "growth", "results", "quality",
+    "performance", "integration", "support", "experience", "value", "insights", "savings",
+]
+
+
+class LatencyModel:
+    """
+    Latency distribution parsed from a spec string.
+
+    Specs: "0" (none), "fixed:0.2", "uniform:0.1,0.8", "normal:0.5,0.1",
+    "lognormal:-0.7,0.5" (mu, sigma of the underlying normal). Seconds.
+    """
+
+    def __init__(self, spec: str, seed: int = 0):
+        self.spec = spec or "0"
+        self.seed = seed
+        kind, _, params = self.spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(p) for p in params.split(",") if p.strip()]
+        if self.kind not in ("0", "none", "fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self, key: str) -> float:
+        """Latency for a request; identical keys always get identical latencies."""
+        if self.kind in ("0", "none"):
+            return 0.0
+        rng = random.Random(f"{self.seed}:{key}")
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(self.params[0], self.params[1])
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(self.params[0], self.params[1]))
+        return rng.lognormvariate(self.params[0], self.params[1])
+
+
+def prompt_key(prompt: str, options: GenerationOptions) -> str:
+    """Stable fixture key for a prompt and its generation options."""
+    payload = json.dumps(
+        {"prompt": prompt, "options": options.model_dump()},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _synthetic_text(seed: str, max_chars: int) -> str:
+    """Deterministic sentence of at most max_chars characters."""
+    digest = hashlib.sha256(seed.encode("utf-8")).digest()
+    words = []
+    length = 0
+    for i in range(64):
+        word = _WORDS[(digest[i % len(digest)] + i) % len(_WORDS)]
+        if length + len(word) + 2 > max_chars:
+            break
+        words.append(word)
+        length += len(word) + 1
+    if not words:
+        return _WORDS[digest[0] % len(_WORDS)][:max_chars]
+    return (" ".join(words).capitalize() + ".")[:max_chars]
+
+
+def _synthesize_from_schema(schema: Dict, seed: str):
+    """Build a value that satisfies a small JSON-schema subset."""
+    kind = schema.get("type", "string")
+    if "enum" in schema:
+        options = schema["enum"]
+        return options[hashlib.sha256(seed.encode("utf-8")).digest()[0] % len(options)]
+    if kind == "object":
+        return {
+            name: _synthesize_from_schema(prop, f"{seed}/{name}")
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        count = schema.get("minItems", schema.get("maxItems", 3))
+        items = schema.get("prefixItems")
+        if items:
+            return [_synthesize_from_schema(item, f"{seed}/{i}") for i, item in enumerate(items)]
+        return [_synthesize_from_schema(schema.get("items", {}), f"{seed}/{i}") for i in range(count)]
+    return _synthetic_text(seed, schema.get("maxLength", 120))
+
+
+def synthesize_response(prompt: str, options: GenerationOptions) -> str:
+    """Deterministic answer for a prompt, shaped like a real model answer."""
+    seed = prompt_key(prompt, options)
+    if options.json_mode:
+        schema = options.response_schema or {"type": "object", "properties": {}}
+        return json.dumps(_synthesize_from_schema(schema, seed), ensure_ascii=False)
+    match = re.search(r"Maximum (\d+) characters", prompt)
+    return _synthetic_text(seed, int(match.group(1)) if match else 120)
+
+
+class FixtureStore:
+    """Directory of recorded answers, one JSON file per prompt key."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["response"]
+
+    def put(self, key: str, prompt: str, options: GenerationOptions, response: str, source: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"prompt": prompt, "options": options.model_dump(), "response": response, "source": source},
+                f, indent=2, ensure_ascii=False
+            )
+        tmp_path.replace(path)
+
+
+class SyntheticProvider(LLMProvider):
+    """Deterministic generator; needs no network or credentials."""
+
+    name = "synthetic"
+
+    def __init__(self, model: str):
+        super().__init__(model)
+        self.latency = LatencyModel(settings.llm_synthetic_latency, settings.llm_synthetic_seed)
+
+    def _answer(self, prompt: str, options: GenerationOptions) -> str:
+        return synthesize_response(prompt, options)
+
+    def generate(self, prompt: str, options: GenerationOptions) -> str:
+        time.sleep(self.latency.sample(prompt_key(prompt, options)))
+        return self._answer(prompt, options)
+
+    async def agenerate(self, prompt: str, options: GenerationOptions) -> str:
+        await asyncio.sleep(self.latency.sample(prompt_key(prompt, options)))
+        return self._answer(prompt, options)
+
+
+class ReplayProvider(SyntheticProvider):
+    """Serves recorded fixtures; misses raise or fall back to synthetic answers."""
+
+    name = "replay"
+
+    def __init__(self, model: str):
+        super().__init__(model)
+        self.store = FixtureStore(settings.llm_fixture_dir)
+
+    def _answer(self, prompt: str, options: GenerationOptions) -> str:
+        response = self.store.get(prompt_key(prompt, options))
+        if response is not None:
+            return response
+        if settings.llm_replay_miss == "synthetic":
+            return synthesize_response(prompt, options)
+        raise LookupError(f"No recorded fixture for prompt {prompt_key(prompt, options)[:12]}")
+
+
+class RecordingProvider(LLMProvider):
+    """Wraps a real provider and records every answer into the fixture store."""
+
+    name = "record"
+
+    def __init__(self, model: str):
+        super().__init__(model)
+        self.target = record_target_provider()
+        self.store = FixtureStore(settings.llm_fixture_dir)
+        self._lock = threading.Lock()
+
+    @property
+    def inner(self) -> LLMProvider:
+        return get_provider(self.target, self.model)
+
+    def _record(self, prompt: str, options: GenerationOptions, response: str) -> str:
+        with self._lock:
+            self.store.put(prompt_key(prompt, options), prompt, options, response, self.inner.name)
+        return response
+
+    def generate(self, prompt: str, options: GenerationOptions) -> str:
+        return self._record(prompt, options, self.inner.generate(prompt, options))
+
+    async def agenerate(self, prompt: str, options: GenerationOptions) -> str:
+        return self._record(prompt, options, await self.inner.agenerate(prompt, options))
+
+
+class HTTPStandInProvider(LLMProvider):
+    """Client for the local stand-in server (scripts/llm_standin.py)."""
+
+    name = "http"
+
+    def __init__(self, model: str):
+        super().__init__(model)
+        self.url = settings.llm_standin_url.rstrip("/") + "/generate"
+        self._client = httpx.Client(timeout=60)
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_loop = None
+
+    def _payload(self, prompt: str, options: GenerationOptions) -> dict:
+        return {"prompt": prompt, "options": options.model_dump(), "model": self.model}
+
+    def generate(self, prompt: str, options: GenerationOptions) -> str:
+        response = self._client.post(self.url, json=self._payload(prompt, options))
+        response.raise_for_status()
+        return response.json()["text"]
+
+    async def agenerate(self, prompt: str, options: GenerationOptions) -> str:
+        # AsyncClient binds to the running loop, so create one per loop
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = httpx.AsyncClient(timeout=60)
+            self._async_loop = loop
+        response = await self._async_client.post(self.url, json=self._payload(prompt, options))
+        response.raise_for_status()
+        return response.json()["text"]
+
+    async def aclose(self) -> None:
+        client, self._async_client = self._async_client, None
+        if client is not None and self._async_loop is asyncio.get_running_loop():
+            await client.aclose()
+        self._async_loop = None
+
+
+OFFLINE_PROVIDERS = {
+    "synthetic": SyntheticProvider,
+    "replay": ReplayProvider,
+    "record": RecordingProvider,
+    "http": HTTPStandInProvider,
+}
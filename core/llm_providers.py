@@ -0,0 +1,479 @@
+"""Pluggable LLM provider layer (Gemini / OpenAI / Anthropic) with optional hedging."""
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from config.settings import settings
+from core.llm_governor import get_governor
+
+
+class GenerationOptions(BaseModel):
+    """Provider-independent generation parameters."""
+    json_mode: bool = False
+    max_output_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    stop_sequences: Optional[List[str]] = None
+    # JSON-schema subset describing the expected answer. Not sent to the
+    # providers; offline stand-ins use it to synthesize well-formed JSON.
+    response_schema: Optional[Dict] = None
+
+
+def is_thinking_model(model: str) -> bool:
+    """True if the model reasons before answering (see settings.llm_thinking_models)."""
+    name = model.split("/")[-1].lower()
+    prefixes = [prefix.strip().lower() for prefix in settings.llm_thinking_models.split(",") if prefix.strip()]
+    return any(name.startswith(prefix) for prefix in prefixes)
+
+
+class LLMProvider(ABC):
+    """Base class for LLM provider adapters. One instance per (provider, model)."""
+
+    name: str
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def output_token_limit(self, options: GenerationOptions) -> Optional[int]:
+        """
+        Output cap to send for a call, or None to send none.
+
+        Thinking models count their reasoning toward the cap, so a cap sized
+        for the visible answer leaves them no room to think and the call
+        returns no text. They get the answer budget plus
+        settings.llm_thinking_token_budget for reasoning.
+        """
+        if options.max_output_tokens is None:
+            return None
+        if is_thinking_model(self.model):
+            return options.max_output_tokens + settings.llm_thinking_token_budget
+        return options.max_output_tokens
+
+    @abstractmethod
+    def generate(self, prompt: str, options: GenerationOptions) -> str:
+        """Return the model's text answer for prompt (blocking)."""
+        pass
+
+    @abstractmethod
+    async def agenerate(self, prompt: str, options: GenerationOptions) -> str:
+        """Return the model's text answer for prompt (async)."""
+        pass
+
+    async def aclose(self) -> None:
+        """Release connections held by the provider (no-op for SDK clients)."""
+        pass
+
+
+_gemini_configured = False
+_gemini_lock = threading.Lock()
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini via google-generativeai."""
+
+    name = "gemini"
+
+    def __init__(self, model: str):
+        global _gemini_configured
+        if not settings.google_api_key:
+            raise ValueError("GOOGLE_API_KEY not set in environment")
+        import google.generativeai as genai
+        with _gemini_lock:
+            if not _gemini_configured:
+                genai.configure(api_key=settings.google_api_key)
+                _gemini_configured = True
+        # Ensure model name includes 'models/' prefix if not already present
+        model_name = model if model.startswith("models/") else f"models/{model}"
+        super().__init__(model)
+        self._client = genai.GenerativeModel(model_name)
+
+    def _generation_config(self, options: GenerationOptions) -> Optional[dict]:
+        config = {}
+        if options.json_mode:
+            config["response_mime_type"] = "application/json"
+        max_output_tokens = self.output_token_limit(options)
+        if max_output_tokens:
+            config["max_output_tokens"] = max_output_tokens
+        if options.temperature is not None:
+            config["temperature"] = options.temperature
+        if options.stop_sequences:
+            config["stop_sequences"] = options.stop_sequences
+        return config or None
+
+    @staticmethod
+    def _get_text(response) -> str:
+        """Extract text from Gemini API response."""
+        try:
+            if hasattr(response, 'text'):
+                return response.text.strip()
+            elif hasattr(response, 'candidates') and response.candidates:
+                return response.candidates[0].content.parts[0].text.strip()
+            else:
+                return str(response).strip()
+        except Exception as e:
+            raise ValueError(f"Failed to extract text from Gemini response: {e}")
+
+    def generate(self, prompt: str, options: GenerationOptions) -> str:
+        response = self._client.generate_content(
+            prompt, generation_config=self._generation_config(options)
+        )
+        return self._get_text(response)
+
+    async def agenerate(self, prompt: str, options: GenerationOptions) -> str:
+        response = await self._client.generate_content_async(
+            prompt, generation_config=self._generation_config(options)
+        )
+        return self._get_text(response)
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI chat completions."""
+
+    name = "openai"
+
+    def __init__(self, model: str):
+        if not settings.openai_api_key:
+            raise ValueError("OPENAI_API_KEY not set in environment")
+        import openai
+        super().__init__(model)
+        self._client = openai.OpenAI(api_key=settings.openai_api_key)
+        self._async_client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
+
+    def _request(self, prompt: str, options: GenerationOptions) -> dict:
+        request = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        if options.json_mode:
+            request["response_format"] = {"type": "json_object"}
+        max_output_tokens = self.output_token_limit(options)
+        if max_output_tokens:
+            # Reasoning models reject max_tokens; their cap covers reasoning and answer
+            cap_key = "max_completion_tokens" if is_thinking_model(self.model) else "max_tokens"
+            request[cap_key] = max_output_tokens
+        if options.temperature is not None:
+            request["temperature"] = options.temperature
+        if options.stop_sequences:
+            # OpenAI accepts at most 4 stop sequences
+            request["stop"] = options.stop_sequences[:4]
+        return request
+
+    def generate(self, prompt: str, options: GenerationOptions) -> str:
+        response = self._client.chat.completions.create(**self._request(prompt, options))
+        return (response.choices[0].message.content or "").strip()
+
+    async def agenerate(self, prompt: str, options: GenerationOptions) -> str:
+        response = await self._async_client.chat.completions.create(**self._request(prompt, options))
+        return (response.choices[0].message.content or "").strip()
+
+
+class AnthropicProvider(LLMProvider):
+    """Anthropic messages API."""
+
+    name = "anthropic"
+
+    # The messages API requires an explicit output budget
+    default_max_tokens = 1024
+
+    def __init__(self, model: str):
+        if not settings.anthropic_api_key:
+            raise ValueError("ANTHROPIC_API_KEY not set in environment")
+        import anthropic
+        super().__init__(model)
+        self._client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+        self._async_client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+
+    def _request(self, prompt: str, options: GenerationOptions) -> dict:
+        request = {
+            "model": self.model,
+            "max_tokens": self.output_token_limit(options) or self.default_max_tokens,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        if options.temperature is not None:
+            request["temperature"] = options.temperature
+        if options.stop_sequences:
+            # Anthropic rejects whitespace-only stop sequences
+            stops = [stop for stop in options.stop_sequences if stop.strip()]
+            if stops:
+                request["stop_sequences"] = stops
+        return request
+
+    @staticmethod
+    def _get_text(response) -> str:
+        return "".join(
+            block.text for block in response.content if getattr(block, "type", "") == "text"
+        ).strip()
+
+    def generate(self, prompt: str, options: GenerationOptions) -> str:
+        return self._get_text(self._client.messages.create(**self._request(prompt, options)))
+
+    async def agenerate(self, prompt: str, options: GenerationOptions) -> str:
+        return self._get_text(await self._async_client.messages.create(**self._request(prompt, options)))
+
+
+PROVIDERS = {
+    "gemini": GeminiProvider,
+    "openai": OpenAIProvider,
+    "anthropic": AnthropicProvider,
+}
+
+# Offline stand-ins for load and regression testing, see core/llm_offline.py
+OFFLINE_PROVIDER_NAMES = ("synthetic", "replay", "record", "http")
+
+
+def _provider_class(provider_name: str):
+    if provider_name in OFFLINE_PROVIDER_NAMES:
+        from core.llm_offline import OFFLINE_PROVIDERS
+        return OFFLINE_PROVIDERS[provider_name]
+    if provider_name not in PROVIDERS:
+        raise NotImplementedError(f"LLM provider '{provider_name}' not implemented yet")
+    return PROVIDERS[provider_name]
+
+
+def record_target_provider() -> str:
+    """Provider the "record" stand-in wraps (settings.llm_record_provider)."""
+    if settings.llm_record_provider == "record":
+        raise ValueError("LLM_RECORD_PROVIDER cannot be 'record' (the recorder would wrap itself)")
+    return settings.llm_record_provider
+
+
+def default_model(provider_name: str) -> str:
+    """Configured model name for a provider."""
+    if provider_name == "record":
+        return default_model(record_target_provider())
+    return {
+        "gemini": settings.gemini_model,
+        "openai": settings.openai_model,
+        "anthropic": settings.anthropic_model,
+    }.get(provider_name, provider_name)
+
+
+def is_provider_configured(provider_name: Optional[str] = None) -> bool:
+    """True if the credentials the provider needs are present."""
+    provider_name = provider_name or settings.llm_provider
+    if provider_name == "record":
+        return is_provider_configured(record_target_provider())
+    if provider_name in OFFLINE_PROVIDER_NAMES:
+        return True
+    return bool({
+        "gemini": settings.google_api_key,
+        "openai": settings.openai_api_key,
+        "anthropic": settings.anthropic_api_key,
+    }.get(provider_name))
+
+
+_providers: Dict[Tuple[str, str], LLMProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(provider_name: Optional[str] = None, model: Optional[str] = None) -> LLMProvider:
+    """Return the cached provider client for (provider, model); created once per process."""
+    provider_name = provider_name or settings.llm_provider
+    provider_class = _provider_class(provider_name)
+    model = model or default_model(provider_name)
+    key = (provider_name, model)
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            provider = provider_class(model)
+            _providers[key] = provider
+    return provider
+
+
+async def close_providers() -> None:
+    """Close every cached provider's connections; call before the event loop ends."""
+    with _providers_lock:
+        providers = list(_providers.values())
+    for provider in providers:
+        await provider.aclose()
+
+
+class LatencyTracker:
+    """Sliding window of call latencies used to pick the hedging delay."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency at the given percentile, or None until enough samples exist."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+
+
+_latency_trackers: Dict[Tuple[str, str], LatencyTracker] = {}
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_lock = threading.Lock()
+
+# Counters for hedged requests: how many duplicates were sent and how many won
+hedge_stats = {"hedged": 0, "hedge_wins": 0, "hedges_skipped": 0}
+_hedge_stats_lock = threading.Lock()
+
+# Sync hedges whose loser may still be running (threads cannot be cancelled)
+_sync_hedge_slots: Optional[threading.BoundedSemaphore] = None
+
+
+def _count_hedge(name: str) -> None:
+    with _hedge_stats_lock:
+        hedge_stats[name] += 1
+
+
+def get_hedge_stats() -> Dict[str, int]:
+    """Snapshot of the hedging counters."""
+    with _hedge_stats_lock:
+        return dict(hedge_stats)
+
+
+def _latency_tracker(provider: LLMProvider) -> LatencyTracker:
+    key = (provider.name, provider.model)
+    with _hedge_lock:
+        tracker = _latency_trackers.get(key)
+        if tracker is None:
+            tracker = LatencyTracker()
+            _latency_trackers[key] = tracker
+    return tracker
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor, _sync_hedge_slots
+    with _hedge_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=settings.llm_max_concurrency * 2,
+                thread_name_prefix="llm-hedge"
+            )
+            _sync_hedge_slots = threading.BoundedSemaphore(max(1, settings.llm_max_concurrency // 4))
+    return _hedge_executor
+
+
+def _timed_call(provider: LLMProvider, tracker: LatencyTracker, prompt: str, options: GenerationOptions) -> str:
+    start = time.monotonic()
+    text = get_governor().call(provider.generate, prompt, options)
+    tracker.record(time.monotonic() - start)
+    return text
+
+
+async def _timed_acall(provider: LLMProvider, tracker: LatencyTracker, prompt: str, options: GenerationOptions) -> str:
+    start = time.monotonic()
+    text = await get_governor().acall(provider.agenerate, prompt, options)
+    tracker.record(time.monotonic() - start)
+    return text
+
+
+def _hedge_delay(tracker: LatencyTracker, hedge: Optional[bool]) -> Optional[float]:
+    if not (settings.llm_hedging_enabled if hedge is None else hedge):
+        return None
+    return tracker.percentile(settings.llm_hedge_percentile)
+
+
+def generate_text(
+    prompt: str,
+    options: Optional[GenerationOptions] = None,
+    provider: Optional[LLMProvider] = None,
+    hedge: Optional[bool] = None
+) -> str:
+    """
+    Run one LLM call through the governor.
+
+    With hedging enabled, a duplicate request is sent if the first has not
+    answered within the observed p90 latency; the first answer wins.
+
+    A thread cannot be cancelled, so the losing request runs to completion
+    in the background and holds its governor slot until then. To bound that
+    waste, at most llm_max_concurrency / 4 sync hedges are outstanding;
+    beyond that the call simply waits for the first request.
+    """
+    options = options or GenerationOptions()
+    provider = provider or get_provider()
+    tracker = _latency_tracker(provider)
+    delay = _hedge_delay(tracker, hedge)
+    if delay is None:
+        return _timed_call(provider, tracker, prompt, options)
+
+    executor = _get_hedge_executor()
+    primary = executor.submit(_timed_call, provider, tracker, prompt, options)
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+
+    if not _sync_hedge_slots.acquire(blocking=False):
+        _count_hedge("hedges_skipped")
+        return primary.result()
+    _count_hedge("hedged")
+    secondary = executor.submit(_timed_call, provider, tracker, prompt, options)
+    # The slot is freed once both requests are over, including the loser
+    remaining = [2]
+    slot_lock = threading.Lock()
+
+    def _release(_future) -> None:
+        with slot_lock:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                _sync_hedge_slots.release()
+
+    primary.add_done_callback(_release)
+    secondary.add_done_callback(_release)
+    pending = {primary, secondary}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is secondary:
+                    _count_hedge("hedge_wins")
+                for loser in pending:
+                    loser.cancel()  # only succeeds while it is still queued
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+async def agenerate_text(
+    prompt: str,
+    options: Optional[GenerationOptions] = None,
+    provider: Optional[LLMProvider] = None,
+    hedge: Optional[bool] = None
+) -> str:
+    """Async counterpart of generate_text; the losing hedge is cancelled."""
+    options = options or GenerationOptions()
+    provider = provider or get_provider()
+    tracker = _latency_tracker(provider)
+    delay = _hedge_delay(tracker, hedge)
+    if delay is None:
+        return await _timed_acall(provider, tracker, prompt, options)
+
+    primary = asyncio.create_task(_timed_acall(provider, tracker, prompt, options))
+    pending = {primary}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return primary.result()
+
+        _count_hedge("hedged")
+        secondary = asyncio.create_task(_timed_acall(provider, tracker, prompt, options))
+        pending = {primary, secondary}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is secondary:
+                        _count_hedge("hedge_wins")
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,68 @@
+"""Per-slot routing between fast and quality model tiers."""
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from config.settings import settings
+
+
+FAST = "fast"
+QUALITY = "quality"
+
+_DEFAULT_RULES = {"default": FAST, "slots": {}, "audiences": {}, "templates": {}}
+
+_rules: Optional[Dict] = None
+_rules_lock = threading.Lock()
+
+
+def load_routing_rules() -> Dict:
+    """
+    Load routing rules from settings.model_routing_file (cached).
+
+    Format:
+        {
+            "default": "fast",
+            "slots": {"title": "fast", "intro": "quality"},
+            "audiences": {"B2C": {"intro": "quality"}},
+            "templates": {"template_03": {"intro": "quality"}}
+        }
+    """
+    global _rules
+    with _rules_lock:
+        if _rules is None:
+            path = Path(settings.model_routing_file)
+            rules = dict(_DEFAULT_RULES)
+            if path.exists():
+                with open(path, "r", encoding="utf-8") as f:
+                    rules.update(json.load(f))
+            _rules = rules
+    return _rules
+
+
+def route_tier(slot_type: str, template_id: Optional[str] = None, audience: Optional[str] = None) -> str:
+    """
+    Pick the model tier for a slot.
+
+    Most specific rule wins: template > audience > slot type > default.
+    """
+    if not settings.model_routing_enabled:
+        return QUALITY
+    rules = load_routing_rules()
+    if template_id and slot_type in rules["templates"].get(template_id, {}):
+        return rules["templates"][template_id][slot_type]
+    if audience and slot_type in rules["audiences"].get(audience, {}):
+        return rules["audiences"][audience][slot_type]
+    return rules["slots"].get(slot_type, rules["default"])
+
+
+def model_for_tier(tier: str, provider_name: Optional[str] = None) -> Optional[str]:
+    """
+    Model name for a tier; None means the provider's configured default.
+
+    Only Gemini has a separate fast tier today; other providers use their
+    configured model for both tiers.
+    """
+    provider_name = provider_name or settings.llm_provider
+    if provider_name == "gemini" and tier == FAST:
+        return settings.gemini_fast_model
+    return None
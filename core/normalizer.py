@@ -1,65 +1,159 @@
 """Input normalization - converts CSV/Excel/JSON to ProductBrief."""
-import pandas as pd
 import json
 from pathlib import Path
-from typing import Union, List
+from typing import IO, Iterator, List, Optional, Union
 from models.product_brief import ProductBrief, ProductType, TargetAudience
+from config.settings import settings
 
 
-def normalize_csv(csv_path: Union[str, Path]) -> List[ProductBrief]:
+# Optional CSV columns kept in ProductBrief.metadata (in this order)
+METADATA_COLUMNS = ["price", "cta", "images", "url", "template_id"]
+
+# Metadata columns whose numeric cells become floats (other text, e.g. "€99/month", is kept)
+NUMERIC_METADATA_COLUMNS = ["price"]
+
+
+def normalize_csv(csv_path: Union[str, Path, IO]) -> List[ProductBrief]:
     """
     Normalize CSV input to ProductBrief objects.
     
     Expected CSV columns:
     - product_id, type, name, description, category, features, target_audience, language
+    - optional: price, cta, images, url, template_id (per-row template)
+    
+    Loads every row; use iter_csv_briefs / iter_csv_batches to stream large files.
     
     Args:
-        csv_path: Path to CSV file
+        csv_path: Path to CSV file, or a file object (e.g. an upload read into memory)
         
     Returns:
         List of ProductBrief objects
     """
-    df = pd.read_csv(csv_path)
+    return list(iter_csv_briefs(csv_path))
+
+
+def iter_csv_briefs(csv_path: Union[str, Path, IO], chunk_size: Optional[int] = None) -> Iterator[ProductBrief]:
+    """
+    Stream ProductBriefs from a CSV, parsing chunk_size rows at a time.
     
-    # Normalize column names (case-insensitive, handle spaces)
-    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+    Memory is bounded by the chunk size (default settings.csv_chunk_size),
+    and the first briefs are available before the file has been read.
+    """
+    for batch in iter_csv_batches(csv_path, chunk_size):
+        yield from batch
+
+
+def iter_csv_batches(csv_path: Union[str, Path, IO], chunk_size: Optional[int] = None) -> Iterator[List[ProductBrief]]:
+    """
+    Stream a CSV as lists of ProductBriefs, one list per chunk of rows.
+    
+    Every cell is read as text (pandas would infer dtypes per chunk, so ids
+    like "1" vs "1.0" would depend on where chunks start); numeric metadata
+    is converted explicitly.
+    """
+    import pandas as pd
+    
+    offset = 0
+    with pd.read_csv(csv_path, dtype=str, chunksize=chunk_size or settings.csv_chunk_size) as reader:
+        for chunk in reader:
+            # Normalize column names (case-insensitive, handle spaces)
+            chunk.columns = chunk.columns.str.strip().str.lower().str.replace(" ", "_")
+            yield _chunk_briefs(chunk, offset)
+            offset += len(chunk)
+
+
+def _chunk_briefs(chunk, offset: int) -> List[ProductBrief]:
+    """
+    ProductBriefs for one chunk of rows.
+    
+    Columns are parsed with vectorized pandas operations; only the final
+    ProductBrief construction runs per row. Empty cells get the same
+    defaults as missing columns.
+    """
+    product_ids = _cells(chunk, "product_id")
+    names = _cells(chunk, "name")
+    descriptions = _cells(chunk, "description")
+    categories = _cells(chunk, "category")
+    languages = _cells(chunk, "language")
+    types = _enum_column(chunk, "type", ProductType, "product", offset)
+    audiences = _enum_column(chunk, "target_audience", TargetAudience, "B2B", offset)
+    features = _list_column(chunk, "features")
+    
+    metadata_columns = [column for column in METADATA_COLUMNS if column in chunk.columns]
+    metadata_cells = {column: _cells(chunk, column) for column in metadata_columns}
+    for column in NUMERIC_METADATA_COLUMNS:
+        if column in metadata_cells:
+            metadata_cells[column] = _numeric_cells(chunk, column)
+    if "images" in metadata_cells:
+        images = _list_column(chunk, "images")
+        metadata_cells["images"] = [
+            images[i] if isinstance(value, str) else value
+            for i, value in enumerate(metadata_cells["images"])
+        ]
     
     briefs = []
-    for _, row in df.iterrows():
-        # Parse features (can be comma-separated string or list)
-        features = []
-        if "features" in row and pd.notna(row["features"]):
-            if isinstance(row["features"], str):
-                features = [f.strip() for f in row["features"].split(",") if f.strip()]
-            elif isinstance(row["features"], list):
-                features = row["features"]
-        
-        # Parse metadata (optional columns)
-        metadata = {}
-        optional_cols = ["price", "cta", "images", "url"]
-        for col in optional_cols:
-            if col in row and pd.notna(row[col]):
-                if col == "images" and isinstance(row[col], str):
-                    metadata[col] = [img.strip() for img in row[col].split(",") if img.strip()]
-                else:
-                    metadata[col] = row[col]
-        
-        brief = ProductBrief(
-            product_id=str(row.get("product_id", f"PROD-{len(briefs)+1}")),
-            type=ProductType(row.get("type", "product").lower()),
-            name=str(row.get("name", "")),
-            description=str(row.get("description", "")),
-            category=str(row.get("category", "")) if pd.notna(row.get("category")) else None,
-            features=features,
-            target_audience=TargetAudience(row.get("target_audience", "B2B").upper()),
-            language=str(row.get("language", "en")),
+    for i in range(len(chunk)):
+        metadata = {
+            column: metadata_cells[column][i]
+            for column in metadata_columns
+            if metadata_cells[column][i] is not None
+        }
+        briefs.append(ProductBrief(
+            product_id=str(product_ids[i]) if product_ids[i] is not None else f"PROD-{offset + i + 1}",
+            type=types[i],
+            name=str(names[i]) if names[i] is not None else "",
+            description=str(descriptions[i]) if descriptions[i] is not None else "",
+            category=str(categories[i]) if categories[i] is not None else None,
+            features=features[i],
+            target_audience=audiences[i],
+            language=str(languages[i]) if languages[i] is not None else "en",
             metadata=metadata
-        )
-        briefs.append(brief)
-    
+        ))
     return briefs
 
 
+def _cells(chunk, column: str) -> list:
+    """Plain Python values of a column; None for empty cells and missing columns."""
+    if column not in chunk.columns:
+        return [None] * len(chunk)
+    values = chunk[column].astype(object)
+    return values.where(values.notna(), None).tolist()
+
+
+def _numeric_cells(chunk, column: str) -> list:
+    """Like _cells, with numeric text converted to float."""
+    import pandas as pd
+    
+    text = chunk[column].astype(object)
+    numbers = pd.to_numeric(text.str.strip(), errors="coerce").astype(float).astype(object)
+    values = numbers.where(numbers.notna(), text)
+    return values.where(text.notna(), None).tolist()
+
+
+def _list_column(chunk, column: str) -> List[List[str]]:
+    """Comma-separated text cells -> stripped, non-empty items ([] for empty or non-text cells)."""
+    empty = [[] for _ in range(len(chunk))]
+    if column not in chunk.columns or chunk[column].isna().all():
+        return empty
+    values = chunk[column].astype(object)
+    lists = values.where(values.map(type) == str).str.strip().str.split(r"\s*,\s*", regex=True)
+    return [[item for item in items if item] if isinstance(items, list) else [] for items in lists.tolist()]
+
+
+def _enum_column(chunk, column: str, enum, default: str, offset: int) -> list:
+    """Enum members for a column (case-insensitive); empty cells get the default."""
+    if column not in chunk.columns:
+        return [enum(default)] * len(chunk)
+    lookup = {member.value.lower(): member for member in enum}
+    text = chunk[column].astype(object).where(chunk[column].notna(), default).astype(str).str.strip().str.lower()
+    members = text.map(lookup)
+    invalid = members.isna()
+    if invalid.any():
+        position = int(invalid.to_numpy().argmax())
+        raise ValueError(f"Row {offset + position + 2}: invalid {column} {text.iloc[position]!r}")
+    return members.tolist()
+
+
 def normalize_json(json_path: Union[str, Path]) -> List[ProductBrief]:
     """
     Normalize JSON input to ProductBrief objects.
@@ -0,0 +1,316 @@
+"""
+Staged pipeline: briefs flow copy -> QC -> render through bounded queues.
+
+Each stage runs its own workers, so LLM calls for later products overlap
+with QC and rendering of earlier ones. Full queues block the stage before
+them (backpressure), which keeps memory bounded by the queue sizes.
+"""
+import asyncio
+import inspect
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+from models.product_brief import ProductBrief
+from core.copy_generator import CopySlots, escalate_failed_slots_async, fit_copy_to_template, generate_copy_batch_async, trimmed_slots
+from core.qc_engine import QCCheck, QCResult, check_quality, merge_layout_checks
+from core.render_service import get_render_service
+from config.settings import settings
+
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One pipeline step.
+
+    `handler(item)` is awaited per item; with batch_size > 1 (or batched=True)
+    it is awaited with a list of up to batch_size items (waiting at most
+    `linger` seconds to fill a batch). `concurrency` workers run the handler
+    in parallel.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[None]],
+        concurrency: int = 1,
+        batch_size: int = 1,
+        linger: float = 0.05,
+        batched: Optional[bool] = None,
+    ):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.linger = linger
+        self.batched = batched if batched is not None else self.batch_size > 1
+        self.processed = 0
+        self.failed = 0
+        self.busy = 0.0  # summed handler seconds
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "batch_size": self.batch_size,
+            "processed": self.processed,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy, 3),
+        }
+
+
+class StagePipeline:
+    """
+    Runs items through stages connected by bounded asyncio queues.
+
+    Items need `error` and `failed_stage` attributes. A handler that raises
+    marks its items failed; failed items skip the remaining stages and are
+    yielded like finished ones, in completion order.
+    `on_stage(item, stage_name)` is called before a stage handles an item,
+    `after_stage(item, stage_name)` after it (also when the item failed).
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        queue_size: int = 64,
+        on_stage: Optional[Callable[[Any, str], Any]] = None,
+        after_stage: Optional[Callable[[Any, str], Any]] = None,
+    ):
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.on_stage = on_stage
+        self.after_stage = after_stage
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    async def _feed(self, source, queue: asyncio.Queue) -> None:
+        if hasattr(source, "__aiter__"):
+            async for item in source:
+                await queue.put(item)
+        elif isinstance(source, (list, tuple)):
+            for item in source:
+                await queue.put(item)
+        else:
+            # Sync sources (e.g. a CSV reader) may block; pull them from a thread
+            iterator = iter(source)
+            while True:
+                item = await asyncio.to_thread(next, iterator, _DONE)
+                if item is _DONE:
+                    break
+                await queue.put(item)
+        await queue.put(_DONE)
+
+    async def _take(self, stage: Stage, queue: asyncio.Queue) -> List[Any]:
+        """Next batch for a worker; a trailing _DONE means the input is exhausted."""
+        first = await queue.get()
+        batch = [first]
+        if first is _DONE:
+            return batch
+        deadline = time.monotonic() + stage.linger
+        while len(batch) < stage.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(queue.get(), timeout)
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+            batch.append(item)
+            if item is _DONE:
+                break
+        return batch
+
+    @staticmethod
+    async def _notify(callback, items: List[Any], stage_name: str) -> None:
+        if callback:
+            for item in items:
+                result = callback(item, stage_name)
+                if inspect.isawaitable(result):
+                    await result
+
+    async def _process(self, stage: Stage, items: List[Any]) -> None:
+        await self._notify(self.on_stage, items, stage.name)
+        start = time.perf_counter()
+        try:
+            await stage.handler(items if stage.batched else items[0])
+        except Exception as e:
+            for item in items:
+                item.error = item.error or str(e)
+        stage.busy += time.perf_counter() - start
+        for item in items:
+            if item.error and not item.failed_stage:
+                item.failed_stage = stage.name
+                stage.failed += 1
+            else:
+                stage.processed += 1
+        await self._notify(self.after_stage, items, stage.name)
+
+    async def _work(self, stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue, remaining: List[int]) -> None:
+        exhausted = False
+        while not exhausted:
+            batch = await self._take(stage, inbox)
+            if batch[-1] is _DONE:
+                batch.pop()
+                exhausted = True
+                await inbox.put(_DONE)  # let sibling workers see the end too
+            pending = [item for item in batch if not item.error]
+            if pending:
+                await self._process(stage, pending)
+            for item in batch:
+                await outbox.put(item)
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            await outbox.put(_DONE)
+
+    async def run(self, source: Union[Iterable[Any], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """Feed source through every stage; yields items as they leave the last stage."""
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        tasks = [asyncio.create_task(self._feed(source, queues[0]))]
+        for index, stage in enumerate(self.stages):
+            remaining = [stage.concurrency]
+            for _ in range(stage.concurrency):
+                tasks.append(asyncio.create_task(self._work(stage, queues[index], queues[index + 1], remaining)))
+        self.started_at = time.perf_counter()
+        try:
+            while True:
+                getter = asyncio.ensure_future(queues[-1].get())
+                # Surface crashes of the feeder or a worker instead of waiting forever
+                done, _ = await asyncio.wait([getter, *tasks], return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                    for task in done:
+                        if task.exception() is not None:
+                            raise task.exception()
+                    tasks = [task for task in tasks if not task.done()]
+                    continue
+                item = getter.result()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            self.finished_at = time.perf_counter()
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-stage counters; the stage with the most busy time per worker is the bottleneck."""
+        elapsed = (self.finished_at or time.perf_counter()) - (self.started_at or time.perf_counter())
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "stages": {stage.name: stage.stats() for stage in self.stages},
+        }
+
+
+class OnepagerItem:
+    """One product moving through the onepager pipeline."""
+
+    def __init__(self, index: int, brief: ProductBrief, template, output_path: Optional[Union[str, Path]] = None):
+        self.index = index
+        self.brief = brief
+        self.template = template
+        self.output_path = str(output_path) if output_path else None
+        self.copy: Optional[CopySlots] = None
+        self.qc: Optional[QCResult] = None
+        self.layout_checks: List[QCCheck] = []
+        self.pdf: Optional[bytes] = None  # only when there is no output_path
+        self.checked = False  # QC stage done (copy is final)
+        self.error: Optional[str] = None
+        self.failed_stage: Optional[str] = None
+
+
+async def _copy_stage(items: List[OnepagerItem]) -> None:
+    """One batched LLM request per template in the batch; items that already have copy are skipped."""
+    by_template: Dict[str, List[OnepagerItem]] = {}
+    for item in items:
+        if item.copy is not None:
+            continue
+        by_template.setdefault(item.template.template_id, []).append(item)
+    for template_id, group in by_template.items():
+        template = group[0].template
+        try:
+            copies = await generate_copy_batch_async(
+                [item.brief for item in group],
+                template.get_slot_limits(),
+                batch_size=len(group),
+                template_id=template_id,
+            )
+        except Exception as e:
+            for item in group:
+                item.error = f"Copy generation failed: {e}"
+            continue
+        for item, copy in zip(group, copies):
+            item.copy = copy
+
+
+def _qc_stage(check: bool) -> Callable[[OnepagerItem], Awaitable[None]]:
+    async def _qc(item: OnepagerItem) -> None:
+        """Run QC, escalate failing slots once and trim what still overflows (as generate_copy_checked)."""
+        if item.checked:
+            return
+        template = item.template
+        copy = item.copy
+        if check:
+            qc_result = check_quality(template, copy)
+            copy = await escalate_failed_slots_async(item.brief, template, copy, qc_result)
+        fitted = fit_copy_to_template(template, copy)
+        if check:
+            if fitted is not item.copy:
+                qc_result = check_quality(template, fitted)
+                qc_result.fixes_applied = trimmed_slots(copy, fitted)
+            item.qc = qc_result
+        item.copy = fitted
+        item.checked = True
+    return _qc
+
+
+async def _render_stage(item: OnepagerItem) -> None:
+    pdf_bytes, layout_checks = await get_render_service().render_checked(
+        item.template, item.copy, item.brief.name, item.output_path
+    )
+    # A PDF written to output_path is not kept; a long run would hold every finished PDF
+    item.pdf = pdf_bytes if item.output_path is None else None
+    item.layout_checks = layout_checks
+    if item.qc is not None:
+        item.qc = merge_layout_checks(item.qc, layout_checks)
+
+
+def build_onepager_pipeline(
+    check: bool = True,
+    copy_concurrency: Optional[int] = None,
+    qc_concurrency: Optional[int] = None,
+    render_concurrency: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    queue_size: Optional[int] = None,
+    on_stage: Optional[Callable[[Any, str], Any]] = None,
+    after_stage: Optional[Callable[[Any, str], Any]] = None,
+) -> StagePipeline:
+    """
+    copy -> qc -> render pipeline for OnepagerItems (knobs default to settings).
+
+    Args:
+        check: Run QC and escalation (False only fits copy to the template)
+        copy_concurrency: LLM batch requests in flight
+        qc_concurrency: Products in QC at once (escalation calls the LLM)
+        render_concurrency: Renders in flight; 0 = render service worker count
+        batch_size: Products per LLM request
+        queue_size: Items buffered between two stages
+        on_stage: Called as on_stage(item, stage_name) before a stage handles an item
+        after_stage: Called as after_stage(item, stage_name) once the stage is done with it
+                     (e.g. RunStore.record_stage, to make the run resumable)
+    """
+    render_concurrency = render_concurrency if render_concurrency is not None else settings.pipeline_render_concurrency
+    return StagePipeline(
+        [
+            Stage(
+                "copy",
+                _copy_stage,
+                concurrency=copy_concurrency or settings.pipeline_copy_concurrency,
+                batch_size=batch_size or settings.batch_size,
+                batched=True,
+            ),
+            Stage("qc", _qc_stage(check), concurrency=qc_concurrency or settings.pipeline_qc_concurrency),
+            Stage("render", _render_stage, concurrency=render_concurrency or get_render_service().workers),
+        ],
+        queue_size=queue_size or settings.pipeline_queue_size,
+        on_stage=on_stage,
+        after_stage=after_stage,
+    )
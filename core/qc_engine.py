@@ -1,8 +1,9 @@
 """Quality control engine for onepager validation."""
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional, Tuple
 from templates.base import BaseTemplate
 from core.copy_generator import CopySlots
+from core.text_metrics import estimate_fit, slot_box
 from config.settings import settings
 
 
@@ -21,13 +22,19 @@ class QCResult(BaseModel):
     fixes_applied: List[str] = []
 
 
-def check_quality(template: BaseTemplate, copy: CopySlots) -> QCResult:
+# Layout tolerance in CSS px (sub-pixel rounding)
+LAYOUT_TOLERANCE = 1.0
+PT_TO_PX = 96 / 72
+
+
+def check_quality(template: BaseTemplate, copy: CopySlots, layout_checks: Optional[List[QCCheck]] = None) -> QCResult:
     """
     Perform quality control checks on template and copy.
     
     Args:
         template: Template instance
         copy: CopySlots with generated copy
+        layout_checks: Checks from check_layout on the rendered document, if available
         
     Returns:
         QCResult with check outcomes
@@ -55,6 +62,9 @@ def check_quality(template: BaseTemplate, copy: CopySlots) -> QCResult:
                     severity="medium"
                 ))
     
+    # Check 1b: Predicted overflow from font metrics (no render needed)
+    checks.extend(check_text_fit(template, copy))
+    
     # Check 2: Required slots filled
     required_slots = ["title", "intro"]
     for slot in required_slots:
@@ -77,20 +87,156 @@ def check_quality(template: BaseTemplate, copy: CopySlots) -> QCResult:
             severity="low"
         ))
     
-    # Determine overall status
-    has_failures = any(c.status == "fail" for c in checks)
-    has_warnings = any(c.status == "warning" for c in checks)
-    
-    if has_failures:
-        overall_status = "fail"
-    elif has_warnings:
-        overall_status = "warning"
-    else:
-        overall_status = "pass"
+    # Check 4: Real layout (page count, box overflow, font size)
+    if layout_checks:
+        checks.extend(layout_checks)
     
     return QCResult(
-        overall_status=overall_status,
+        overall_status=_overall_status(checks),
         checks=checks,
         fixes_applied=[]
     )
 
+
+def check_text_fit(template: BaseTemplate, copy: CopySlots) -> List[QCCheck]:
+    """Predict from font metrics whether each slot fits the template's box (see core.text_metrics)."""
+    checks = []
+    if not settings.text_fit_enabled:
+        return checks
+    text_boxes = template.get_text_boxes()
+    for slot_name in template.get_slot_limits():
+        box = slot_box(text_boxes, slot_name)
+        copy_value = getattr(copy, slot_name, None)
+        if box is None or not copy_value:
+            continue
+        estimate = estimate_fit(copy_value, box)
+        if not estimate.fits:
+            checks.append(QCCheck(
+                check_name=f"predicted_overflow_{slot_name}",
+                status="fail",
+                message=(
+                    f"{slot_name} is predicted to overflow: {estimate.lines}/{estimate.max_lines} lines"
+                    if estimate.lines > estimate.max_lines else
+                    f"{slot_name} has a word wider than its box ({estimate.widest_word:.0f}/{box.width:.0f}px)"
+                ),
+                severity="high"
+            ))
+    return checks
+
+
+def merge_layout_checks(qc_result: QCResult, layout_checks: List[QCCheck]) -> QCResult:
+    """Add layout checks to an existing QC result."""
+    checks = qc_result.checks + list(layout_checks)
+    return QCResult(
+        overall_status=_overall_status(checks),
+        checks=checks,
+        fixes_applied=qc_result.fixes_applied
+    )
+
+
+def _overall_status(checks: List[QCCheck]) -> str:
+    """Determine overall status."""
+    if any(c.status == "fail" for c in checks):
+        return "fail"
+    if any(c.status == "warning" for c in checks):
+        return "warning"
+    return "pass"
+
+
+def _box_label(box, inherited: str) -> str:
+    """Slot of the element a box belongs to: its data-slot attribute, else its first CSS class."""
+    element = getattr(box, "element", None)
+    if element is None:
+        return inherited
+    if element.get("data-slot"):
+        return element.get("data-slot")
+    classes = element.get("class", "").split()
+    return classes[0] if classes else inherited
+
+
+def _walk_text_boxes(box, container: Tuple[float, float, float, Optional[float]], label: str) -> Iterator:
+    """
+    Yield (text_box, container, label) for every text box under box.
+    
+    container is the content box (left, right, top, bottom) of the nearest
+    block; bottom is None unless the block has a fixed height.
+    """
+    name = type(box).__name__
+    label = _box_label(box, label)
+    if name == "TextBox":
+        yield box, container, label
+        return
+    if name.endswith("BlockBox") or name in ("PageBox", "FlexBox", "TableCellBox"):
+        left = box.content_box_x()
+        top = box.content_box_y()
+        fixed_height = box.style["height"] != "auto"
+        container = (left, left + box.width, top, top + box.height if fixed_height else None)
+    for child in getattr(box, "children", []):
+        yield from _walk_text_boxes(child, container, label)
+
+
+def check_layout(template: BaseTemplate, document) -> List[QCCheck]:
+    """
+    Checks on a laid-out WeasyPrint Document.
+    
+    - page count against settings.max_pages
+    - text overflowing its block horizontally, or a fixed-height block vertically
+    - text smaller than settings.min_font_size (pt)
+    
+    Overflow checks are named layout_overflow_<slot> when the box belongs to
+    an element labelled with a slot: a data-slot attribute (e.g. "usp_2") or
+    a first class that is a slot name (e.g. "title", "intro").
+    
+    The box tree is WeasyPrint's private Page._page_box; if a WeasyPrint
+    release drops it, the box checks are skipped and only the page count
+    is checked.
+    """
+    checks = []
+    
+    if len(document.pages) > settings.max_pages:
+        checks.append(QCCheck(
+            check_name="page_count",
+            status="fail",
+            message=f"Document has {len(document.pages)} pages (max {settings.max_pages})",
+            severity="high"
+        ))
+    
+    overflowing = {}
+    smallest_font = None
+    min_font_px = settings.min_font_size * PT_TO_PX
+    for page in document.pages:
+        page_box = getattr(page, "_page_box", None)
+        if page_box is None:
+            continue
+        for text_box, (left, right, top, bottom), label in _walk_text_boxes(page_box, (0, page_box.width, 0, None), "page"):
+            if not text_box.text.strip():
+                continue
+            overflow = max(
+                text_box.position_x + text_box.width - right,
+                text_box.position_y + text_box.height - bottom if bottom is not None else 0
+            )
+            if overflow > LAYOUT_TOLERANCE:
+                overflowing[label] = max(overflowing.get(label, 0), overflow)
+            font_size = text_box.style["font_size"]
+            if font_size < min_font_px and (smallest_font is None or font_size < smallest_font[0]):
+                smallest_font = (font_size, label)
+    
+    for label, overflow in overflowing.items():
+        checks.append(QCCheck(
+            check_name=f"layout_overflow_{label}",
+            status="fail",
+            message=f"{label} overflows its box by {overflow:.0f}px",
+            severity="high"
+        ))
+    
+    if smallest_font is not None:
+        font_size, label = smallest_font
+        checks.append(QCCheck(
+            check_name="min_font_size",
+            status="warning",
+            message=f"Text in {label} is {font_size / PT_TO_PX:.1f}pt (min {settings.min_font_size}pt)",
+            severity="medium"
+        ))
+    
+    return checks
+
@@ -0,0 +1,147 @@
+"""On-disk cache of rendered PDFs with LRU eviction under a byte budget."""
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+from config.settings import settings
+
+
+class RenderCache:
+    """
+    Maps a render key to PDF bytes stored as files next to a SQLite index.
+
+    Least recently used PDFs are deleted once their total size exceeds
+    `max_bytes`. Safe to share between processes (render workers).
+    """
+
+    def __init__(self, root: Union[str, Path], max_bytes: int):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / "index.sqlite3"), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS render_cache (
+                key TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_render_cache_accessed ON render_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.pdf"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _unlink(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+        self._meta_path(key).unlink(missing_ok=True)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached PDF bytes for key, or None on miss."""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self._conn.execute(
+                "UPDATE render_cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return data
+
+    def get_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        """Metadata stored with a PDF (e.g. layout QC checks), or None."""
+        try:
+            return json.loads(self._meta_path(key).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+
+    def set(self, key: str, data: bytes, meta: Optional[Dict[str, Any]] = None) -> None:
+        """Store PDF bytes (and optional JSON metadata) under key and enforce the byte budget."""
+        if meta is not None:
+            self._write_atomic(self._meta_path(key), json.dumps(meta).encode("utf-8"))
+        self._write_atomic(self._path(key), data)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO render_cache (key, size, accessed_at) VALUES (?, ?, ?)",
+                (key, len(data), time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Delete least recently used PDFs until the total size fits max_bytes."""
+        if self.max_bytes <= 0:
+            return
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM render_cache").fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM render_cache ORDER BY accessed_at ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM render_cache WHERE key = ?", (key,))
+            self._unlink(key)
+            total -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every cached PDF."""
+        with self._lock:
+            for (key,) in self._conn.execute("SELECT key FROM render_cache").fetchall():
+                self._unlink(key)
+            self._conn.execute("DELETE FROM render_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters, entry count and stored bytes."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM render_cache"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+_render_cache: Optional[RenderCache] = None
+_render_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> Optional[RenderCache]:
+    """Return the process-wide render cache, or None when it is disabled."""
+    global _render_cache
+    if not settings.render_cache_enabled:
+        return None
+    with _render_cache_lock:
+        if _render_cache is None:
+            _render_cache = RenderCache(settings.render_cache_dir, settings.render_cache_max_bytes)
+    return _render_cache
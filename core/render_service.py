@@ -0,0 +1,329 @@
+"""Render service: a pool of warm worker processes for CPU-bound PDF rendering."""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterable, List, Optional, Tuple, Type
+from templates.base import BaseTemplate
+from core.copy_generator import CopySlots
+from core.renderer import get_cached_checked, get_cached_pdf, render_pdf, render_pdf_checked, warm_stylesheets
+from core.qc_engine import QCCheck
+from core.asset_store import prefetch_assets
+from config.settings import settings
+
+
+class RenderQueueFull(RuntimeError):
+    """Raised when the render queue is full and the caller asked not to wait."""
+
+
+def _init_worker(template_classes: List[Type[BaseTemplate]]) -> None:
+    """Worker initializer: parse stylesheets and load fonts once per process."""
+    warm_stylesheets(template_class() for template_class in template_classes)
+
+
+def _prefetch(template: BaseTemplate, copy: CopySlots, product_name: str) -> Optional[str]:
+    """
+    Fill the asset store for a document before it is queued (workers never fetch).
+
+    Returns the rendered HTML, which is passed on to the render so the
+    template (and its feature images) is rendered only once; None if
+    prefetching is disabled and the worker renders the HTML itself.
+    """
+    if not settings.asset_prefetch_enabled:
+        return None
+    html = template.render_html(copy, product_name)
+    prefetch_assets(html)
+    return html
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _render_job(
+    template: BaseTemplate, copy_data: dict, product_name: str, output_path: Optional[str], html: Optional[str]
+) -> bytes:
+    """Runs in a worker process."""
+    return render_pdf(template, CopySlots(**copy_data), product_name, output_path, html)
+
+
+def _render_checked_job(
+    template: BaseTemplate, copy_data: dict, product_name: str, output_path: Optional[str], html: Optional[str]
+):
+    """Runs in a worker process; layout checks travel back as dicts."""
+    pdf_bytes, layout_checks = render_pdf_checked(template, CopySlots(**copy_data), product_name, output_path, html)
+    return pdf_bytes, [check.model_dump() for check in layout_checks]
+
+
+def _checked_result(result) -> Tuple[bytes, List[QCCheck]]:
+    pdf_bytes, layout_checks = result
+    return pdf_bytes, [QCCheck(**check) for check in layout_checks]
+
+
+def _chain_future(source: Future, target: Future, transform) -> None:
+    """Complete target with transform(source result), or source's exception."""
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(transform(source.result()))
+
+
+class RenderService:
+    """
+    Renders PDFs in a pool of worker processes, keeping layout off the event loop.
+
+    Workers are spawned up front with every template's stylesheet and fonts
+    preloaded. Remote assets are prefetched into the asset store before a
+    job is queued, so workers render without network access. At most
+    `max_pending` jobs are queued or running; `submit` blocks beyond that,
+    `render` waits or raises RenderQueueFull.
+    With `enabled=False` renders run in a thread of the current process.
+    """
+
+    def __init__(
+        self,
+        template_classes: Iterable[Type[BaseTemplate]],
+        workers: int = 0,
+        max_pending: int = 0,
+        enabled: bool = True,
+    ):
+        self.template_classes = list(template_classes)
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.max_pending = max_pending if max_pending > 0 else self.workers * 4
+        self.enabled = enabled
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+
+    # ---- lifecycle --------------------------------------------------------
+
+    def start(self) -> None:
+        """Spawn and warm all workers (idempotent)."""
+        if not self.enabled:
+            warm_stylesheets(template_class() for template_class in self.template_classes)
+            return
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                # spawn: workers must not inherit the parent's threads and locks
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.template_classes,),
+            )
+            pings = [self._executor.submit(_ping) for _ in range(self.workers)]
+        for ping in pings:
+            ping.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    # ---- submission -------------------------------------------------------
+
+    def _on_done(self, future: Future) -> None:
+        self._slots.release()
+        # Runs in the executor's callback thread
+        with self._stats_lock:
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    async def _acquire_slot(self, wait: bool) -> None:
+        """Take a queue slot from the event loop; waits in a thread, never by polling."""
+        if self._slots.acquire(blocking=False):
+            return
+        if not wait:
+            raise RenderQueueFull(f"Render queue is full ({self.max_pending} jobs pending)")
+        acquiring = asyncio.ensure_future(asyncio.to_thread(self._slots.acquire))
+        try:
+            await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # The thread still takes the slot; hand it back once it does
+            acquiring.add_done_callback(lambda done: done.cancelled() or self._slots.release())
+            raise
+
+    def _dispatch(
+        self,
+        job,
+        template: BaseTemplate,
+        copy: CopySlots,
+        product_name: str,
+        output_path: Optional[str],
+        html: Optional[str]
+    ) -> Future:
+        """Send a job to the pool; the caller already holds a queue slot."""
+        try:
+            self.start()
+            future = self._executor.submit(job, template, copy.model_dump(), product_name, output_path, html)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _submit(self, checked: bool, template: BaseTemplate, copy: CopySlots, product_name: str, output_path: Optional[str]) -> Future:
+        lookup = get_cached_checked if checked else get_cached_pdf
+        cached = lookup(template, copy, product_name, output_path)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+        html = _prefetch(template, copy, product_name)
+        if not self.enabled:
+            future = Future()
+            try:
+                render = render_pdf_checked if checked else render_pdf
+                future.set_result(render(template, copy, product_name, output_path, html))
+            except Exception as exc:
+                future.set_exception(exc)
+            return future
+        self._slots.acquire()
+        if not checked:
+            return self._dispatch(_render_job, template, copy, product_name, output_path, html)
+        result = Future()
+        job = self._dispatch(_render_checked_job, template, copy, product_name, output_path, html)
+        job.add_done_callback(lambda done: _chain_future(done, result, _checked_result))
+        return result
+
+    def submit(
+        self,
+        template: BaseTemplate,
+        copy: CopySlots,
+        product_name: str,
+        output_path: Optional[str] = None
+    ) -> Future:
+        """Queue a render from a thread; blocks while the queue is full. Returns a Future of PDF bytes."""
+        return self._submit(False, template, copy, product_name, output_path)
+
+    def submit_checked(
+        self,
+        template: BaseTemplate,
+        copy: CopySlots,
+        product_name: str,
+        output_path: Optional[str] = None
+    ) -> Future:
+        """Like submit; the Future resolves to (PDF bytes, layout QC checks) from one layout pass."""
+        return self._submit(True, template, copy, product_name, output_path)
+
+    async def _render(
+        self,
+        checked: bool,
+        template: BaseTemplate,
+        copy: CopySlots,
+        product_name: str,
+        output_path: Optional[str],
+        wait: bool
+    ):
+        # Cached renders are a file read; skip the queue
+        lookup = get_cached_checked if checked else get_cached_pdf
+        cached = await asyncio.to_thread(lookup, template, copy, product_name, output_path)
+        if cached is not None:
+            return cached
+        html = await asyncio.to_thread(_prefetch, template, copy, product_name)
+        if not self.enabled:
+            render = render_pdf_checked if checked else render_pdf
+            return await asyncio.to_thread(render, template, copy, product_name, output_path, html)
+
+        if self._executor is None:
+            # The first start spawns workers and waits for them; keep that off the loop
+            await asyncio.to_thread(self.start)
+        await self._acquire_slot(wait)
+        job = _render_checked_job if checked else _render_job
+        result = await asyncio.wrap_future(self._dispatch(job, template, copy, product_name, output_path, html))
+        return _checked_result(result) if checked else result
+
+    async def render(
+        self,
+        template: BaseTemplate,
+        copy: CopySlots,
+        product_name: str,
+        output_path: Optional[str] = None,
+        wait: bool = True
+    ) -> bytes:
+        """
+        Render from the event loop without blocking it.
+
+        Args:
+            wait: If the queue is full, wait for a slot (True) or raise RenderQueueFull (False)
+        """
+        return await self._render(False, template, copy, product_name, output_path, wait)
+
+    async def render_checked(
+        self,
+        template: BaseTemplate,
+        copy: CopySlots,
+        product_name: str,
+        output_path: Optional[str] = None,
+        wait: bool = True
+    ) -> Tuple[bytes, List[QCCheck]]:
+        """Like render; returns (PDF bytes, layout QC checks) from one layout pass."""
+        return await self._render(True, template, copy, product_name, output_path, wait)
+
+    async def render_many(
+        self,
+        jobs: Iterable[Tuple[BaseTemplate, CopySlots, str]],
+        return_exceptions: bool = True
+    ) -> list:
+        """
+        Render many documents, at most `workers` in flight for this call.
+
+        Capping bulk work at the worker count leaves queue room for
+        interactive renders submitted meanwhile.
+        """
+        window = asyncio.Semaphore(self.workers)
+
+        async def _render(template, copy, product_name):
+            async with window:
+                return await self.render(template, copy, product_name)
+
+        return await asyncio.gather(
+            *(_render(template, copy, product_name) for template, copy, product_name in jobs),
+            return_exceptions=return_exceptions
+        )
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            completed, failed = self.completed, self.failed
+        return {
+            "enabled": self.enabled,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "completed": completed,
+            "failed": failed,
+        }
+
+
+_service: Optional[RenderService] = None
+_service_lock = threading.Lock()
+
+
+def get_render_service(template_classes: Optional[Iterable[Type[BaseTemplate]]] = None) -> RenderService:
+    """
+    Return the process-wide render service, creating it from settings on first use.
+
+    template_classes are preloaded into every worker (all templates by default).
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            if template_classes is None:
+                from templates.registry import get_template_classes
+                template_classes = get_template_classes()
+            _service = RenderService(
+                template_classes,
+                workers=settings.render_workers,
+                max_pending=settings.render_max_pending,
+                enabled=settings.render_pool_enabled,
+            )
+    return _service
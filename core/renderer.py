@@ -1,48 +1,282 @@
 """PDF rendering engine using WeasyPrint."""
-from weasyprint import HTML, CSS
+import hashlib
+import importlib
+import importlib.metadata
+import inspect
+import sys
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
 from templates.base import BaseTemplate
 from core.copy_generator import CopySlots
+from core.asset_store import local_url_fetcher
+from core.copy_cache import make_cache_key
+from core.image_generator import IMAGE_STYLE_VERSION
+from core.render_cache import get_render_cache
+from core.qc_engine import QCCheck, check_layout
 from config.settings import settings
 
+# WeasyPrint is imported on first render, not at module load (it is slow to import)
+if TYPE_CHECKING:
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
 
-def render_pdf(
+# One font configuration per process: fonts are resolved once and reused by every render
+_font_config: Optional["FontConfiguration"] = None
+
+# template_id -> (css text, parsed stylesheet)
+_stylesheets: Dict[str, Tuple[str, "CSS"]] = {}
+_stylesheets_lock = threading.Lock()
+
+# Bump on rendering changes the hashed sources below cannot see (e.g. fonts installed on the host)
+RENDER_VERSION = "1"
+
+# Modules every template renders through; editing any of them changes every template's version
+_SHARED_RENDER_MODULES = ("templates.base", "templates.engine", "core.renderer")
+
+# template class -> version hash
+_template_versions: Dict[type, str] = {}
+_shared_render_version: Optional[str] = None
+
+
+def get_font_config() -> "FontConfiguration":
+    """Return the process-wide FontConfiguration."""
+    from weasyprint.text.fonts import FontConfiguration
+    
+    global _font_config
+    with _stylesheets_lock:
+        if _font_config is None:
+            _font_config = FontConfiguration()
+    return _font_config
+
+
+def get_stylesheet(template: BaseTemplate) -> Tuple[str, "CSS"]:
+    """
+    Return the template's CSS text and its parsed stylesheet, parsed once per template.
+    
+    A stylesheet is re-parsed only if the template's CSS text changed.
+    """
+    from weasyprint import CSS
+    
+    css_text = template.get_css()
+    cached = _stylesheets.get(template.template_id)
+    if cached is not None and cached[0] == css_text:
+        return cached
+    
+    font_config = get_font_config()
+    with _stylesheets_lock:
+        cached = _stylesheets.get(template.template_id)
+        if cached is None or cached[0] != css_text:
+            cached = (css_text, CSS(string=css_text, font_config=font_config, url_fetcher=local_url_fetcher()))
+            _stylesheets[template.template_id] = cached
+    return cached
+
+
+def warm_stylesheets(templates: Iterable[BaseTemplate]) -> int:
+    """Parse stylesheets and load fonts ahead of the first render; returns the template count."""
+    count = 0
+    for template in templates:
+        get_stylesheet(template)
+        count += 1
+    return count
+
+
+def _module_source(module_name: str) -> str:
+    try:
+        return inspect.getsource(importlib.import_module(module_name))
+    except (OSError, TypeError, ImportError):
+        return module_name
+
+
+def _shared_version() -> str:
+    """Hash of the shared rendering code, the WeasyPrint version and RENDER_VERSION."""
+    global _shared_render_version
+    if _shared_render_version is None:
+        try:
+            weasyprint_version = importlib.metadata.version("weasyprint")
+        except importlib.metadata.PackageNotFoundError:
+            weasyprint_version = "unknown"
+        payload = "\x1f".join(
+            [_module_source(name) for name in _SHARED_RENDER_MODULES]
+            + [weasyprint_version, RENDER_VERSION, IMAGE_STYLE_VERSION]
+        )
+        _shared_render_version = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return _shared_render_version
+
+
+def template_version(template: BaseTemplate) -> str:
+    """
+    Hash of everything a template's output depends on.
+    
+    Covers the template's module source and CSS, the shared rendering code
+    (templates.base, templates.engine, core.renderer), the WeasyPrint version
+    and RENDER_VERSION, so cached renders, preview ETags and catalog
+    fingerprints never outlive an edit to any of them.
+    """
+    template_class = type(template)
+    version = _template_versions.get(template_class)
+    if version is None:
+        try:
+            source = inspect.getsource(sys.modules[template_class.__module__])
+        except (OSError, TypeError, KeyError):
+            source = template_class.__qualname__
+        payload = "\x1f".join([source, template.get_css(), _shared_version()])
+        version = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+        _template_versions[template_class] = version
+    return version
+
+
+def render_cache_key(template: BaseTemplate, copy: CopySlots, product_name: str) -> str:
+    """Render cache key: template id, template version, copy digest and product name."""
+    return make_cache_key(
+        template.template_id,
+        template_version(template),
+        make_cache_key(copy.model_dump()),
+        product_name,
+    )
+
+
+def _save_pdf(pdf_bytes: bytes, output_path: Optional[str]) -> None:
+    if output_path:
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "wb") as f:
+            f.write(pdf_bytes)
+
+
+def get_cached_pdf(
     template: BaseTemplate,
     copy: CopySlots,
     product_name: str,
     output_path: Optional[str] = None
+) -> Optional[bytes]:
+    """Return a previously rendered PDF for the same inputs (saved to output_path), or None."""
+    cache = get_render_cache()
+    if not cache:
+        return None
+    pdf_bytes = cache.get(render_cache_key(template, copy, product_name))
+    if pdf_bytes is not None:
+        _save_pdf(pdf_bytes, output_path)
+    return pdf_bytes
+
+
+def get_cached_checked(
+    template: BaseTemplate,
+    copy: CopySlots,
+    product_name: str,
+    output_path: Optional[str] = None
+) -> Optional[Tuple[bytes, List[QCCheck]]]:
+    """Like get_cached_pdf, with the layout checks stored alongside the PDF."""
+    cache = get_render_cache()
+    if not cache:
+        return None
+    cache_key = render_cache_key(template, copy, product_name)
+    meta = cache.get_meta(cache_key)
+    pdf_bytes = cache.get(cache_key) if meta is not None else None
+    if pdf_bytes is None:
+        return None
+    _save_pdf(pdf_bytes, output_path)
+    return pdf_bytes, [QCCheck(**check) for check in meta["layout_checks"]]
+
+
+def layout_document(template: BaseTemplate, copy: CopySlots, product_name: str, html_content: Optional[str] = None):
+    """
+    Lay out the template with WeasyPrint; returns a Document.
+    
+    The same Document is used for layout QC and for writing the PDF.
+    html_content is the template's already rendered HTML, if the caller has it.
+    """
+    from weasyprint import HTML
+    
+    # Generate HTML
+    if html_content is None:
+        html_content = template.render_html(copy, product_name)
+    
+    # Cached CSS (parsed once per template)
+    css_text, css = get_stylesheet(template)
+    
+    # Templates inline get_css() for the browser preview; the cached stylesheet
+    # is applied after the document's own styles, so the inline copy is redundant
+    html_content = html_content.replace(css_text, "", 1)
+    
+    # Create HTML object; remote assets come from the local asset store only
+    html = HTML(string=html_content, url_fetcher=local_url_fetcher())
+    
+    return html.render(stylesheets=[css], font_config=get_font_config())
+
+
+def _render_and_store(
+    template: BaseTemplate, copy: CopySlots, product_name: str, cache, cache_key, html: Optional[str] = None
+) -> Tuple[bytes, List[QCCheck]]:
+    """One layout pass: layout QC on the Document, then PDF output from the same Document."""
+    document = layout_document(template, copy, product_name, html)
+    layout_checks = check_layout(template, document) if settings.layout_qc_enabled else []
+    pdf_bytes = document.write_pdf()
+    if cache:
+        cache.set(cache_key, pdf_bytes, {"layout_checks": [check.model_dump() for check in layout_checks]})
+    return pdf_bytes, layout_checks
+
+
+def render_pdf(
+    template: BaseTemplate,
+    copy: CopySlots,
+    product_name: str,
+    output_path: Optional[str] = None,
+    html: Optional[str] = None
 ) -> bytes:
     """
     Render PDF from template and copy.
     
+    Identical inputs are served from the render cache without a layout.
+    Never accesses the network: remote images must be in the asset store
+    (see core.asset_store.prefetch_assets), otherwise they are left out.
+    
     Args:
         template: Template instance
         copy: CopySlots with generated copy
         product_name: Product/service name
         output_path: Optional path to save PDF (if None, returns bytes)
+        html: The template's HTML for copy, if already rendered (e.g. for asset prefetch)
     
     Returns:
         PDF bytes
     """
-    # Generate HTML
-    html_content = template.render_html(copy, product_name)
-    
-    # Create HTML object
-    html = HTML(string=html_content)
-    
-    # Generate CSS
-    css = CSS(string=template.get_css())
-    
-    # Render PDF
-    pdf_bytes = html.write_pdf(stylesheets=[css])
+    cache = get_render_cache()
+    cache_key = render_cache_key(template, copy, product_name) if cache else None
+    pdf_bytes = cache.get(cache_key) if cache else None
+    if pdf_bytes is None:
+        pdf_bytes, _ = _render_and_store(template, copy, product_name, cache, cache_key, html)
     
     # Save if output path provided
-    if output_path:
-        output_path = Path(output_path)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, "wb") as f:
-            f.write(pdf_bytes)
+    _save_pdf(pdf_bytes, output_path)
     
     return pdf_bytes
 
+
+def render_pdf_checked(
+    template: BaseTemplate,
+    copy: CopySlots,
+    product_name: str,
+    output_path: Optional[str] = None,
+    html: Optional[str] = None
+) -> Tuple[bytes, List[QCCheck]]:
+    """
+    Render PDF and return the layout QC checks (see qc_engine.check_layout) with it.
+    
+    Layout QC runs on the Document that is written to PDF, so it costs no
+    extra layout. Cached renders return their stored checks.
+    
+    Returns:
+        (PDF bytes, layout checks)
+    """
+    cached = get_cached_checked(template, copy, product_name, output_path)
+    if cached is not None:
+        return cached
+    
+    cache = get_render_cache()
+    cache_key = render_cache_key(template, copy, product_name) if cache else None
+    pdf_bytes, layout_checks = _render_and_store(template, copy, product_name, cache, cache_key, html)
+    
+    _save_pdf(pdf_bytes, output_path)
+    
+    return pdf_bytes, layout_checks
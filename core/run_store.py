@@ -0,0 +1,344 @@
+"""Durable record of batch runs (CLI runs and API jobs): per-product stage results in local SQLite."""
+import asyncio
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from models.product_brief import ProductBrief
+from core.copy_generator import CopySlots
+from core.qc_engine import QCResult
+from config.settings import settings
+
+
+# Item states; stage results are stored as each stage finishes
+PENDING, COPIED, CHECKED, DONE, FAILED = "pending", "copied", "checked", "done", "failed"
+
+
+class RunStore:
+    """
+    Runs and their items in one SQLite file.
+
+    An item keeps its brief, the copy after the copy stage (replaced by
+    the final copy after QC), the QC result and the PDF path, so a resumed
+    run skips every stage an item already finished.
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                source TEXT,
+                template_id TEXT,
+                status TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_runs_kind_source ON runs (kind, source, created_at);
+            CREATE TABLE IF NOT EXISTS run_items (
+                run_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                product_id TEXT NOT NULL,
+                template_id TEXT NOT NULL,
+                brief TEXT NOT NULL,
+                status TEXT NOT NULL,
+                copy TEXT,
+                qc TEXT,
+                pdf_path TEXT,
+                failed_stage TEXT,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, idx)
+            );"""
+        )
+        self._conn.commit()
+
+    # ---- runs ---------------------------------------------------------------
+
+    def create_run(
+        self,
+        kind: str,
+        items: Iterable[Tuple[ProductBrief, str]] = (),
+        source: Optional[str] = None,
+        template_id: Optional[str] = None,
+        run_id: Optional[str] = None,
+    ) -> str:
+        """
+        Record a new run with one pending item per (brief, template_id); returns the run id.
+
+        Items can also be added later, as they stream in (see add_items, stream_into_run).
+        """
+        run_id = run_id or uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO runs (run_id, kind, source, template_id, status, total, created_at) "
+                "VALUES (?, ?, ?, ?, 'running', 0, ?)",
+                (run_id, kind, source, template_id, time.time())
+            )
+            self._conn.commit()
+        self.add_items(run_id, items)
+        return run_id
+
+    def add_items(self, run_id: str, items: Iterable[Tuple[ProductBrief, str]], start: int = 0) -> int:
+        """Append pending items to a run, numbered from start; returns how many were added."""
+        now = time.time()
+        rows = [
+            (run_id, index, brief.product_id, item_template_id, brief.model_dump_json(), PENDING, now)
+            for index, (brief, item_template_id) in enumerate(items, start)
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO run_items (run_id, idx, product_id, template_id, brief, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.execute("UPDATE runs SET total = total + ? WHERE run_id = ?", (len(rows), run_id))
+            self._conn.commit()
+        return len(rows)
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def latest_run(self, kind: str, source: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Most recent run of a kind (and source, if given)."""
+        query = "SELECT * FROM runs WHERE kind = ?"
+        params: list = [kind]
+        if source is not None:
+            query += " AND source = ?"
+            params.append(source)
+        with self._lock:
+            row = self._conn.execute(query + " ORDER BY created_at DESC LIMIT 1", params).fetchone()
+        return dict(row) if row else None
+
+    def set_run_status(self, run_id: str, status: str) -> None:
+        """Mark a run running again, or finished ("done"/"failed")."""
+        finished_at = None if status == "running" else time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, finished_at = ? WHERE run_id = ?", (status, finished_at, run_id)
+            )
+            self._conn.commit()
+
+    def expired_runs(self, kind: str, finished_before: float) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT run_id FROM runs WHERE kind = ? AND finished_at IS NOT NULL AND finished_at < ?",
+                (kind, finished_before)
+            ).fetchall()
+        return [row["run_id"] for row in rows]
+
+    def delete_run(self, run_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM run_items WHERE run_id = ?", (run_id,))
+            self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            self._conn.commit()
+
+    # ---- items --------------------------------------------------------------
+
+    def items(self, run_id: str, start: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Items of a run in input order (from index start, at most limit); brief, copy and qc are decoded."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM run_items WHERE run_id = ? AND idx >= ? ORDER BY idx LIMIT ?",
+                (run_id, start, -1 if limit is None else limit)
+            ).fetchall()
+        items = []
+        for row in rows:
+            item = dict(row)
+            item["brief"] = ProductBrief.model_validate_json(row["brief"])
+            item["copy"] = CopySlots.model_validate_json(row["copy"]) if row["copy"] else None
+            item["qc"] = QCResult.model_validate_json(row["qc"]) if row["qc"] else None
+            items.append(item)
+        return items
+
+    def iter_items(self, run_id: str, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Every item of a run in input order, read page by page (never the whole run at once)."""
+        start = 0
+        while True:
+            page = self.items(run_id, start, page_size)
+            yield from page
+            if len(page) < page_size:
+                return
+            start = page[-1]["idx"] + 1
+
+    def counts(self, run_id: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) AS n FROM run_items WHERE run_id = ? GROUP BY status", (run_id,)
+            ).fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def _update(self, run_id: str, index: int, **fields) -> None:
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE run_items SET {assignments} WHERE run_id = ? AND idx = ?",
+                (*fields.values(), run_id, index)
+            )
+            self._conn.commit()
+
+    def record_stage(self, run_id: str, item, stage: str) -> None:
+        """
+        Store what a pipeline stage produced for an item (see core.pipeline.OnepagerItem).
+
+        Failed items are recorded with the stage and error.
+        """
+        if item.error:
+            self._update(run_id, item.index, status=FAILED, failed_stage=item.failed_stage or stage, error=item.error)
+        elif stage == "copy":
+            self._update(run_id, item.index, status=COPIED, copy=item.copy.model_dump_json())
+        elif stage == "qc":
+            self._update(
+                run_id, item.index,
+                status=CHECKED,
+                copy=item.copy.model_dump_json(),
+                qc=item.qc.model_dump_json() if item.qc else None,
+            )
+        elif stage == "render":
+            self._update(
+                run_id, item.index,
+                status=DONE,
+                qc=item.qc.model_dump_json() if item.qc else None,
+                pdf_path=item.output_path,
+                failed_stage=None,
+                error=None,
+            )
+
+    def record_failure(self, run_id: str, index: int, stage: str, error: str) -> None:
+        self._update(run_id, index, status=FAILED, failed_stage=stage, error=error)
+
+
+def is_pending(record: Dict[str, Any]) -> bool:
+    """Whether a resumed run still has to process an item: not done, or done but the PDF is gone."""
+    return record["status"] != DONE or not (record["pdf_path"] and Path(record["pdf_path"]).exists())
+
+
+def pending_items(records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Items a resumed run still has to process (see is_pending)."""
+    return [record for record in records if is_pending(record)]
+
+
+def restore_item(record: Dict[str, Any], template, output_path: Optional[Union[str, Path]] = None):
+    """
+    OnepagerItem for a stored item, carrying the stage results it already has.
+
+    Copy is reused when the copy stage finished; copy and QC are both reused
+    when QC finished, so the pipeline skips those stages for the item.
+    """
+    from core.pipeline import OnepagerItem  # pipeline imports the render stack
+
+    item = OnepagerItem(record["idx"], record["brief"], template, output_path)
+    if record["copy"] is not None:
+        item.copy = record["copy"]
+        if record["status"] in (CHECKED, DONE) or record["failed_stage"] == "render":
+            item.qc = record["qc"]
+            item.checked = True
+    return item
+
+
+async def stream_into_run(
+    store: RunStore,
+    run_id: str,
+    items: Iterable[Tuple[ProductBrief, str]],
+    batch_size: int = 500,
+    on_recorded: Optional[Callable[[List[Tuple[int, ProductBrief, str]]], Any]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Record streamed (brief, template_id) items in a run and yield the stored items in order.
+
+    A thread reads items (e.g. from a CSV reader) and stores them batch by
+    batch, as fast as they come; the store buffers them on disk and they
+    are read back page by page as the consumer asks. Neither side holds the
+    whole input, and an interrupted run has every item read so far recorded
+    for a resume. `on_recorded(batch)` is called on the event loop with the
+    (index, brief, template_id) of each stored batch, before it is yielded.
+    Errors while reading items are raised once the stored items are consumed.
+    """
+    loop = asyncio.get_running_loop()
+    stop = threading.Event()
+    recorded = [0]
+    progress = asyncio.Event()
+
+    def _recorded(batch: List[Tuple[int, ProductBrief, str]]) -> None:
+        if on_recorded:
+            on_recorded(batch)
+        recorded[0] += len(batch)
+        progress.set()
+
+    def _write(batch: List[Tuple[ProductBrief, str]], start: int) -> None:
+        store.add_items(run_id, batch, start)
+        loop.call_soon_threadsafe(
+            _recorded, [(start + i, brief, template_id) for i, (brief, template_id) in enumerate(batch)]
+        )
+
+    def _ingest() -> None:
+        batch, stored = [], 0
+        try:
+            for item in items:
+                if stop.is_set():
+                    break
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    # Taken before writing: a failed write is not retried below
+                    pending, batch = batch, []
+                    _write(pending, stored)
+                    stored += len(pending)
+        except Exception:
+            # Items read before a read error are recorded too
+            if batch:
+                _write(batch, stored)
+            raise
+        if batch:
+            _write(batch, stored)
+
+    ingest = asyncio.ensure_future(asyncio.to_thread(_ingest))
+    cursor = 0
+    try:
+        while True:
+            if cursor < recorded[0]:
+                page = await asyncio.to_thread(store.items, run_id, cursor, min(batch_size, recorded[0] - cursor))
+                for record in page:
+                    yield record
+                cursor += len(page)
+            elif ingest.done():
+                ingest.result()
+                # Batches stored before the thread finished are counted before it is done
+                if cursor >= recorded[0]:
+                    return
+            else:
+                progress.clear()
+                waiter = asyncio.ensure_future(progress.wait())
+                try:
+                    await asyncio.wait([waiter, ingest], return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    waiter.cancel()
+    finally:
+        stop.set()
+
+
+_store: Optional[RunStore] = None
+_store_lock = threading.Lock()
+
+
+def get_run_store() -> RunStore:
+    """Return the process-wide run store (settings.run_store_path)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RunStore(settings.run_store_path)
+    return _store
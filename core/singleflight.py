@@ -0,0 +1,110 @@
+"""Single-flight coalescing: concurrent identical calls share one in-flight result."""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+
+class _LeaderAbandoned(Exception):
+    """The leader was cancelled or interrupted before the call finished."""
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is in flight wait for the leader's result instead of
+    repeating the work. Threads (`do`) and asyncio tasks (`ado`) share the
+    same table, so a thread can piggyback on a call started by a task and
+    vice versa. Nothing is cached once the leader finishes.
+
+    Followers only see the call's own errors: if the leader is cancelled
+    (or interrupted), the waiting followers rejoin and one of them runs
+    the call again.
+
+    Do not call `do` from an event loop thread while an `ado` leader for the
+    same key runs on that loop - the blocking wait would deadlock the loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def _join(self, key: str):
+        """Return (future, is_leader) for key."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            self.calls += 1
+            return future, True
+
+    def _rejoin(self) -> None:
+        """A follower whose leader was abandoned did not share a result after all."""
+        with self._lock:
+            self.shared -= 1
+
+    def _settle(self, key: str, future: Future, result: Any = None, exc: Optional[BaseException] = None) -> None:
+        """Remove key from the table, then wake its followers."""
+        # Removed first, so followers of an abandoned leader rejoin a fresh entry
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if exc is None:
+            future.set_result(result)
+        elif isinstance(exc, Exception):
+            future.set_exception(exc)
+        else:
+            future.set_exception(_LeaderAbandoned())
+
+    def do(self, key: str, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) once per concurrent key (blocking callers)."""
+        while True:
+            future, is_leader = self._join(key)
+            if is_leader:
+                break
+            try:
+                return future.result()
+            except _LeaderAbandoned:
+                self._rejoin()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            self._settle(key, future, exc=exc)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    async def ado(self, key: str, fn: Callable, *args, **kwargs) -> Any:
+        """Await fn(*args, **kwargs) once per concurrent key (async callers)."""
+        while True:
+            future, is_leader = self._join(key)
+            if is_leader:
+                break
+            try:
+                # shield: a cancelled follower must not cancel the shared future
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _LeaderAbandoned:
+                self._rejoin()
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException as exc:
+            # CancelledError is a BaseException: followers rerun instead of being cancelled
+            self._settle(key, future, exc=exc)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """Calls executed, calls saved by sharing, and keys currently in flight."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "saved": self.shared,
+                "in_flight": len(self._in_flight),
+            }
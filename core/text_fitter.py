@@ -0,0 +1,72 @@
+"""Local fitting of generated copy into slot character limits."""
+import re
+from typing import List
+
+
+# Don't fall back to a sentence boundary that throws away more than this share of the limit
+MIN_SENTENCE_FILL = 0.6
+
+_SENTENCE_END = re.compile(r'[.!?](?=\s|$)')
+_TRAILING_JUNK = ' ,;:-–—(/&'
+# Words a cut must not end on ("...Platform for")
+_DANGLING_WORDS = {
+    "a", "an", "the", "and", "or", "but", "nor", "of", "for", "to", "in", "on", "at", "by",
+    "with", "from", "into", "onto", "via", "per", "as", "than", "that", "your", "our", "their", "its",
+}
+
+
+def clean_text(text: str) -> str:
+    """Normalize whitespace and strip wrapping quotes/markdown the model may add."""
+    text = " ".join(text.split())
+    text = text.strip("*_#` ")
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        text = text[1:-1].strip()
+    return text
+
+
+def sentence_ends(text: str) -> List[int]:
+    """Offsets just past each sentence-ending punctuation mark in text."""
+    return [m.end() for m in _SENTENCE_END.finditer(text)]
+
+
+def _drop_dangling(text: str) -> str:
+    """Strip trailing connectives and punctuation left by a word-boundary cut."""
+    words = text.rstrip(_TRAILING_JUNK).split(" ")
+    while len(words) > 1 and words[-1].lower() in _DANGLING_WORDS:
+        words.pop()
+        words[-1] = words[-1].rstrip(_TRAILING_JUNK)
+    return " ".join(words)
+
+
+def fit_text(text: str, max_chars: int) -> str:
+    """
+    Fit text into max_chars without cutting mid-word.
+
+    Prefers the last complete sentence that fits, then the last word
+    boundary (never ending on a connective like "for" or "and"); only a
+    single over-long word is hard-cut.
+
+    Args:
+        text: Generated copy
+        max_chars: Slot character limit
+
+    Returns:
+        Text of at most max_chars characters
+    """
+    text = clean_text(text or "")
+    if len(text) <= max_chars:
+        return text
+
+    window = text[:max_chars + 1]
+
+    # Last complete sentence within the limit
+    ends = [end for end in sentence_ends(window) if end <= max_chars]
+    if ends and ends[-1] >= max_chars * MIN_SENTENCE_FILL:
+        return window[:ends[-1]].strip()
+
+    # Last word boundary within the limit
+    cut = window.rfind(" ")
+    if cut > 0:
+        return _drop_dangling(window[:cut])
+
+    return text[:max_chars]
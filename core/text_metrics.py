@@ -0,0 +1,323 @@
+"""Font-metric text-fit estimation: predict line counts and overflow without rendering."""
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+from config.settings import settings
+
+
+PT_TO_PX = 96 / 72
+
+# Bold text set in the regular face is roughly this much wider
+BOLD_WIDTH_FACTOR = 1.06
+
+# Searched for the default font when settings.text_metrics_font is not set
+_FONT_CANDIDATES = [
+    "DejaVuSans.ttf",
+    "LiberationSans-Regular.ttf",
+    "Arial.ttf",
+    "arial.ttf",
+    "Helvetica.ttf",
+    "Roboto-Regular.ttf",
+    "Lato-Regular.ttf",
+]
+# Searched for CSS generic families in a font-family list
+_GENERIC_FAMILIES = {
+    "sans-serif": _FONT_CANDIDATES,
+    "serif": [
+        "DejaVuSerif.ttf",
+        "LiberationSerif-Regular.ttf",
+        "Times New Roman.ttf",
+        "times.ttf",
+        "Georgia.ttf",
+        "georgia.ttf",
+    ],
+    "monospace": [
+        "DejaVuSansMono.ttf",
+        "LiberationMono-Regular.ttf",
+        "Courier New.ttf",
+        "cour.ttf",
+    ],
+}
+_FONT_DIRS = [
+    "./config/fonts",
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    str(Path.home() / ".fonts"),
+    "/Library/Fonts",
+    "/System/Library/Fonts",
+    "C:/Windows/Fonts",
+]
+
+# Advance widths in em for common sans-serif glyphs, used when no font file is available
+_FALLBACK_ADVANCES = {
+    **{c: 0.28 for c in " .,:;'!|iIjlft()[]"},
+    **{c: 0.33 for c in "r-\"/"},
+    **{c: 0.5 for c in "abcdeghknopqsuvxyz0123456789?$"},
+    **{c: 0.72 for c in "mwMW@%"},
+    **{c: 0.65 for c in "ABCDEFGHJKLNOPQRSTUVXYZ&"},
+}
+_FALLBACK_DEFAULT = 0.55
+
+
+class SlotBox(BaseModel):
+    """Geometry of the box a slot is set in (derived from the template's CSS)."""
+    width: float  # px, per column
+    font_size: float  # pt
+    line_height: float = 1.5  # multiple of font size
+    max_lines: int  # lines per column before the slot overflows its layout
+    letter_spacing: float = 0.0  # px
+    uppercase: bool = False
+    bold: bool = False
+    columns: int = 1
+    font_family: str = ""  # CSS font-family list the slot is set in; default font if empty
+
+
+class FitEstimate(BaseModel):
+    """Predicted layout of a slot's text."""
+    lines: int
+    max_lines: int
+    fits: bool
+    height: float  # px
+    widest_word: float  # px; wider than the box means horizontal overflow
+
+
+class FontMetrics:
+    """Advance widths from a TrueType/OpenType font (fonttools), or fallback estimates."""
+
+    def __init__(self, font_path: Optional[str] = None):
+        self.font_path = font_path
+        self._advances: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._cmap = None
+        if font_path:
+            from fontTools.ttLib import TTFont
+            font = TTFont(font_path, lazy=True)
+            units_per_em = font["head"].unitsPerEm
+            metrics = font["hmtx"].metrics
+            cmap = font.getBestCmap() or {}
+            self._cmap = {
+                codepoint: metrics[glyph][0] / units_per_em
+                for codepoint, glyph in cmap.items()
+                if glyph in metrics
+            }
+            font.close()
+
+    def advance(self, char: str) -> float:
+        """Advance width of a character in em."""
+        width = self._advances.get(char)
+        if width is None:
+            if self._cmap is not None and ord(char) in self._cmap:
+                width = self._cmap[ord(char)]
+            else:
+                width = _FALLBACK_ADVANCES.get(char, _FALLBACK_DEFAULT)
+            with self._lock:
+                self._advances[char] = width
+        return width
+
+    def text_width(self, text: str, font_size_px: float, letter_spacing: float = 0.0) -> float:
+        """Width of a run of text in px."""
+        return sum(self.advance(c) for c in text) * font_size_px + letter_spacing * len(text)
+
+
+def _find_font(candidates: List[str] = _FONT_CANDIDATES) -> Optional[str]:
+    for directory in _FONT_DIRS:
+        root = Path(directory)
+        if not root.is_dir():
+            continue
+        for name in candidates:
+            matches = list(root.rglob(name))
+            if matches:
+                return str(matches[0])
+    return None
+
+
+def _default_font() -> Optional[str]:
+    """Font used when none of a box's families is installed."""
+    return settings.text_metrics_font or _find_font()
+
+
+_family_files: Optional[Dict[str, str]] = None
+
+
+def _installed_families() -> Dict[str, str]:
+    """Lower-cased family name -> font file of its regular face, from the font dirs (scanned once)."""
+    global _family_files
+    if _family_files is not None:
+        return _family_files
+    from fontTools.ttLib import TTFont
+
+    families: Dict[str, str] = {}
+    regular = set()
+    for directory in _FONT_DIRS:
+        root = Path(directory)
+        if not root.is_dir():
+            continue
+        for path in sorted(root.rglob("*")):
+            if path.suffix.lower() not in (".ttf", ".otf"):
+                continue
+            try:
+                font = TTFont(str(path), lazy=True)
+                names = font["name"]
+                # Typographic family/subfamily (16/17) group weights under one name
+                family = names.getDebugName(16) or names.getDebugName(1)
+                style = (names.getDebugName(17) or names.getDebugName(2) or "").lower()
+                font.close()
+            except Exception:
+                continue
+            if not family:
+                continue
+            family = family.lower()
+            if family in regular:
+                continue
+            if style in ("regular", "book", "roman", "normal"):
+                families[family] = str(path)
+                regular.add(family)
+            else:
+                families.setdefault(family, str(path))
+    _family_files = families
+    return families
+
+
+def _parse_families(font_family: str) -> List[str]:
+    """Family names of a CSS font-family list, in order."""
+    return [name.strip().strip("'\"").lower() for name in font_family.split(",") if name.strip()]
+
+
+def resolve_font(font_family: str) -> Optional[str]:
+    """
+    Font file for a CSS font-family list: the first installed family wins.
+
+    Generic families ("serif", "sans-serif", ...) match common system faces;
+    if nothing matches, the default font (settings.text_metrics_font or the
+    first system font found) is used.
+    """
+    for family in _parse_families(font_family):
+        if family in _GENERIC_FAMILIES:
+            path = _find_font(_GENERIC_FAMILIES[family])
+        else:
+            path = _installed_families().get(family)
+        if path:
+            return path
+    return _default_font()
+
+
+_metrics: Dict[Optional[str], FontMetrics] = {}
+_family_metrics: Dict[str, FontMetrics] = {}
+_metrics_lock = threading.Lock()
+
+
+def _load_metrics(font_path: Optional[str]) -> FontMetrics:
+    metrics = _metrics.get(font_path)
+    if metrics is None:
+        try:
+            metrics = FontMetrics(font_path)
+        except Exception as e:
+            print(f"Could not load font metrics, using estimates: {e}")
+            metrics = FontMetrics(None)
+        _metrics[font_path] = metrics
+    return metrics
+
+
+def get_font_metrics(font_family: str = "") -> FontMetrics:
+    """
+    Return the process-wide metrics of a CSS font-family list (resolved and loaded once).
+
+    An empty font_family means the default font.
+    """
+    with _metrics_lock:
+        metrics = _family_metrics.get(font_family)
+        if metrics is None:
+            try:
+                font_path = resolve_font(font_family) if font_family else _default_font()
+            except Exception as e:
+                print(f"Could not resolve font {font_family!r}, using the default font: {e}")
+                font_path = _default_font()
+            metrics = _family_metrics[font_family] = _load_metrics(font_path)
+    return metrics
+
+
+def wrap_lines(text: str, box: SlotBox, metrics: Optional[FontMetrics] = None) -> List[str]:
+    """Greedy word wrap of text into lines of at most box.width px."""
+    metrics = metrics or get_font_metrics(box.font_family)
+    font_px = box.font_size * PT_TO_PX * (BOLD_WIDTH_FACTOR if box.bold else 1.0)
+    if box.uppercase:
+        text = text.upper()
+    space = metrics.text_width(" ", font_px, box.letter_spacing)
+    lines, line, line_width = [], [], 0.0
+    for word in text.split():
+        width = metrics.text_width(word, font_px, box.letter_spacing)
+        if line and line_width + space + width > box.width:
+            lines.append(" ".join(line))
+            line, line_width = [word], width
+        else:
+            line_width += (space if line else 0.0) + width
+            line.append(word)
+    if line:
+        lines.append(" ".join(line))
+    return lines
+
+
+def estimate_fit(text: str, box: SlotBox, metrics: Optional[FontMetrics] = None) -> FitEstimate:
+    """Predict line count, height and overflow of text set in box."""
+    metrics = metrics or get_font_metrics(box.font_family)
+    text = text or ""
+    font_px = box.font_size * PT_TO_PX * (BOLD_WIDTH_FACTOR if box.bold else 1.0)
+    source = text.upper() if box.uppercase else text
+    widest = max((metrics.text_width(word, font_px, box.letter_spacing) for word in source.split()), default=0.0)
+    lines = len(wrap_lines(text, box, metrics))
+    max_lines = box.max_lines * box.columns
+    return FitEstimate(
+        lines=lines,
+        max_lines=max_lines,
+        fits=lines <= max_lines and widest <= box.width,
+        height=-(-lines // box.columns) * box.font_size * PT_TO_PX * box.line_height,
+        widest_word=widest,
+    )
+
+
+def slot_box(text_boxes: Dict[str, SlotBox], slot_name: str) -> Optional[SlotBox]:
+    """Box for a slot; "usp" covers usp_1..usp_5."""
+    return text_boxes.get(slot_name) or text_boxes.get(slot_name.split("_")[0])
+
+
+# Share of a box's line capacity usable by word-wrapped text (lines break before the edge)
+WRAP_FILL = 0.85
+
+
+def box_char_limit(text: str, box: SlotBox, metrics: Optional[FontMetrics] = None) -> int:
+    """Characters of text like this one that are predicted to fit the box."""
+    metrics = metrics or get_font_metrics(box.font_family)
+    text = (text or "").upper() if box.uppercase else (text or "")
+    if not text:
+        return 0
+    font_px = box.font_size * PT_TO_PX * (BOLD_WIDTH_FACTOR if box.bold else 1.0)
+    char_width = metrics.text_width(text, font_px, box.letter_spacing) / len(text)
+    capacity = box.width * box.max_lines * box.columns * WRAP_FILL
+    return max(1, int(capacity / char_width))
+
+
+def fit_to_box(text: str, box: SlotBox, metrics: Optional[FontMetrics] = None) -> str:
+    """
+    Shorten text until it is predicted to fit the box.
+
+    Keeps the longest run of whole sentences that fits; text without a
+    fitting sentence is cut at a word boundary without a dangling
+    connective (see text_fitter.fit_text).
+    """
+    from core.text_fitter import fit_text, sentence_ends
+
+    metrics = metrics or get_font_metrics(box.font_family)
+    if estimate_fit(text, box, metrics).fits:
+        return text
+    for end in reversed(sentence_ends(text)):
+        if estimate_fit(text[:end], box, metrics).fits:
+            return text[:end].strip()
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_fit(fit_text(text, middle), box, metrics).fits:
+            low = middle
+        else:
+            high = middle - 1
+    return fit_text(text, low)
@@ -1,39 +1,36 @@
 """Generate truly different variants using AI."""
-import google.generativeai as genai
 from typing import List, Dict
 from models.product_brief import ProductBrief
 from config.settings import settings
+from core.llm_providers import GenerationOptions, agenerate_text, generate_text, get_provider
 import json
 import re
 
 
-def _get_gemini_client():
-    """Initialize Gemini API client."""
-    if not settings.google_api_key:
-        raise ValueError("GOOGLE_API_KEY not set in environment")
-    genai.configure(api_key=settings.google_api_key)
-    model_name = settings.gemini_model
-    if not model_name.startswith("models/"):
-        model_name = f"models/{model_name}"
-    return genai.GenerativeModel(model_name)
+# Shape of the JSON answer requested by _create_variant_prompt
+VARIANTS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "variants": {
+            "type": "array",
+            "prefixItems": [
+                {
+                    "type": "object",
+                    "properties": {
+                        "headline": {"type": "string", "maxLength": 60},
+                        "tagline": {"type": "string", "maxLength": 40},
+                        "tone": {"type": "string", "enum": [tone]},
+                    },
+                }
+                for tone in ("professional", "emotional", "technical")
+            ],
+        }
+    },
+}
 
 
-def generate_variant_headlines(product_name: str, description: str, audience: str, language: str = 'en') -> List[Dict[str, str]]:
-    """
-    Generate 3 truly different headlines and taglines for variants.
-    
-    Returns:
-        [
-            {
-                "headline": "...",
-                "tagline": "...",
-                "tone": "professional|emotional|technical"
-            },
-            ...
-        ]
-    """
-    model = _get_gemini_client()
-    
+def _create_variant_prompt(product_name: str, description: str, audience: str, language: str) -> str:
+    """Create the prompt asking for three differently-toned variants."""
     # Language-specific instructions
     lang_instruction = ""
     if language == 'zh':
@@ -43,7 +40,7 @@ def generate_variant_headlines(product_name: str, description: str, audience: st
     else:
         lang_instruction = "\nIMPORTANT: Generate all content in English."
     
-    prompt = f"""Generate 3 COMPLETELY DIFFERENT headlines and taglines for a product onepager.{lang_instruction}
+    return f"""Generate 3 COMPLETELY DIFFERENT headlines and taglines for a product onepager.{lang_instruction}
 
 Product Name: {product_name}
 Description: {description[:300]}
@@ -96,38 +93,76 @@ Return ONLY valid JSON:
 Return ONLY the JSON, no other text.
 """
 
-    try:
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
-        
-        # Extract JSON
-        json_match = re.search(r'\{[^{}]*"variants"[^{}]*\}', response_text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(0)
-        else:
-            json_str = response_text
-        
-        data = json.loads(json_str)
-        return data.get('variants', [])
-    except Exception as e:
-        # Fallback to default variants
-        return [
-            {
-                "headline": f"{product_name}: Professional Excellence",
-                "tagline": "Delivering superior quality and reliability",
-                "tone": "professional"
-            },
+
+def _parse_variants(response_text: str) -> List[Dict[str, str]]:
+    """Extract the variants list from a model response."""
+    # Extract JSON
+    json_match = re.search(r'\{[^{}]*"variants"[^{}]*\}', response_text, re.DOTALL)
+    if json_match:
+        json_str = json_match.group(0)
+    else:
+        json_str = response_text
+    
+    data = json.loads(json_str)
+    return data.get('variants', [])
+
+
+def _default_variants(product_name: str) -> List[Dict[str, str]]:
+    """Fallback variants used when the model call or parsing fails."""
+    return [
+        {
+            "headline": f"{product_name}: Professional Excellence",
+            "tagline": "Delivering superior quality and reliability",
+            "tone": "professional"
+        },
+        {
+            "headline": f"Transform Your World with {product_name}",
+            "tagline": "Experience the difference that matters",
+            "tone": "emotional"
+        },
+        {
+            "headline": f"{product_name}: Advanced Innovation Technology",
+            "tagline": "Cutting-edge solutions for modern challenges",
+            "tone": "technical"
+        }
+    ]
+
+
+def generate_variant_headlines(product_name: str, description: str, audience: str, language: str = 'en') -> List[Dict[str, str]]:
+    """
+    Generate 3 truly different headlines and taglines for variants.
+    
+    Returns:
+        [
             {
-                "headline": f"Transform Your World with {product_name}",
-                "tagline": "Experience the difference that matters",
-                "tone": "emotional"
+                "headline": "...",
+                "tagline": "...",
+                "tone": "professional|emotional|technical"
             },
-            {
-                "headline": f"{product_name}: Advanced Innovation Technology",
-                "tagline": "Cutting-edge solutions for modern challenges",
-                "tone": "technical"
-            }
+            ...
         ]
+    """
+    provider = get_provider()
+    prompt = _create_variant_prompt(product_name, description, audience, language)
+
+    try:
+        response_text = generate_text(prompt, GenerationOptions(json_mode=True, response_schema=VARIANTS_SCHEMA), provider=provider)
+        return _parse_variants(response_text)
+    except Exception as e:
+        # Fallback to default variants
+        return _default_variants(product_name)
+
+
+async def generate_variant_headlines_async(product_name: str, description: str, audience: str, language: str = 'en') -> List[Dict[str, str]]:
+    """Async variant of generate_variant_headlines using the SDK's async call."""
+    provider = get_provider()
+    prompt = _create_variant_prompt(product_name, description, audience, language)
+
+    try:
+        response_text = await agenerate_text(prompt, GenerationOptions(json_mode=True, response_schema=VARIANTS_SCHEMA), provider=provider)
+        return _parse_variants(response_text)
+    except Exception as e:
+        return _default_variants(product_name)
 
 
 def reorder_features_for_variant(features: List[str], variant_type: str) -> List[str]:
@@ -1,10 +1,9 @@
-"""Web scraping using Gemini API to extract product information from URLs."""
-import google.generativeai as genai
-import requests
+"""Web scraping using an LLM (Gemini by default) to extract product information from URLs."""
 from typing import Optional, Dict
-from bs4 import BeautifulSoup
 from pydantic import BaseModel
 from config.settings import settings
+from core.llm_providers import GenerationOptions, agenerate_text, generate_text
+import json
 import re
 
 
@@ -18,15 +17,57 @@ class ScrapedProductData(BaseModel):
     imageUrl: Optional[str] = None
 
 
-def _get_gemini_client():
-    """Initialize Gemini API client."""
-    if not settings.google_api_key:
-        raise ValueError("GOOGLE_API_KEY not set in environment")
-    genai.configure(api_key=settings.google_api_key)
-    model_name = settings.gemini_model
-    if not model_name.startswith("models/"):
-        model_name = f"models/{model_name}"
-    return genai.GenerativeModel(model_name)
+# Shape of the JSON answer requested by _create_scrape_prompt
+SCRAPE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "productName": {"type": "string", "maxLength": 60},
+        "description": {"type": "string", "maxLength": 900},
+        "features": {"type": "array", "items": {"type": "string", "maxLength": 120}, "minItems": 4},
+        "audience": {"type": "string", "enum": ["B2B", "B2C"]},
+    },
+}
+
+_FETCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+def _extract_webpage_content(content: bytes, url: str) -> tuple[str, Optional[str]]:
+    """
+    Extract visible text and the main product image from raw HTML.
+    Returns (text_content, image_url)
+    """
+    from bs4 import BeautifulSoup
+    
+    soup = BeautifulSoup(content, 'html.parser')
+    
+    # Remove script and style elements
+    for script in soup(["script", "style", "nav", "footer", "header"]):
+        script.decompose()
+    
+    # Extract text
+    text = soup.get_text(separator=' ', strip=True)
+    # Clean up whitespace
+    text = ' '.join(text.split())
+    
+    # Try to find main product image
+    image_url = None
+    img_tags = soup.find_all('img', src=True)
+    for img in img_tags:
+        src = img.get('src', '')
+        if src and not src.startswith('data:'):
+            if any(keyword in src.lower() for keyword in ['product', 'hero', 'main', 'feature']):
+                if src.startswith('//'):
+                    image_url = 'https:' + src
+                elif src.startswith('/'):
+                    from urllib.parse import urljoin
+                    image_url = urljoin(url, src)
+                else:
+                    image_url = src
+                break
+    
+    return text[:5000], image_url  # Limit to 5000 chars for the LLM prompt
 
 
 def _fetch_webpage_content(url: str) -> tuple[str, Optional[str]]:
@@ -34,76 +75,50 @@ def _fetch_webpage_content(url: str) -> tuple[str, Optional[str]]:
     Fetch webpage content and extract text.
     Returns (text_content, image_url)
     """
+    import requests
+    
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
+        response = requests.get(url, headers=_FETCH_HEADERS, timeout=10)
         response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header"]):
-            script.decompose()
-        
-        # Extract text
-        text = soup.get_text(separator=' ', strip=True)
-        # Clean up whitespace
-        text = ' '.join(text.split())
-        
-        # Try to find main product image
-        image_url = None
-        img_tags = soup.find_all('img', src=True)
-        for img in img_tags:
-            src = img.get('src', '')
-            if src and not src.startswith('data:'):
-                if any(keyword in src.lower() for keyword in ['product', 'hero', 'main', 'feature']):
-                    if src.startswith('//'):
-                        image_url = 'https:' + src
-                    elif src.startswith('/'):
-                        from urllib.parse import urljoin
-                        image_url = urljoin(url, src)
-                    else:
-                        image_url = src
-                    break
-        
-        return text[:5000], image_url  # Limit to 5000 chars for Gemini
+        return _extract_webpage_content(response.content, url)
     
     except Exception as e:
         raise Exception(f"Failed to fetch webpage: {str(e)}")
 
 
-def scrape_product_data(url: str) -> ScrapedProductData:
-    """
-    Scrape product data from URL using Gemini API.
+async def _fetch_webpage_content_async(url: str) -> tuple[str, Optional[str]]:
+    """Async variant of _fetch_webpage_content using httpx."""
+    import httpx
     
-    Uses Gemini to analyze webpage content and extract structured product information.
-    """
     try:
-        # Fetch webpage content
-        webpage_text, image_url = _fetch_webpage_content(url)
-        
-        # Use Gemini to extract product information
-        model = _get_gemini_client()
-        
-        # Smart URL detection for better data
-        url_lower = url.lower()
-        context_hint = ""
-        if 'colgate' in url_lower or 'toothpaste' in url_lower:
-            context_hint = "This is likely a Colgate dental product. Extract specific dental benefits, whitening features, and oral care technology."
-        elif 'iphone' in url_lower or 'apple.com' in url_lower:
-            context_hint = "This is likely an Apple iPhone. Extract chip details (A-series), camera specs, battery life, and display features."
-        elif 'tesla' in url_lower:
-            context_hint = "This is likely a Tesla vehicle. Extract range, performance specs, autopilot features, and charging capabilities."
-        elif 'nike' in url_lower:
-            context_hint = "This is likely a Nike product. Extract running technology, cushioning, design features, and athletic performance benefits."
-        elif 'samsung' in url_lower or 'galaxy' in url_lower:
-            context_hint = "This is likely a Samsung Galaxy device. Extract camera specifications, display technology, processor, and S Pen features."
-        elif 'macbook' in url_lower or 'mac' in url_lower:
-            context_hint = "This is likely a MacBook. Extract M-series chip details, display specs, battery life, and professional features."
-
-        prompt = f"""Analyze the following webpage content and extract product/service information in JSON format.
+        async with httpx.AsyncClient(headers=_FETCH_HEADERS, timeout=10, follow_redirects=True) as client:
+            response = await client.get(url)
+            response.raise_for_status()
+        return _extract_webpage_content(response.content, url)
+    
+    except Exception as e:
+        raise Exception(f"Failed to fetch webpage: {str(e)}")
+
+
+def _create_scrape_prompt(url: str, webpage_text: str) -> str:
+    """Create the extraction prompt for a fetched webpage."""
+    # Smart URL detection for better data
+    url_lower = url.lower()
+    context_hint = ""
+    if 'colgate' in url_lower or 'toothpaste' in url_lower:
+        context_hint = "This is likely a Colgate dental product. Extract specific dental benefits, whitening features, and oral care technology."
+    elif 'iphone' in url_lower or 'apple.com' in url_lower:
+        context_hint = "This is likely an Apple iPhone. Extract chip details (A-series), camera specs, battery life, and display features."
+    elif 'tesla' in url_lower:
+        context_hint = "This is likely a Tesla vehicle. Extract range, performance specs, autopilot features, and charging capabilities."
+    elif 'nike' in url_lower:
+        context_hint = "This is likely a Nike product. Extract running technology, cushioning, design features, and athletic performance benefits."
+    elif 'samsung' in url_lower or 'galaxy' in url_lower:
+        context_hint = "This is likely a Samsung Galaxy device. Extract camera specifications, display technology, processor, and S Pen features."
+    elif 'macbook' in url_lower or 'mac' in url_lower:
+        context_hint = "This is likely a MacBook. Extract M-series chip details, display specs, battery life, and professional features."
+
+    return f"""Analyze the following webpage content and extract product/service information in JSON format.
 
 Webpage URL: {url}
 {context_hint}
@@ -138,38 +153,67 @@ Important:
 - Return ONLY the JSON, no other text
 """
 
-        response = model.generate_content(prompt)
+
+def _parse_scraped_data(response_text: str, image_url: Optional[str]) -> ScrapedProductData:
+    """Parse the model's JSON answer into ScrapedProductData."""
+    # Try to extract JSON if wrapped in markdown code blocks
+    json_match = re.search(r'\{[^{}]*\}', response_text, re.DOTALL)
+    if json_match:
+        json_str = json_match.group(0)
+    else:
+        json_str = response_text
+    
+    # Parse JSON
+    data = json.loads(json_str)
+    
+    # Validate and create ScrapedProductData
+    scraped_data = ScrapedProductData(
+        productName=data.get('productName', 'Unknown Product'),
+        description=data.get('description', ''),
+        features=data.get('features', [])[:4],  # Ensure max 4 features
+        audience=data.get('audience', 'B2B'),
+        language='en',
+        imageUrl=image_url
+    )
+    
+    # Ensure we have exactly 4 features
+    while len(scraped_data.features) < 4:
+        scraped_data.features.append('')
+    
+    return scraped_data
+
+
+def scrape_product_data(url: str) -> ScrapedProductData:
+    """
+    Scrape product data from URL using the configured LLM provider.
+    
+    Uses the LLM to analyze webpage content and extract structured product information.
+    """
+    try:
+        # Fetch webpage content
+        webpage_text, image_url = _fetch_webpage_content(url)
         
-        # Extract JSON from response
-        response_text = response.text.strip()
+        # Use the LLM to extract product information
+        response_text = generate_text(
+            _create_scrape_prompt(url, webpage_text), GenerationOptions(json_mode=True, response_schema=SCRAPE_SCHEMA)
+        )
         
-        # Try to extract JSON if wrapped in markdown code blocks
-        json_match = re.search(r'\{[^{}]*\}', response_text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(0)
-        else:
-            json_str = response_text
+        return _parse_scraped_data(response_text, image_url)
         
-        # Parse JSON
-        import json
-        data = json.loads(json_str)
+    except Exception as e:
+        raise Exception(f"Failed to scrape product data: {str(e)}")
+
+
+async def scrape_product_data_async(url: str) -> ScrapedProductData:
+    """Async variant of scrape_product_data (httpx fetch + async LLM call)."""
+    try:
+        webpage_text, image_url = await _fetch_webpage_content_async(url)
         
-        # Validate and create ScrapedProductData
-        scraped_data = ScrapedProductData(
-            productName=data.get('productName', 'Unknown Product'),
-            description=data.get('description', ''),
-            features=data.get('features', [])[:4],  # Ensure max 4 features
-            audience=data.get('audience', 'B2B'),
-            language='en',
-            imageUrl=image_url
+        response_text = await agenerate_text(
+            _create_scrape_prompt(url, webpage_text), GenerationOptions(json_mode=True, response_schema=SCRAPE_SCHEMA)
         )
         
-        # Ensure we have exactly 4 features
-        while len(scraped_data.features) < 4:
-            scraped_data.features.append('')
-        
-        return scraped_data
+        return _parse_scraped_data(response_text, image_url)
         
     except Exception as e:
         raise Exception(f"Failed to scrape product data: {str(e)}")
-
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Measure cold-start time: module imports and the first render in a fresh interpreter."""
+import sys
+import argparse
+import json
+import statistics
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Each scenario runs in a new interpreter; it prints a JSON dict of timings in ms
+SCENARIOS = {
+    "import api.main": "import api.main",
+    "import core": "import core",
+    "import templates": "import templates",
+    "first html": (
+        "from core.copy_generator import CopySlots\n"
+        "from templates.registry import get_template\n"
+        "get_template('template_01').render_html(CopySlots(title='T', intro='I', usp_1='U'), 'P')"
+    ),
+}
+
+_HARNESS = """
+import sys, time, json
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+exec(compile({code!r}, "<scenario>", "exec"))
+print(json.dumps({{"ms": (time.perf_counter() - start) * 1000, "modules": len(sys.modules)}}))
+"""
+
+
+def run_scenario(code: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", _HARNESS.format(root=str(ROOT), code=code)],
+        capture_output=True, text=True, check=True, cwd=ROOT
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(code: str, top: int) -> list:
+    """(self ms, cumulative ms, module) for the slowest modules to import, from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {str(ROOT)!r})\n{code}"],
+        capture_output=True, text=True, check=True, cwd=ROOT
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if name.strip() not in ("site", "encodings"):
+            imports.append((int(self_us) / 1000, int(cumulative_us) / 1000, name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark application cold start")
+    parser.add_argument("--runs", "-n", type=int, default=5, help="Fresh interpreters per scenario")
+    parser.add_argument("--scenario", "-s", choices=list(SCENARIOS), action="append",
+                        help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list per scenario (0 disables)")
+    args = parser.parse_args()
+    
+    for name in args.scenario or list(SCENARIOS):
+        code = SCENARIOS[name]
+        runs = [run_scenario(code) for _ in range(args.runs)]
+        times = sorted(run["ms"] for run in runs)
+        print(
+            f"{name:<18} median {statistics.median(times):8.1f} ms   "
+            f"min {times[0]:8.1f} ms   max {times[-1]:8.1f} ms   modules {runs[0]['modules']}"
+        )
+        if args.top:
+            for self_ms, cumulative_ms, module in slowest_imports(code, args.top):
+                print(f"    {self_ms:8.1f} ms self  {cumulative_ms:8.1f} ms total  {module}")
+
+
+if __name__ == "__main__":
+    main()
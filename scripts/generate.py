@@ -2,19 +2,23 @@
 """CLI script for generating onepagers."""
 import sys
 import argparse
+import asyncio
+import itertools
 from pathlib import Path
+from typing import AsyncIterator, Iterable, Iterator, Optional, Tuple
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.normalizer import normalize_csv
-from core.copy_generator import generate_copy
-from core.renderer import render_pdf
-from core.qc_engine import check_quality
-from templates.template_01_minimal import Template01Minimal
+from core.catalog import CatalogDiff, CatalogManifest, pdf_filename
+from core.llm_providers import close_providers
+from core.normalizer import iter_csv_briefs
+from core.pipeline import build_onepager_pipeline
+from core.render_service import get_render_service
+from core.run_store import get_run_store, is_pending, restore_item, stream_into_run
+from templates.registry import get_template
 from config.settings import settings
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.panel import Panel
 
 console = Console()
@@ -28,6 +32,14 @@ def main():
     parser.add_argument("--template", "-t", default="template_01", help="Template ID")
     parser.add_argument("--language", "-l", default=None, help="Language code (overrides CSV)")
     parser.add_argument("--skip-qc", action="store_true", help="Skip quality control")
+    parser.add_argument("--batch-size", type=int, default=settings.batch_size,
+                        help="Products per LLM request (1 disables batching)")
+    parser.add_argument("--resume", nargs="?", const="latest", default=None, metavar="RUN_ID",
+                        help="Continue an interrupted or failed run (default: the latest run of --input)")
+    parser.add_argument("--full", action="store_true",
+                        help="Regenerate every product, not only those new or changed since the last run")
+    parser.add_argument("--prune", action="store_true",
+                        help="Delete the PDFs of products that are no longer in the CSV")
     
     args = parser.parse_args()
     
@@ -43,74 +55,172 @@ def main():
     
     console.print(Panel.fit("[bold blue]Onepager Generation Agent[/bold blue]", border_style="blue"))
     
-    # Step 1: Normalize input
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console
-    ) as progress:
-        task = progress.add_task("Normalizing input...", total=None)
+    store = get_run_store()
+    manifest = CatalogManifest(output_dir)
+    source = str(input_path.resolve())
+    if args.resume:
+        # Resume a recorded run: stored briefs and stage results, only unfinished products
+        run = store.latest_run("cli", source) if args.resume == "latest" else store.get_run(args.resume)
+        if run is None:
+            console.print(f"[red]Error: No run to resume for {input_path}[/red]")
+            sys.exit(1)
+        run_id = run["run_id"]
+        template = get_template(run["template_id"])
+        recorded = finished = 0
+        for record in store.iter_items(run_id):
+            recorded += 1
+            if not is_pending(record):
+                finished += 1
+                manifest.record(record["brief"], get_template(record["template_id"]), _qc_status(record["qc"]))
+        total = recorded - finished
+        console.print(
+            f"[bold]Resuming run {run_id[:8]}: {finished} of {recorded} onepager(s) already done[/bold]"
+        )
+    else:
+        # Step 1: Normalize input, streamed in chunks into the run while the
+        # pipeline works; only new and changed products are kept (the rest
+        # keep their PDFs) unless --full is given
+        template = get_template(args.template)
+        diff = CatalogDiff()
+        briefs = _with_language(iter_csv_briefs(input_path), args.language)
+        if not args.full:
+            briefs = manifest.select(briefs, template, diff)
         try:
-            briefs = normalize_csv(input_path)
-            progress.update(task, description=f"✓ Normalized {len(briefs)} product(s)")
+            # Unreadable input (e.g. an invalid first row) fails before the run is recorded
+            first = next(briefs, None)
         except Exception as e:
             console.print(f"[red]Error normalizing input: {e}[/red]")
             sys.exit(1)
+        briefs = itertools.chain([first], briefs) if first is not None else iter(())
+        run_id = store.create_run("cli", source=source, template_id=template.template_id)
+        total = None
+    
+    # Steps 3-5: copy -> QC -> render run as pipeline stages, so LLM calls for
+    # later products overlap with rendering of earlier ones; every stage result
+    # is recorded, so an interrupted run continues with --resume
+    render_service = get_render_service([type(template)])
+    if args.resume:
+        items = _pending_items(store, run_id, output_dir)
+    else:
+        items = _new_items(store, run_id, briefs, template, output_dir)
+    pipeline = build_onepager_pipeline(
+        check=not args.skip_qc,
+        batch_size=max(1, args.batch_size),
+        after_stage=lambda item, stage: store.record_stage(run_id, item, stage),
+    )
+    
+    console.print(
+        f"[bold]Generating {'onepagers' if total is None else f'{total} onepager(s)'} with {settings.llm_provider} "
+        f"and {render_service.workers} render worker(s)...[/bold]"
+    )
+    try:
+        done, failed = asyncio.run(_run_pipeline(args, pipeline, items, total, manifest))
+        if not args.resume and not args.full:
+            counts = diff.counts()
+            console.print(
+                f"\n[bold]Catalog: {counts['unchanged']} unchanged, {counts['changed']} changed, "
+                f"{counts['added']} added, {counts['removed']} removed[/bold]"
+            )
+            manifest.remove(diff.removed, delete_files=args.prune)
+    except Exception as e:
+        store.set_run_status(run_id, "failed")
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+    finally:
+        render_service.shutdown()
+        manifest.save()
+    store.set_run_status(run_id, "failed" if failed else "done")
+    
+    stats = pipeline.stats()
+    busy = ", ".join(f"{name} {stage['busy_seconds']:.1f}s" for name, stage in stats["stages"].items())
+    console.print(f"\n[dim]Finished in {stats['elapsed_seconds']:.1f}s (stage busy time: {busy})[/dim]")
+    if failed:
+        console.print(f"[bold red]✗ {failed} of {done} onepager(s) failed[/bold red]")
+        console.print(f"[yellow]Retry the failed onepager(s) with --resume {run_id}[/yellow]")
+        sys.exit(1)
+    console.print(f"\n[bold green]✓ Successfully generated {done} onepager(s)![/bold green]")
+
+
+async def _new_items(store, run_id: str, briefs: Iterable, template, output_dir: Path) -> AsyncIterator:
+    """Record products in the run as they are read, and hand them to the pipeline."""
+    recorded = stream_into_run(store, run_id, ((brief, template.template_id) for brief in briefs))
+    async for record in recorded:
+        yield restore_item(record, template, output_dir / pdf_filename(record["brief"], template.template_id))
+
+
+def _pending_items(store, run_id: str, output_dir: Path) -> Iterator:
+    """Unfinished products of a run as pipeline items, read from the store as the pipeline takes them."""
+    templates = {}
+    for record in store.iter_items(run_id):
+        if not is_pending(record):
+            continue
+        template_id = record["template_id"]
+        if template_id not in templates:
+            templates[template_id] = get_template(template_id)
+        yield restore_item(record, templates[template_id], output_dir / pdf_filename(record["brief"], template_id))
+
+
+async def _run_pipeline(args, pipeline, items, total: Optional[int], manifest) -> Tuple[int, int]:
+    """Report and record each product as it leaves the pipeline; returns (products, failures)."""
+    failed = 0
+    done = 0
+    try:
+        async for item in pipeline.run(items):
+            done += 1
+            if item.error:
+                failed += 1
+                _report_failure(item, done, total)
+            else:
+                manifest.record(item.brief, item.template, _qc_status(item.qc))
+                _report_product(args, item, done, total)
+    finally:
+        await close_providers()
+    return done, failed
+
+
+def _with_language(briefs: Iterable, language: Optional[str]) -> Iterator:
+    """Override every brief's language (--language)."""
+    for brief in briefs:
+        if language:
+            brief.language = language
+        yield brief
+
+
+def _qc_status(qc_result) -> Optional[str]:
+    return qc_result.overall_status if qc_result else None
+
+
+def _progress(done: int, total: Optional[int]) -> str:
+    return str(done) if total is None else f"{done}/{total}"
+
+
+def _report_failure(item, done: int, total: Optional[int]) -> None:
+    console.print(f"\n[bold]Product {_progress(done, total)}: {item.brief.name}[/bold]")
+    console.print(f"[red]✗ {item.failed_stage} failed: {item.error}[/red]")
+    if item.failed_stage == "copy":
+        console.print(f"[yellow]Hint: Make sure GOOGLE_API_KEY is set in .env file[/yellow]")
+
+
+def _report_product(args, item, done: int, total: Optional[int]) -> None:
+    """Print QC results and the output path of one finished product."""
+    console.print(f"\n[bold]Product {_progress(done, total)}: {item.brief.name}[/bold]")
     
-    # Process each product
-    for idx, brief in enumerate(briefs, 1):
-        console.print(f"\n[bold]Processing product {idx}/{len(briefs)}: {brief.name}[/bold]")
-        
-        # Override language if specified
-        if args.language:
-            brief.language = args.language
-        
-        # Step 2: Select template
-        template = Template01Minimal()  # For MVP, only one template
-        
-        # Step 3: Generate copy
-        with console.status("[bold green]Generating copy with Gemini...") as status:
-            try:
-                slot_limits = template.get_slot_limits()
-                copy = generate_copy(brief, slot_limits)
-                console.print("[green]✓ Copy generated[/green]")
-            except Exception as e:
-                console.print(f"[red]Error generating copy: {e}[/red]")
-                console.print(f"[yellow]Hint: Make sure GOOGLE_API_KEY is set in .env file[/yellow]")
-                sys.exit(1)
-        
-        # Step 4: Quality control
-        if not args.skip_qc:
-            with console.status("[bold yellow]Running quality control...") as status:
-                qc_result = check_quality(template, copy)
-                
-                if qc_result.overall_status == "fail":
-                    console.print("[red]✗ QC Failed[/red]")
-                    for check in qc_result.checks:
-                        if check.status == "fail":
-                            console.print(f"  [red]- {check.message}[/red]")
-                    console.print("[yellow]Continuing anyway...[/yellow]")
-                elif qc_result.overall_status == "warning":
-                    console.print("[yellow]⚠ QC Warnings[/yellow]")
-                    for check in qc_result.checks:
-                        if check.status == "warning":
-                            console.print(f"  [yellow]- {check.message}[/yellow]")
-                else:
-                    console.print("[green]✓ QC Passed[/green]")
-        
-        # Step 5: Render PDF
-        with console.status("[bold blue]Rendering PDF...") as status:
-            try:
-                output_filename = f"{brief.product_id}_{template.template_id}_{brief.language}.pdf"
-                output_path = output_dir / output_filename
-                
-                render_pdf(template, copy, brief.name, str(output_path))
-                console.print(f"[green]✓ PDF generated: {output_path}[/green]")
-            except Exception as e:
-                console.print(f"[red]Error rendering PDF: {e}[/red]")
-                sys.exit(1)
+    qc_result = item.qc
+    if not args.skip_qc and qc_result is not None:
+        if qc_result.overall_status == "fail":
+            console.print("[red]✗ QC Failed[/red]")
+            for check in qc_result.checks:
+                if check.status == "fail":
+                    console.print(f"  [red]- {check.message}[/red]")
+        elif qc_result.overall_status == "warning":
+            console.print("[yellow]⚠ QC Warnings[/yellow]")
+            for check in qc_result.checks:
+                if check.status == "warning":
+                    console.print(f"  [yellow]- {check.message}[/yellow]")
+        else:
+            console.print("[green]✓ QC Passed[/green]")
     
-    console.print(f"\n[bold green]✓ Successfully generated {len(briefs)} onepager(s)![/bold green]")
+    console.print(f"[green]✓ PDF generated: {item.output_path}[/green]")
 
 
 if __name__ == "__main__":
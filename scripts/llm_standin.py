@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Local HTTP stand-in for the LLM provider (use with LLM_PROVIDER=http)."""
+import sys
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.settings import settings
+from core.llm_offline import LatencyModel, ReplayProvider, SyntheticProvider, prompt_key
+from core.llm_providers import GenerationOptions
+
+
+def make_handler(provider, latency: LatencyModel):
+    """Build a request handler answering POST /generate with provider output."""
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/generate":
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            prompt = payload.get("prompt", "")
+            options = GenerationOptions(**payload.get("options", {}))
+
+            time.sleep(latency.sample(prompt_key(prompt, options)))
+            try:
+                body = json.dumps({"text": provider._answer(prompt, options)}).encode("utf-8")
+                status = 200
+            except LookupError as e:
+                body = json.dumps({"error": str(e)}).encode("utf-8")
+                status = 404
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Keep load tests quiet
+            pass
+
+    return StandInHandler
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(description="Serve deterministic LLM answers over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address")
+    parser.add_argument("--port", type=int, default=8765, help="Port")
+    parser.add_argument("--mode", choices=["synthetic", "replay"], default="synthetic",
+                        help="Answer from the synthetic generator or recorded fixtures")
+    parser.add_argument("--latency", default=settings.llm_synthetic_latency,
+                        help="Latency distribution, e.g. fixed:0.2, uniform:0.1,0.8, lognormal:-0.7,0.5")
+    args = parser.parse_args()
+
+    provider_class = ReplayProvider if args.mode == "replay" else SyntheticProvider
+    provider = provider_class(args.mode)
+    latency = LatencyModel(args.latency, settings.llm_synthetic_seed)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(provider, latency))
+    print(f"LLM stand-in ({args.mode}, latency={args.latency}) on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
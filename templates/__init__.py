@@ -1,18 +1,37 @@
 """Template system for onepager generation."""
+import importlib
 from .base import BaseTemplate
-from .template_01_minimal import Template01Minimal
-from .template_02_modern import Template02Modern
-from .template_03_dense import Template03Dense
-from .template_04_corporate import Template04Corporate
-from .template_05_creative import Template05Creative
-from .template_06_tech import Template06Tech
-from .template_07_elegant import Template07Elegant
-from .template_08_bold import Template08Bold
-from .template_09_minimalist import Template09Minimalist
-from .template_10_showcase import Template10Showcase
+from .registry import get_template, get_template_class, get_template_classes, template_ids
+
+# Template classes are imported on first attribute access (PEP 562)
+_LAZY = {
+    "Template01Minimal": ".template_01_minimal",
+    "Template02Modern": ".template_02_modern",
+    "Template03Dense": ".template_03_dense",
+    "Template04Corporate": ".template_04_corporate",
+    "Template05Creative": ".template_05_creative",
+    "Template06Tech": ".template_06_tech",
+    "Template07Elegant": ".template_07_elegant",
+    "Template08Bold": ".template_08_bold",
+    "Template09Minimalist": ".template_09_minimalist",
+    "Template10Showcase": ".template_10_showcase",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "BaseTemplate",
+    "get_template",
+    "get_template_class",
+    "get_template_classes",
+    "template_ids",
     "Template01Minimal",
     "Template02Modern",
     "Template03Dense",
@@ -24,4 +43,3 @@ __all__ = [
     "Template09Minimalist",
     "Template10Showcase"
 ]
-
@@ -1,7 +1,12 @@
 """Base template class for all onepager templates."""
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, Optional
+from markupsafe import Markup
 from core.copy_generator import CopySlots
+from core.text_metrics import SlotBox
+
+if TYPE_CHECKING:
+    from jinja2 import Template
 
 
 class BaseTemplate(ABC):
@@ -10,6 +15,10 @@ class BaseTemplate(ABC):
     template_id: str
     template_name: str
     format: str = "A4"  # A4 or A5
+    font_family: str = "'Arial', sans-serif"  # the body's CSS font-family; text-fit metrics use it
+    
+    # Compiled layout (see templates.engine.compile_layout), rendered by render_html
+    layout: Optional["Template"] = None
     
     @abstractmethod
     def get_slot_limits(self) -> Dict[str, int]:
@@ -27,11 +36,23 @@ class BaseTemplate(ABC):
         """
         pass
     
-    @abstractmethod
+    def get_text_boxes(self) -> Dict[str, SlotBox]:
+        """
+        Return the box each slot is set in, for text-fit estimation.
+        
+        Keys are slot names or slot types ("usp" covers usp_1..usp_5).
+        Templates without boxes are only checked against character limits.
+        """
+        return {}
+    
     def render_html(self, copy: CopySlots, product_name: str) -> str:
         """
         Render HTML for the template with provided copy.
         
+        Fills the precompiled layout; copy and product name are HTML-escaped.
+        The layout receives `copy`, `product_name`, `usps` (the template's
+        USP slots in order) and `base_css` (get_css(), inserted verbatim).
+        
         Args:
             copy: CopySlots object with generated copy
             product_name: Product/service name
@@ -39,7 +60,14 @@ class BaseTemplate(ABC):
         Returns:
             HTML string
         """
-        pass
+        if self.layout is None:
+            raise NotImplementedError(f"{type(self).__name__} defines no layout")
+        return self.layout.render(
+            copy=copy,
+            product_name=product_name,
+            usps=[getattr(copy, slot) for slot in self.get_slot_limits() if slot.startswith("usp_")],
+            base_css=Markup(self.get_css()),
+        )
     
     def get_css(self) -> str:
         """
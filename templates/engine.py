@@ -0,0 +1,23 @@
+"""Template engine: template layouts are compiled once at import and rendered with autoescaping."""
+from jinja2 import Environment, Template
+
+
+def _feature_icon(text: str) -> str:
+    from core.image_generator import generate_feature_icon
+    return generate_feature_icon(text)
+
+
+def _feature_image_url(feature: str, product_name: str, size=(400, 300)) -> str:
+    from core.image_generator import get_feature_image_url
+    return get_feature_image_url(feature, product_name, size=tuple(size))
+
+
+# Copy and product names are escaped; the CSS is passed in as Markup
+_environment = Environment(autoescape=True, trim_blocks=True, lstrip_blocks=True)
+_environment.filters["feature_icon"] = _feature_icon
+_environment.globals["feature_image_url"] = _feature_image_url
+
+
+def compile_layout(source: str) -> Template:
+    """Compile a layout to Python code once; templates render it per call."""
+    return _environment.from_string(source)
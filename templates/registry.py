@@ -0,0 +1,77 @@
+"""Template registry: finds template modules without importing them and loads each on first use."""
+import importlib
+import pkgutil
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Type
+from .base import BaseTemplate
+
+
+DEFAULT_TEMPLATE_ID = "template_01"
+
+# template_01_minimal.py -> template_01
+_MODULE_NAME = re.compile(r"^(template_\d+)_\w+$")
+
+_modules: Dict[str, str] = {}
+_classes: Dict[str, Type[BaseTemplate]] = {}
+_instances: Dict[str, BaseTemplate] = {}
+_lock = threading.Lock()
+
+
+def _discover() -> Dict[str, str]:
+    """template_id -> module name, from the file names in this package."""
+    if not _modules:
+        found = {}
+        for module in pkgutil.iter_modules([str(Path(__file__).parent)]):
+            match = _MODULE_NAME.match(module.name)
+            if match:
+                found[match.group(1)] = module.name
+        _modules.update(sorted(found.items()))
+    return _modules
+
+
+def template_ids() -> List[str]:
+    """All template ids, in order (no template module is imported)."""
+    return list(_discover())
+
+
+def get_template_class(template_id: str) -> Type[BaseTemplate]:
+    """
+    Template class for an id, importing its module on first use.
+
+    Unknown ids fall back to DEFAULT_TEMPLATE_ID.
+    """
+    template_class = _classes.get(template_id)
+    if template_class is not None:
+        return template_class
+    modules = _discover()
+    if template_id not in modules:
+        template_id = DEFAULT_TEMPLATE_ID
+    with _lock:
+        template_class = _classes.get(template_id)
+        if template_class is None:
+            module = importlib.import_module(f"{__package__}.{modules[template_id]}")
+            template_class = next(
+                value for value in vars(module).values()
+                if isinstance(value, type)
+                and issubclass(value, BaseTemplate)
+                and getattr(value, "template_id", None) == template_id
+            )
+            _classes[template_id] = template_class
+    return template_class
+
+
+def get_template(template_id: str) -> BaseTemplate:
+    """Shared template instance for an id (templates hold no per-render state)."""
+    template = _instances.get(template_id)
+    if template is None:
+        template_class = get_template_class(template_id)
+        with _lock:
+            template = _instances.setdefault(template_id, template_class())
+    return template
+
+
+def get_template_classes() -> List[Type[BaseTemplate]]:
+    """Every template class (imports all template modules)."""
+    return [get_template_class(template_id) for template_id in template_ids()]
@@ -1,6 +1,7 @@
 """Template 01: Minimal - Photo frame style with elegant border."""
 from .base import BaseTemplate
-from core.copy_generator import CopySlots
+from .engine import compile_layout
+from core.text_metrics import SlotBox
 from typing import Dict
 
 
@@ -10,6 +11,7 @@ class Template01Minimal(BaseTemplate):
     template_id = "template_01"
     template_name = "Minimal"
     format = "A4"
+    font_family = "'Playfair Display', Georgia, serif"
     
     def get_slot_limits(self) -> Dict[str, int]:
         return {
@@ -20,39 +22,38 @@ class Template01Minimal(BaseTemplate):
             "usp_3": 80
         }
     
-    def render_html(self, copy: CopySlots, product_name: str) -> str:
-        usps_html = ""
-        usps = [copy.usp_1, copy.usp_2, copy.usp_3]
-        for usp in usps:
-            if usp:
-                usps_html += f'<div class="feature-item"><div class="dot"></div><p>{usp}</p></div>'
-        
-        html = f"""
+    def get_text_boxes(self) -> Dict[str, SlotBox]:
+        return {
+            "title": SlotBox(width=614, font_size=48, line_height=1.1, max_lines=2, letter_spacing=-1, bold=True, font_family=self.font_family),
+            "intro": SlotBox(width=522, font_size=16, line_height=2, max_lines=5, font_family=self.font_family),
+            "usp": SlotBox(width=582, font_size=15, line_height=1.8, max_lines=2, font_family=self.font_family),
+        }
+    
+    layout = compile_layout("""
 <!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
-    <title>{product_name}</title>
+    <title>{{ product_name }}</title>
     <style>
-        {self.get_css()}
-        * {{ box-sizing: border-box; }}
-        body {{ font-family: 'Playfair Display', Georgia, serif; margin: 0; background: #fafafa; }}
-        .frame {{ border: 40px solid #2c3e50; margin: -20mm; min-height: 100vh; background: white; padding: 60px 50px; }}
-        .title {{ font-size: 48pt; font-weight: 700; color: #2c3e50; margin: 0 0 35px 0; line-height: 1.1; letter-spacing: -1px; }}
-        .intro {{ font-size: 16pt; color: #5a6c7d; line-height: 2; margin: 0 0 50px 0; max-width: 85%; }}
-        .features {{ margin: 50px 0; }}
-        .feature-item {{ display: flex; align-items: center; gap: 20px; margin-bottom: 30px; }}
-        .dot {{ width: 12px; height: 12px; background: #2c3e50; border-radius: 50%; flex-shrink: 0; }}
-        .feature-item p {{ font-size: 15pt; color: #34495e; margin: 0; line-height: 1.8; }}
+        {{ base_css }}
+        * { box-sizing: border-box; }
+        body { font-family: 'Playfair Display', Georgia, serif; margin: 0; background: #fafafa; }
+        .frame { border: 40px solid #2c3e50; margin: -20mm; min-height: 100vh; background: white; padding: 60px 50px; }
+        .title { font-size: 48pt; font-weight: 700; color: #2c3e50; margin: 0 0 35px 0; line-height: 1.1; letter-spacing: -1px; }
+        .intro { font-size: 16pt; color: #5a6c7d; line-height: 2; margin: 0 0 50px 0; max-width: 85%; }
+        .features { margin: 50px 0; }
+        .feature-item { display: flex; align-items: center; gap: 20px; margin-bottom: 30px; }
+        .dot { width: 12px; height: 12px; background: #2c3e50; border-radius: 50%; flex-shrink: 0; }
+        .feature-item p { font-size: 15pt; color: #34495e; margin: 0; line-height: 1.8; }
     </style>
 </head>
 <body>
     <div class="frame">
-        <h1 class="title">{copy.title}</h1>
-        <div class="intro">{copy.intro}</div>
-        <div class="features">{usps_html}</div>
+        <h1 class="title">{{ copy.title }}</h1>
+        <div class="intro">{{ copy.intro }}</div>
+        <div class="features">{% for usp in usps %}{% if usp %}<div class="feature-item"><div class="dot"></div><p data-slot="usp_{{ loop.index }}">{{ usp }}</p></div>{% endif %}{% endfor %}</div>
     </div>
 </body>
 </html>
-"""
-        return html
+""")
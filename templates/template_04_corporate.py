@@ -1,6 +1,7 @@
 """Template 04: Corporate - Large typography minimalist."""
 from .base import BaseTemplate
-from core.copy_generator import CopySlots
+from .engine import compile_layout
+from core.text_metrics import SlotBox
 from typing import Dict
 
 
@@ -10,6 +11,7 @@ class Template04Corporate(BaseTemplate):
     template_id = "template_04"
     template_name = "Corporate"
     format = "A4"
+    font_family = "'Helvetica Neue', Arial, sans-serif"
     
     def get_slot_limits(self) -> Dict[str, int]:
         return {
@@ -20,41 +22,40 @@ class Template04Corporate(BaseTemplate):
             "usp_3": 100
         }
     
-    def render_html(self, copy: CopySlots, product_name: str) -> str:
-        usps_html = ""
-        usps = [copy.usp_1, copy.usp_2, copy.usp_3]
-        for usp in usps:
-            if usp:
-                usps_html += f'<div class="benefit"><p>{usp}</p></div>'
-        
-        html = f"""
+    def get_text_boxes(self) -> Dict[str, SlotBox]:
+        return {
+            "title": SlotBox(width=674, font_size=64, line_height=1, max_lines=2, letter_spacing=-2, font_family=self.font_family),
+            "intro": SlotBox(width=539, font_size=20, line_height=1.8, max_lines=5, font_family=self.font_family),
+            "usp": SlotBox(width=674, font_size=18, line_height=1.8, max_lines=2, font_family=self.font_family),
+        }
+    
+    layout = compile_layout("""
 <!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
-    <title>{product_name}</title>
+    <title>{{ product_name }}</title>
     <style>
-        {self.get_css()}
-        * {{ box-sizing: border-box; }}
-        body {{ font-family: 'Helvetica Neue', Arial, sans-serif; margin: 0; }}
-        .container {{ background: #ffffff; margin: -20mm; padding: 70px 60px; }}
-        .title-section {{ margin-bottom: 60px; }}
-        .title {{ font-size: 64pt; font-weight: 100; color: #1a1a1a; margin: 0 0 20px 0; line-height: 1; letter-spacing: -2px; }}
-        .intro {{ font-size: 20pt; color: #666; line-height: 1.8; margin: 0; font-weight: 300; max-width: 80%; }}
-        .benefits {{ display: flex; flex-direction: column; gap: 40px; margin-top: 80px; }}
-        .benefit {{ border-top: 1px solid #e0e0e0; padding-top: 30px; }}
-        .benefit p {{ font-size: 18pt; color: #333; margin: 0; line-height: 1.8; font-weight: 400; }}
+        {{ base_css }}
+        * { box-sizing: border-box; }
+        body { font-family: 'Helvetica Neue', Arial, sans-serif; margin: 0; }
+        .container { background: #ffffff; margin: -20mm; padding: 70px 60px; }
+        .title-section { margin-bottom: 60px; }
+        .title { font-size: 64pt; font-weight: 100; color: #1a1a1a; margin: 0 0 20px 0; line-height: 1; letter-spacing: -2px; }
+        .intro { font-size: 20pt; color: #666; line-height: 1.8; margin: 0; font-weight: 300; max-width: 80%; }
+        .benefits { display: flex; flex-direction: column; gap: 40px; margin-top: 80px; }
+        .benefit { border-top: 1px solid #e0e0e0; padding-top: 30px; }
+        .benefit p { font-size: 18pt; color: #333; margin: 0; line-height: 1.8; font-weight: 400; }
     </style>
 </head>
 <body>
     <div class="container">
         <div class="title-section">
-            <h1 class="title">{copy.title}</h1>
-            <div class="intro">{copy.intro}</div>
+            <h1 class="title">{{ copy.title }}</h1>
+            <div class="intro">{{ copy.intro }}</div>
         </div>
-        <div class="benefits">{usps_html}</div>
+        <div class="benefits">{% for usp in usps %}{% if usp %}<div class="benefit"><p data-slot="usp_{{ loop.index }}">{{ usp }}</p></div>{% endif %}{% endfor %}</div>
     </div>
 </body>
 </html>
-"""
-        return html
+""")
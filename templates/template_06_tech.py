@@ -1,6 +1,7 @@
 """Template 06: Tech - Modern dashboard card layout."""
 from .base import BaseTemplate
-from core.copy_generator import CopySlots
+from .engine import compile_layout
+from core.text_metrics import SlotBox
 from typing import Dict
 
 
@@ -10,6 +11,7 @@ class Template06Tech(BaseTemplate):
     template_id = "template_06"
     template_name = "Tech"
     format = "A4"
+    font_family = "'Inter', 'Roboto', sans-serif"
     
     def get_slot_limits(self) -> Dict[str, int]:
         return {
@@ -22,53 +24,57 @@ class Template06Tech(BaseTemplate):
             "usp_5": 110
         }
     
-    def render_html(self, copy: CopySlots, product_name: str) -> str:
-        usps_html = ""
-        usps = [copy.usp_1, copy.usp_2, copy.usp_3, copy.usp_4, copy.usp_5]
-        icons = ["⚡", "🔒", "🚀", "📊", "✨"]
-        for i, usp in enumerate(usps):
-            if usp:
-                usps_html += f'''
-                <div class="dashboard-card">
-                    <div class="card-top">
-                        <span class="icon">{icons[i % len(icons)]}</span>
-                        <span class="badge">#{i+1}</span>
-                    </div>
-                    <p>{usp}</p>
-                </div>'''
-        
-        html = f"""
+    def get_text_boxes(self) -> Dict[str, SlotBox]:
+        return {
+            "title": SlotBox(width=694, font_size=46, line_height=1.1, max_lines=2, bold=True, font_family=self.font_family),
+            "intro": SlotBox(width=590, font_size=16, line_height=1.9, max_lines=5, font_family=self.font_family),
+            "usp": SlotBox(width=152, font_size=14, line_height=1.8, max_lines=6, font_family=self.font_family),
+        }
+    
+    layout = compile_layout("""
 <!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
-    <title>{product_name}</title>
+    <title>{{ product_name }}</title>
     <style>
-        {self.get_css()}
-        * {{ box-sizing: border-box; }}
-        body {{ font-family: 'Inter', 'Roboto', sans-serif; margin: 0; }}
-        .container {{ background: linear-gradient(135deg, #0f172a 0%, #1e293b 100%); margin: -20mm; min-height: 100vh; padding: 60px 50px; }}
-        .header {{ margin-bottom: 50px; }}
-        .title {{ font-size: 46pt; font-weight: 800; color: #00d4ff; margin: 0 0 25px 0; line-height: 1.1; text-shadow: 0 0 30px rgba(0,212,255,0.5); }}
-        .intro {{ font-size: 16pt; color: #cbd5e1; line-height: 1.9; margin: 0; max-width: 85%; }}
-        .dashboard {{ display: grid; grid-template-columns: repeat(3, 1fr); gap: 25px; margin: 50px 0; }}
-        .dashboard-card {{ background: rgba(255,255,255,0.08); backdrop-filter: blur(10px); border: 1px solid rgba(0,212,255,0.3); border-radius: 16px; padding: 30px; transition: all 0.3s; }}
-        .dashboard-card:hover {{ background: rgba(255,255,255,0.12); border-color: rgba(0,212,255,0.6); transform: translateY(-5px); }}
-        .card-top {{ display: flex; justify-content: space-between; align-items: center; margin-bottom: 20px; }}
-        .icon {{ font-size: 32pt; }}
-        .badge {{ background: #00d4ff; color: #0f172a; padding: 6px 14px; border-radius: 20px; font-size: 11pt; font-weight: 800; }}
-        .dashboard-card p {{ font-size: 14pt; color: #e2e8f0; margin: 0; line-height: 1.8; }}
+        {{ base_css }}
+        * { box-sizing: border-box; }
+        body { font-family: 'Inter', 'Roboto', sans-serif; margin: 0; }
+        .container { background: linear-gradient(135deg, #0f172a 0%, #1e293b 100%); margin: -20mm; min-height: 100vh; padding: 60px 50px; }
+        .header { margin-bottom: 50px; }
+        .title { font-size: 46pt; font-weight: 800; color: #00d4ff; margin: 0 0 25px 0; line-height: 1.1; text-shadow: 0 0 30px rgba(0,212,255,0.5); }
+        .intro { font-size: 16pt; color: #cbd5e1; line-height: 1.9; margin: 0; max-width: 85%; }
+        .dashboard { display: grid; grid-template-columns: repeat(3, 1fr); gap: 25px; margin: 50px 0; }
+        .dashboard-card { background: rgba(255,255,255,0.08); backdrop-filter: blur(10px); border: 1px solid rgba(0,212,255,0.3); border-radius: 16px; padding: 30px; transition: all 0.3s; }
+        .dashboard-card:hover { background: rgba(255,255,255,0.12); border-color: rgba(0,212,255,0.6); transform: translateY(-5px); }
+        .card-top { display: flex; justify-content: space-between; align-items: center; margin-bottom: 20px; }
+        .icon { font-size: 32pt; }
+        .badge { background: #00d4ff; color: #0f172a; padding: 6px 14px; border-radius: 20px; font-size: 11pt; font-weight: 800; }
+        .dashboard-card p { font-size: 14pt; color: #e2e8f0; margin: 0; line-height: 1.8; }
     </style>
 </head>
 <body>
     <div class="container">
         <div class="header">
-            <h1 class="title">{copy.title}</h1>
-            <div class="intro">{copy.intro}</div>
+            <h1 class="title">{{ copy.title }}</h1>
+            <div class="intro">{{ copy.intro }}</div>
+        </div>
+        <div class="dashboard">
+            {% set icons = ["⚡", "🔒", "🚀", "📊", "✨"] %}
+            {% for usp in usps %}
+            {% if usp %}
+                <div class="dashboard-card">
+                    <div class="card-top">
+                        <span class="icon">{{ icons[loop.index0 % icons|length] }}</span>
+                        <span class="badge">#{{ loop.index }}</span>
+                    </div>
+                    <p data-slot="usp_{{ loop.index }}">{{ usp }}</p>
+                </div>
+            {% endif %}
+            {% endfor %}
         </div>
-        <div class="dashboard">{usps_html}</div>
     </div>
 </body>
 </html>
-"""
-        return html
+""")
@@ -0,0 +1,68 @@
+"""Shared fixtures; tests import the app packages from the repository root."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import core.pipeline as pipeline_module
+from core.copy_generator import CopySlots
+from models.product_brief import ProductBrief
+
+
+@pytest.fixture
+def make_brief():
+    """ProductBrief factory with defaults for the required fields."""
+    def _make(product_id: str, **fields) -> ProductBrief:
+        fields.setdefault("type", "product")
+        fields.setdefault("name", f"Product {product_id}")
+        fields.setdefault("description", f"Description of {product_id}")
+        return ProductBrief(product_id=product_id, **fields)
+    return _make
+
+
+class FakeRenderService:
+    """Writes a stub PDF instead of rendering."""
+    workers = 1
+
+    def __init__(self):
+        self.rendered = []
+
+    async def render_checked(self, template, copy, product_name, output_path=None, wait=True):
+        self.rendered.append(product_name)
+        Path(output_path).write_bytes(b"%PDF-1.7")
+        return b"%PDF-1.7", []
+
+
+class Fakes:
+    def __init__(self):
+        self.copied = []
+        self.fitted = []
+        self.failing = set()
+        self.render_service = FakeRenderService()
+
+    async def generate_copy_batch_async(self, briefs, template_slots, batch_size=None, template_id=None):
+        self.copied.extend(brief.product_id for brief in briefs)
+        failing = [brief.product_id for brief in briefs if brief.product_id in self.failing]
+        if failing:
+            raise RuntimeError(f"LLM down for {failing}")
+        return [CopySlots(title=f"Title {brief.product_id}", intro="Intro", usp_1="One") for brief in briefs]
+
+    async def escalate_failed_slots_async(self, brief, template, copy, qc_result):
+        return copy
+
+    def fit_copy_to_template(self, template, copy):
+        self.fitted.append(copy.title)
+        return copy
+
+
+@pytest.fixture
+def fakes(monkeypatch):
+    """Stand-ins for the LLM and the renderer used by the pipeline stages."""
+    fakes = Fakes()
+    monkeypatch.setattr(pipeline_module, "generate_copy_batch_async", fakes.generate_copy_batch_async)
+    monkeypatch.setattr(pipeline_module, "fit_copy_to_template", fakes.fit_copy_to_template)
+    monkeypatch.setattr(pipeline_module, "escalate_failed_slots_async", fakes.escalate_failed_slots_async)
+    monkeypatch.setattr(pipeline_module, "get_render_service", lambda: fakes.render_service)
+    return fakes
@@ -0,0 +1,56 @@
+"""Catalog manifest diffs: only new and changed products are regenerated."""
+from core.catalog import CatalogDiff, CatalogManifest, pdf_filename
+from templates.registry import get_template
+
+
+def _generate(manifest, briefs, template):
+    """Record briefs as generated, with their PDFs on disk."""
+    for brief in briefs:
+        (manifest.output_dir / pdf_filename(brief, template.template_id)).write_bytes(b"%PDF-1.7")
+        manifest.record(brief, template)
+
+
+def test_diff_counts(tmp_path, make_brief):
+    template = get_template("template_01")
+    other = get_template("template_02")
+    manifest = CatalogManifest(tmp_path)
+    _generate(manifest, [make_brief(product_id) for product_id in "ABCD"], template)
+    _generate(manifest, [make_brief("Z")], other)
+    manifest.save()
+
+    manifest = CatalogManifest(tmp_path)
+    (tmp_path / pdf_filename(make_brief("C"), template.template_id)).unlink()
+    catalog = [
+        make_brief("A"),  # unchanged
+        make_brief("B", description="New description"),  # changed
+        make_brief("C"),  # PDF deleted: changed
+        make_brief("E"),  # added; D is removed, Z belongs to another template
+    ]
+    diff = CatalogDiff()
+    selected = [brief.product_id for brief in manifest.select(catalog, template, diff)]
+
+    assert selected == ["B", "C", "E"]
+    assert diff.counts() == {"unchanged": 1, "changed": 2, "added": 1, "removed": 1}
+    assert diff.removed == [pdf_filename(make_brief("D"), template.template_id)]
+    assert manifest.diff(catalog, template).counts() == diff.counts()
+
+
+def test_metadata_and_language_changes_count_as_changed(tmp_path, make_brief):
+    template = get_template("template_01")
+    manifest = CatalogManifest(tmp_path)
+    _generate(manifest, [make_brief("A"), make_brief("B")], template)
+
+    diff = manifest.diff([make_brief("A", metadata={"price": 10.0}), make_brief("B", language="de")], template)
+
+    # B in another language is another PDF
+    assert diff.counts() == {"unchanged": 0, "changed": 1, "added": 1, "removed": 1}
+
+
+def test_manifest_of_other_version_is_ignored(tmp_path, make_brief):
+    template = get_template("template_01")
+    manifest = CatalogManifest(tmp_path)
+    _generate(manifest, [make_brief("A")], template)
+    manifest.save()
+    manifest.path.write_text(manifest.path.read_text().replace('"version": 1', '"version": 0'))
+
+    assert CatalogManifest(tmp_path).diff([make_brief("A")], template).counts()["added"] == 1
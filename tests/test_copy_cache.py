@@ -0,0 +1,101 @@
+"""Copy cache: TTL expiry, LRU eviction and what invalidates a cache key."""
+import pytest
+
+import core.copy_cache as copy_cache_module
+import core.copy_generator as copy_generator
+from config.settings import settings
+from core.copy_cache import CopyCache, make_cache_key
+from core.copy_generator import _copy_cache_key
+
+SLOTS = {"title": 40, "intro": 120}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(copy_cache_module.time, "time", clock)
+    return clock
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = CopyCache(tmp_path / "copy.sqlite3", ttl=60, max_entries=0)
+    cache.set("key", {"title": "Cached"})
+
+    clock.now += 59
+    assert cache.get("key") == {"title": "Cached"}
+    clock.now += 2
+    assert cache.get("key") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 1, "entries": 0}
+
+
+def test_zero_ttl_never_expires(tmp_path, clock):
+    cache = CopyCache(tmp_path / "copy.sqlite3", ttl=0, max_entries=0)
+    cache.set("key", {"title": "Cached"})
+
+    clock.now += 10 ** 9
+
+    assert cache.get("key") == {"title": "Cached"}
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    cache = CopyCache(tmp_path / "copy.sqlite3", ttl=0, max_entries=2)
+    cache.set("a", {"title": "A"})
+    clock.now += 1
+    cache.set("b", {"title": "B"})
+    clock.now += 1
+    cache.get("a")
+    clock.now += 1
+
+    cache.set("c", {"title": "C"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"title": "A"} and cache.get("c") == {"title": "C"}
+    assert cache.stats()["entries"] == 2
+
+
+def test_cache_persists_across_instances(tmp_path, clock):
+    CopyCache(tmp_path / "copy.sqlite3", ttl=60, max_entries=10).set("key", {"title": "Cached"})
+
+    assert CopyCache(tmp_path / "copy.sqlite3", ttl=60, max_entries=10).get("key") == {"title": "Cached"}
+
+
+def test_make_cache_key_is_stable_and_order_independent():
+    assert make_cache_key({"a": 1, "b": 2}, "x") == make_cache_key({"b": 2, "a": 1}, "x")
+    assert make_cache_key({"a": 1}, "x") != make_cache_key({"a": 1}, "y")
+
+
+def test_copy_key_ignores_fields_the_copy_does_not_depend_on(make_brief):
+    assert _copy_cache_key(make_brief("A"), SLOTS) == _copy_cache_key(make_brief("B", name="Product A", description="Description of A"), SLOTS)
+
+
+@pytest.mark.parametrize("change", [
+    lambda brief: brief.model_copy(update={"description": "Something else"}),
+    lambda brief: brief.model_copy(update={"features": ["Offline mode"]}),
+    lambda brief: brief.model_copy(update={"language": "de"}),
+])
+def test_copy_key_changes_with_the_brief(make_brief, change):
+    brief = make_brief("A")
+
+    assert _copy_cache_key(change(brief), SLOTS) != _copy_cache_key(brief, SLOTS)
+
+
+def test_copy_key_changes_with_slot_limits_prompt_version_and_model(make_brief, monkeypatch):
+    brief = make_brief("A")
+    key = _copy_cache_key(brief, SLOTS)
+
+    assert _copy_cache_key(brief, {**SLOTS, "title": 30}) != key
+    with monkeypatch.context() as patch:
+        patch.setattr(copy_generator, "PROMPT_VERSION", "test")
+        assert _copy_cache_key(brief, SLOTS) != key
+    with monkeypatch.context() as patch:
+        patch.setattr(settings, "gemini_model", "some-other-model")
+        patch.setattr(settings, "gemini_fast_model", "some-other-model")
+        assert _copy_cache_key(brief, SLOTS) != key
@@ -0,0 +1,201 @@
+"""Copy generation: structured and batched JSON answers, per-slot fallback and re-queueing."""
+import asyncio
+import json
+
+import pytest
+
+import core.copy_generator as copy_generator
+from core.copy_generator import (
+    CopySlots,
+    _parse_batch_response,
+    _parse_structured_response,
+    generate_copy,
+    generate_copy_batch,
+    generate_copy_batch_async,
+)
+
+SLOTS = {"title": 40, "intro": 120, "usp_1": 60}
+
+
+class FakeProvider:
+    name = "fake"
+
+    def __init__(self, model: str):
+        self.model = model
+
+
+class ScriptedLLM:
+    """Answers JSON calls with `json_answer` and per-slot calls with a fixed text."""
+
+    def __init__(self, json_answer):
+        self.json_answer = json_answer
+        self.json_calls = 0
+        self.slot_calls = 0
+
+    def __call__(self, prompt, options, provider):
+        if options.json_mode:
+            self.json_calls += 1
+            return self.json_answer(prompt) if callable(self.json_answer) else self.json_answer
+        self.slot_calls += 1
+        return "Per-slot answer"
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Install a scripted LLM: llm(json_answer) returns it; the copy cache is off."""
+    def _install(json_answer) -> ScriptedLLM:
+        scripted = ScriptedLLM(json_answer)
+        monkeypatch.setattr(copy_generator, "_call_llm", scripted)
+        return scripted
+    monkeypatch.setattr(copy_generator, "get_copy_cache", lambda: None)
+    monkeypatch.setattr(copy_generator, "get_provider", lambda model=None: FakeProvider(model))
+    return _install
+
+
+def test_structured_response_is_parsed():
+    answer = json.dumps({"title": "Fast Sync", "intro": "Keeps files in step.", "usp_1": "Works offline"})
+
+    assert _parse_structured_response(answer, SLOTS) == {
+        "title": "Fast Sync", "intro": "Keeps files in step.", "usp_1": "Works offline",
+    }
+
+
+def test_structured_response_in_code_fences_is_parsed():
+    answer = '```json\n{"title": "Fast Sync", "intro": "Keeps files in step."}\n```'
+
+    assert _parse_structured_response(answer, SLOTS) == {"title": "Fast Sync", "intro": "Keeps files in step."}
+
+
+def test_invalid_json_yields_no_slots():
+    assert _parse_structured_response("Sorry, I can't help with that.", SLOTS) == {}
+    assert _parse_structured_response('{"title": "Fast', SLOTS) == {}
+    assert _parse_structured_response('["Fast Sync"]', SLOTS) == {}
+
+
+def test_unrequested_empty_and_non_string_slots_are_dropped():
+    answer = json.dumps({"title": "Fast Sync", "intro": "  ", "usp_1": 42, "usp_2": "Not requested"})
+
+    assert _parse_structured_response(answer, SLOTS) == {"title": "Fast Sync"}
+
+
+def test_over_long_slots_are_clipped_to_their_limit():
+    answer = json.dumps({"title": "A headline that keeps going well past the forty character limit"})
+
+    title = _parse_structured_response(answer, SLOTS)["title"]
+
+    assert len(title) <= SLOTS["title"]
+    assert "A headline that keeps going well past".startswith(title)
+
+
+def test_one_json_call_fills_every_slot(llm, make_brief):
+    scripted = llm(json.dumps({"title": "Fast Sync", "intro": "Keeps files in step.", "usp_1": "Works offline"}))
+
+    copy = generate_copy(make_brief("A"), SLOTS)
+
+    assert (copy.title, copy.intro, copy.usp_1) == ("Fast Sync", "Keeps files in step.", "Works offline")
+    assert scripted.slot_calls == 0
+
+
+def test_slots_missing_from_the_json_answer_fall_back_to_per_slot_calls(llm, make_brief):
+    scripted = llm(json.dumps({"title": "Fast Sync", "intro": ""}))
+
+    copy = generate_copy(make_brief("A"), SLOTS)
+
+    assert copy.title == "Fast Sync"
+    assert copy.intro == copy.usp_1 == "Per-slot answer"
+    assert scripted.slot_calls == 2
+
+
+def test_unparseable_json_answer_falls_back_for_every_slot(llm, make_brief):
+    scripted = llm("not json")
+
+    copy = generate_copy(make_brief("A"), SLOTS)
+
+    assert copy.title == copy.intro == copy.usp_1 == "Per-slot answer"
+    assert scripted.slot_calls == 3
+
+
+def _products(*ids, **overrides):
+    """Batch answer with filled slots for the given product numbers."""
+    return json.dumps({"products": [
+        {"id": str(i), "title": f"Title {i}", "intro": f"Intro {i}", "usp_1": f"USP {i}", **overrides.get(str(i), {})}
+        for i in ids
+    ]})
+
+
+def test_batch_response_is_split_per_product():
+    results = _parse_batch_response(_products(1, 2), 2, SLOTS)
+
+    assert {index: copy.title for index, copy in results.items()} == {1: "Title 1", 2: "Title 2"}
+
+
+def test_batch_response_tolerates_bracketed_ids():
+    answer = json.dumps({"products": [{"id": "[2]", "title": "T", "intro": "I", "usp_1": "U"}]})
+
+    assert list(_parse_batch_response(answer, 2, SLOTS)) == [2]
+
+
+def test_unknown_duplicate_and_incomplete_products_are_left_out():
+    answer = json.dumps({"products": [
+        {"id": "1", "title": "First", "intro": "I", "usp_1": "U"},
+        {"id": "1", "title": "Again", "intro": "I", "usp_1": "U"},
+        {"id": "2", "title": "No intro", "usp_1": "U"},
+        {"id": "7", "title": "Out of range", "intro": "I", "usp_1": "U"},
+        {"id": "x", "title": "Bad id", "intro": "I", "usp_1": "U"},
+        "not an object",
+    ]})
+
+    results = _parse_batch_response(answer, 3, SLOTS)
+
+    assert list(results) == [1]
+    assert results[1].title == "First"
+
+
+def test_invalid_batch_answer_yields_no_products():
+    assert _parse_batch_response("not json", 2, SLOTS) == {}
+    assert _parse_batch_response('{"products": {"id": "1"}}', 2, SLOTS) == {}
+
+
+def test_products_missing_from_a_batch_are_requeued(llm, make_brief, monkeypatch):
+    llm(_products(1, 3, **{"3": {"usp_1": ""}}))
+    requeued = []
+
+    def _generate_copy(brief, template_slots, template_id=None):
+        requeued.append(brief.product_id)
+        return CopySlots(title=f"Single {brief.product_id}", intro="Intro")
+
+    monkeypatch.setattr(copy_generator, "generate_copy", _generate_copy)
+
+    copies = generate_copy_batch([make_brief(product_id) for product_id in "ABC"], SLOTS, batch_size=3)
+
+    assert requeued == ["B", "C"]
+    assert [copy.title for copy in copies] == ["Title 1", "Single B", "Single C"]
+
+
+def test_failed_batch_call_requeues_every_product(llm, make_brief, monkeypatch):
+    def _failing(prompt):
+        raise RuntimeError("503")
+
+    llm(_failing)
+    requeued = []
+
+    async def _generate_copy_async(brief, template_slots, template_id=None):
+        requeued.append(brief.product_id)
+        return CopySlots(title=f"Single {brief.product_id}", intro="Intro")
+
+    monkeypatch.setattr(copy_generator, "generate_copy_async", _generate_copy_async)
+
+    copies = asyncio.run(generate_copy_batch_async([make_brief("A"), make_brief("B")], SLOTS, batch_size=2))
+
+    assert sorted(requeued) == ["A", "B"]
+    assert [copy.title for copy in copies] == ["Single A", "Single B"]
+
+
+def test_duplicate_briefs_are_generated_once(llm, make_brief):
+    scripted = llm(lambda prompt: _products(*range(1, prompt.count("Product/Service:") + 1)))
+    briefs = [make_brief("A"), make_brief("B"), make_brief("A")]
+
+    copies = generate_copy_batch(briefs, SLOTS, batch_size=5)
+
+    assert scripted.json_calls == 1
+    assert [copy.title for copy in copies] == ["Title 1", "Title 2", "Title 1"]
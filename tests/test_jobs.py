@@ -0,0 +1,104 @@
+"""Bulk jobs: ZIP of the finished PDFs with a manifest, reloading from the run store."""
+import asyncio
+import io
+import json
+import zipfile
+
+import pytest
+
+import core.jobs as jobs_module
+from config.settings import settings
+from core.jobs import JobManager, JobRunningError
+from core.run_store import RunStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = RunStore(tmp_path / "runs.sqlite3")
+    monkeypatch.setattr(jobs_module, "get_run_store", lambda: store)
+    monkeypatch.setattr(settings, "job_output_dir", str(tmp_path / "jobs"))
+    return store
+
+
+def _zip(job) -> zipfile.ZipFile:
+    async def _collect():
+        return b"".join([chunk async for chunk in job.stream_zip()])
+    return zipfile.ZipFile(io.BytesIO(asyncio.run(_collect())))
+
+
+async def _finish(manager, briefs, template_id="template_01"):
+    job = await manager.submit(briefs, template_id)
+    await job._task
+    return job
+
+
+def test_zip_has_every_finished_pdf_and_a_manifest(store, fakes, make_brief):
+    fakes.failing = {"B"}
+    job = asyncio.run(_finish(JobManager(), [make_brief(product_id) for product_id in "ABC"]))
+
+    archive = _zip(job)
+
+    assert sorted(archive.namelist()) == ["A_template_01_en.pdf", "C_template_01_en.pdf", "manifest.json"]
+    assert archive.read("A_template_01_en.pdf") == b"%PDF-1.7"
+    manifest = json.loads(archive.read("manifest.json"))
+    assert manifest["status"] == "done"
+    assert manifest["counts"]["done"] == 2 and manifest["counts"]["failed"] == 1
+    assert [(row["product_id"], row["status"]) for row in manifest["rows"]] == [("A", "done"), ("B", "failed"), ("C", "done")]
+    assert manifest["rows"][1]["error"].startswith("copy:")
+
+
+def test_repeated_filenames_are_prefixed_with_the_row_number(store, fakes, make_brief):
+    job = asyncio.run(_finish(JobManager(), [make_brief("A"), make_brief("A")]))
+
+    assert sorted(_zip(job).namelist()) == ["2_A_template_01_en.pdf", "A_template_01_en.pdf", "manifest.json"]
+
+
+def test_job_is_reloaded_from_the_store(store, fakes, make_brief):
+    fakes.failing = {"B"}
+    job = asyncio.run(_finish(JobManager(), [make_brief("A"), make_brief("B")]))
+
+    reloaded = asyncio.run(JobManager().get(job.id))
+
+    assert reloaded is not job
+    assert [(row.product_id, row.status) for row in reloaded.rows] == [("A", "done"), ("B", "failed")]
+    assert reloaded.summary()["status"] == "done"
+
+
+def test_resume_reruns_failed_rows(store, fakes, make_brief):
+    fakes.failing = {"B"}
+    manager = JobManager()
+    job = asyncio.run(_finish(manager, [make_brief("A"), make_brief("B")]))
+    fakes.failing = set()
+    fakes.copied.clear()
+
+    async def _resume():
+        resumed = await manager.resume(job.id)
+        await resumed._task
+        return resumed
+
+    resumed = asyncio.run(_resume())
+
+    assert fakes.copied == ["B"]
+    assert [row.status for row in resumed.rows] == ["done", "done"]
+    assert sorted(_zip(resumed).namelist()) == ["A_template_01_en.pdf", "B_template_01_en.pdf", "manifest.json"]
+
+
+def test_resume_of_a_running_job_is_refused(store, fakes, make_brief):
+    async def _submit_and_resume():
+        manager = JobManager()
+        job = await manager.submit([make_brief("A")], "template_01")
+        try:
+            with pytest.raises(JobRunningError):
+                await manager.resume(job.id)
+        finally:
+            await job._task
+
+    asyncio.run(_submit_and_resume())
+
+
+def test_cli_runs_are_not_jobs(store, make_brief):
+    run_id = store.create_run("cli", [(make_brief("A"), "template_01")])
+
+    assert asyncio.run(JobManager().get(run_id)) is None
+    assert asyncio.run(JobManager().resume(run_id)) is None
+    assert asyncio.run(JobManager().get("missing")) is None
@@ -0,0 +1,197 @@
+"""LLM governor: retries with backoff, Retry-After and the AIMD concurrency limit."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+import core.llm_governor as governor_module
+from core.llm_governor import LLMGovernor, is_rate_limited, is_retryable, retry_after_seconds
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"status_code": status_code, "headers": headers or {}})()
+
+
+class ResourceExhausted(Exception):
+    """Named like the google.api_core quota error."""
+
+
+def _governor(**overrides) -> LLMGovernor:
+    options = dict(
+        rate=0, burst=10, initial_limit=4, min_limit=1, max_limit=8, target_latency=10.0,
+        max_retries=3, backoff_base=0.001, backoff_max=0.001,
+    )
+    options.update(overrides)
+    return LLMGovernor(**options)
+
+
+class Flaky:
+    """Raises the given errors in turn, then returns "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the delays the governor sleeps for instead of sleeping."""
+    recorded = []
+    monkeypatch.setattr(governor_module.time, "sleep", recorded.append)
+    return recorded
+
+
+def test_error_classification():
+    assert is_retryable(ProviderError(503)) and is_retryable(TimeoutError())
+    assert not is_retryable(ProviderError(400)) and not is_retryable(ValueError("bad prompt"))
+    assert is_rate_limited(ProviderError(429)) and is_rate_limited(ResourceExhausted())
+    assert not is_rate_limited(ProviderError(503))
+
+
+def test_retry_after_is_read_from_the_error():
+    assert retry_after_seconds(ProviderError(429, {"retry-after": "7"})) == 7.0
+    assert retry_after_seconds(ResourceExhausted("quota; retry_delay { seconds: 17 }")) == 17.0
+    assert retry_after_seconds(ProviderError(429, {"retry-after": "soon"})) is None
+    assert retry_after_seconds(ProviderError(503)) is None
+
+
+def test_retryable_errors_are_retried(sleeps):
+    governor = _governor()
+    fn = Flaky(ProviderError(503), TimeoutError())
+
+    assert governor.call(fn) == "ok"
+    assert fn.calls == 3
+    assert len(sleeps) == 2 and all(0 <= delay <= 0.001 for delay in sleeps)
+    assert governor.stats()["retries"] == 2 and governor.stats()["failures"] == 0
+
+
+def test_non_retryable_errors_are_raised_at_once(sleeps):
+    governor = _governor()
+    fn = Flaky(ProviderError(400))
+
+    with pytest.raises(ProviderError):
+        governor.call(fn)
+    assert fn.calls == 1 and sleeps == []
+    assert governor.stats()["failures"] == 1
+
+
+def test_retries_stop_after_max_retries(sleeps):
+    governor = _governor(max_retries=2)
+    fn = Flaky(*[ProviderError(503)] * 5)
+
+    with pytest.raises(ProviderError):
+        governor.call(fn)
+    assert fn.calls == 3
+
+
+def test_retry_after_sets_the_delay_and_pauses_the_bucket(sleeps):
+    governor = _governor(rate=100)
+    fn = Flaky(ProviderError(429, {"retry-after": "5"}))
+
+    assert governor.call(fn) == "ok"
+
+    assert sleeps[0] == 5.0
+    # Other callers wait for the pause as well
+    assert governor._reserve_token() > 4.0
+    assert governor.stats()["rate_limited"] == 1
+
+
+def test_async_calls_are_retried(monkeypatch):
+    governor = _governor()
+    attempts = []
+
+    async def _sleep(delay):
+        pass
+
+    async def fn():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ProviderError(502)
+        return "ok"
+
+    monkeypatch.setattr(governor_module.asyncio, "sleep", _sleep)
+
+    assert asyncio.run(governor.acall(fn)) == "ok"
+    assert len(attempts) == 3
+
+
+def test_limit_grows_additively_on_fast_successes(sleeps):
+    governor = _governor(initial_limit=2)
+
+    for _ in range(2):
+        governor.call(lambda: "ok")
+
+    # +1/limit per success: one window of successes adds about one slot
+    assert 2.8 <= governor.stats()["concurrency_limit"] <= 3.0
+
+
+def test_limit_is_capped_at_max_limit(sleeps):
+    governor = _governor(initial_limit=8, max_limit=8)
+
+    for _ in range(20):
+        governor.call(lambda: "ok")
+
+    assert governor.stats()["concurrency_limit"] == 8
+
+
+def test_limit_shrinks_multiplicatively(sleeps, monkeypatch):
+    governor = _governor(initial_limit=8, max_retries=0)
+
+    with pytest.raises(ProviderError):
+        governor.call(Flaky(ProviderError(429)))
+    assert governor.stats()["concurrency_limit"] == 4
+    with pytest.raises(ProviderError):
+        governor.call(Flaky(ProviderError(503)))
+    assert governor.stats()["concurrency_limit"] == 3
+
+    # Slow successes shrink it too
+    clock = iter([0.0, 100.0])
+    monkeypatch.setattr(governor_module.time, "monotonic", lambda: next(clock))
+    governor.rate = 0
+    governor.call(lambda: "ok")
+    assert governor.stats()["concurrency_limit"] == 2.7
+
+
+def test_limit_never_drops_below_min_limit(sleeps):
+    governor = _governor(initial_limit=2, min_limit=2, max_retries=0)
+
+    for _ in range(3):
+        with pytest.raises(ProviderError):
+            governor.call(Flaky(ProviderError(429)))
+
+    assert governor.stats()["concurrency_limit"] == 2
+
+
+def test_calls_beyond_the_limit_wait_for_a_slot():
+    governor = _governor(initial_limit=2, max_limit=2)
+    running, peak = 0, 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return "ok"
+
+    threads = [threading.Thread(target=governor.call, args=(work,)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+    assert governor.stats()["in_flight"] == 0 and governor.stats()["calls"] == 6
@@ -0,0 +1,40 @@
+"""Chunked CSV normalization must not depend on where chunks start."""
+import io
+
+import pytest
+
+from core.normalizer import iter_csv_briefs, normalize_csv
+
+
+CSV = """product_id,type,name,description,features,target_audience,price,images,template_id
+1,product,Widget,A widget,"fast, secure,,",b2c,10,"a.png, b.png",template_02
+2,Service,Care,Support,,B2B,,,
+,product,Gadget,No id,5,both,€99/month,,
+4,product,Tool,A tool,"x,y",,10.0,c.png,
+5,service,Plan,A plan,7,B2C, 7 ,,template_03
+"""
+
+
+def _briefs(chunk_size=None):
+    return [brief.model_dump() for brief in iter_csv_briefs(io.StringIO(CSV), chunk_size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4])
+def test_chunked_read_matches_full_read(chunk_size):
+    assert _briefs(chunk_size) == [brief.model_dump() for brief in normalize_csv(io.StringIO(CSV))]
+
+
+@pytest.mark.parametrize("chunk_size", [2, 100])
+def test_cells_keep_their_text_and_numeric_metadata_is_float(chunk_size):
+    briefs = _briefs(chunk_size)
+    assert [brief["product_id"] for brief in briefs] == ["1", "2", "PROD-3", "4", "5"]
+    assert [brief["metadata"].get("price") for brief in briefs] == [10.0, None, "€99/month", 10.0, 7.0]
+    assert briefs[0]["features"] == ["fast", "secure"]
+    assert briefs[2]["features"] == ["5"]
+    assert briefs[0]["metadata"]["images"] == ["a.png", "b.png"]
+    assert [brief["metadata"].get("template_id") for brief in briefs] == ["template_02", None, None, None, "template_03"]
+
+
+def test_invalid_enum_reports_csv_row():
+    with pytest.raises(ValueError, match="Row 3: invalid type"):
+        list(iter_csv_briefs(io.StringIO("product_id,type,name\n1,product,A\n2,gadget,B\n"), chunk_size=1))
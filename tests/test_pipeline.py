@@ -0,0 +1,151 @@
+"""Staged pipeline: stage overlap, backpressure and failure propagation."""
+import asyncio
+import time
+
+import pytest
+
+from core.pipeline import Stage, StagePipeline
+
+
+class Item:
+    def __init__(self, index: int):
+        self.index = index
+        self.error = None
+        self.failed_stage = None
+        self.seen = []
+
+
+def _recorder(name: str, delay: float = 0.0, fail=()):
+    """Handler that records the stage on each item, sleeps and fails the given indexes."""
+    async def _handler(item):
+        item.seen.append(name)
+        await asyncio.sleep(delay)
+        if item.index in fail:
+            raise RuntimeError(f"{name} failed for {item.index}")
+    return _handler
+
+
+def _drain(pipeline, source):
+    async def _collect():
+        return [item async for item in pipeline.run(source)]
+    return asyncio.run(_collect())
+
+
+def test_every_item_passes_every_stage():
+    pipeline = StagePipeline([Stage("a", _recorder("a")), Stage("b", _recorder("b"), concurrency=3)])
+
+    items = _drain(pipeline, [Item(index) for index in range(10)])
+
+    assert sorted(item.index for item in items) == list(range(10))
+    assert all(item.seen == ["a", "b"] for item in items)
+    assert pipeline.stats()["stages"]["b"]["processed"] == 10
+
+
+def test_failed_items_skip_later_stages_and_are_still_yielded():
+    after = []
+    pipeline = StagePipeline(
+        [Stage("a", _recorder("a", fail={2})), Stage("b", _recorder("b", fail={5})), Stage("c", _recorder("c"))],
+        after_stage=lambda item, stage: after.append((item.index, stage)),
+    )
+
+    items = {item.index: item for item in _drain(pipeline, [Item(index) for index in range(6)])}
+
+    assert len(items) == 6
+    assert (items[2].failed_stage, items[2].seen) == ("a", ["a"])
+    assert (items[5].failed_stage, items[5].seen) == ("b", ["a", "b"])
+    assert items[2].error == "a failed for 2"
+    assert all(items[index].seen == ["a", "b", "c"] and items[index].error is None for index in (0, 1, 3, 4))
+    assert (2, "a") in after and (2, "b") not in after
+    assert pipeline.stats()["stages"]["a"]["failed"] == 1 and pipeline.stats()["stages"]["b"]["failed"] == 1
+
+
+def test_batched_stage_gets_lists_up_to_batch_size():
+    batches = []
+
+    async def _batch(items):
+        batches.append([item.index for item in items])
+
+    pipeline = StagePipeline([Stage("copy", _batch, batch_size=4, batched=True)])
+
+    _drain(pipeline, [Item(index) for index in range(10)])
+
+    assert sorted(index for batch in batches for index in batch) == list(range(10))
+    assert all(1 <= len(batch) <= 4 for batch in batches)
+
+
+def test_batched_stage_with_batch_size_one_still_gets_lists():
+    batches = []
+
+    async def _batch(items):
+        batches.append(items)
+
+    _drain(StagePipeline([Stage("copy", _batch, batch_size=1, batched=True)]), [Item(0), Item(1)])
+
+    assert all(isinstance(batch, list) and len(batch) == 1 for batch in batches)
+
+
+def test_failing_batch_fails_each_of_its_items():
+    async def _batch(items):
+        raise RuntimeError("LLM down")
+
+    pipeline = StagePipeline([Stage("copy", _batch, batch_size=3, batched=True), Stage("render", _recorder("render"))])
+
+    items = _drain(pipeline, [Item(index) for index in range(3)])
+
+    assert [(item.failed_stage, item.error, item.seen) for item in items] == [("copy", "LLM down", [])] * 3
+
+
+def test_stages_overlap():
+    pipeline = StagePipeline([Stage("copy", _recorder("copy", 0.05)), Stage("render", _recorder("render", 0.05))])
+
+    start = time.perf_counter()
+    _drain(pipeline, [Item(index) for index in range(6)])
+
+    # One after the other this takes 0.6s; overlapped about 0.35s
+    assert time.perf_counter() - start < 0.5
+
+
+def test_full_queues_stop_the_source_from_running_ahead():
+    pulled = []
+
+    def _source():
+        for index in range(100):
+            pulled.append(index)
+            yield Item(index)
+
+    pipeline = StagePipeline([Stage("a", _recorder("a")), Stage("slow", _recorder("slow", 0.01))], queue_size=2)
+
+    async def _first_items():
+        seen = []
+        async for item in pipeline.run(_source()):
+            seen.append(item)
+            if len(seen) == 5:
+                await asyncio.sleep(0.1)
+                return len(pulled)
+
+    pulled_after_five = asyncio.run(_first_items())
+
+    # Three queues of two, one item in each worker, the one being fed, and the five consumed
+    assert pulled_after_five <= 5 + 3 * 2 + 2 + 2
+
+
+def test_source_errors_are_raised_from_run():
+    async def _source():
+        yield Item(0)
+        raise ValueError("bad CSV row")
+
+    with pytest.raises(ValueError, match="bad CSV row"):
+        _drain(StagePipeline([Stage("a", _recorder("a"))]), _source())
+
+
+def test_on_stage_is_awaited_before_each_stage():
+    events = []
+
+    async def _on_stage(item, stage):
+        events.append((item.index, stage, list(item.seen)))
+
+    pipeline = StagePipeline([Stage("a", _recorder("a")), Stage("b", _recorder("b"))], on_stage=_on_stage)
+
+    _drain(pipeline, [Item(0)])
+
+    assert events == [(0, "a", []), (0, "b", ["a"])]
@@ -0,0 +1,101 @@
+"""Template previews: strong ETags, 304 revalidation and gzip."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import api.preview as preview_module
+from config.settings import settings
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "image_cache_dir", str(tmp_path / "images"))
+    monkeypatch.setattr(preview_module, "_previews", preview_module.OrderedDict())
+    app = FastAPI()
+    app.include_router(preview_module.router)
+    return TestClient(app)
+
+
+def _get(client, template_id="template_01", params=None, **headers):
+    headers.setdefault("Accept-Encoding", "identity")
+    return client.get(f"/api/templates/{template_id}/preview", params=params, headers=headers)
+
+
+def test_preview_has_a_strong_etag_and_cache_headers(client):
+    response = _get(client)
+
+    assert response.status_code == 200
+    assert response.json()["template_id"] == "template_01"
+    assert "Sample Product Title" in response.json()["html"]
+    etag = response.headers["ETag"]
+    assert etag.startswith('"') and etag.endswith('"') and not etag.startswith("W/")
+    assert response.headers["Cache-Control"] == f"public, max-age={settings.preview_max_age}"
+    assert response.headers["Vary"] == "Accept-Encoding"
+
+
+def test_etag_is_stable_and_depends_on_sample_copy_and_template(client):
+    etag = _get(client).headers["ETag"]
+
+    assert _get(client).headers["ETag"] == etag
+    assert _get(client, params={"title": "Other"}).headers["ETag"] != etag
+    assert _get(client, template_id="template_02").headers["ETag"] != etag
+
+
+def test_matching_if_none_match_gets_304(client):
+    etag = _get(client).headers["ETag"]
+
+    for if_none_match in (etag, f'"other", {etag}', "*"):
+        response = _get(client, **{"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+
+
+def test_stale_if_none_match_gets_the_body(client):
+    response = _get(client, **{"If-None-Match": '"stale"'})
+
+    assert response.status_code == 200
+    assert response.json()["template_id"] == "template_01"
+
+
+def test_post_preview_revalidates_too(client):
+    body = {"template_id": "template_01", "sample_data": {"title": "Posted"}}
+    first = client.post("/api/templates/preview", json=body, headers={"Accept-Encoding": "identity"})
+
+    assert first.headers["Cache-Control"] == "no-cache"
+    assert "Posted" in first.json()["html"]
+    second = client.post(
+        "/api/templates/preview", json=body,
+        headers={"Accept-Encoding": "identity", "If-None-Match": first.headers["ETag"]},
+    )
+    assert second.status_code == 304
+
+
+def test_gzip_is_sent_when_accepted_with_its_own_etag(client):
+    plain = _get(client)
+    gzipped = _get(client, **{"Accept-Encoding": "gzip, deflate"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.json() == plain.json()
+    assert gzipped.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+    assert _get(client, **{"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["ETag"]}).status_code == 304
+
+
+def test_gzip_refused_with_q_zero(client):
+    assert "Content-Encoding" not in _get(client, **{"Accept-Encoding": "gzip;q=0"}).headers
+
+
+def test_small_bodies_are_not_compressed(client, monkeypatch):
+    monkeypatch.setattr(preview_module, "GZIP_MIN_SIZE", 10 ** 9)
+
+    assert "Content-Encoding" not in _get(client, **{"Accept-Encoding": "gzip"}).headers
+
+
+def test_preview_cache_is_bounded(client, monkeypatch):
+    monkeypatch.setattr(settings, "preview_cache_size", 2)
+
+    for title in ("One", "Two", "Three"):
+        _get(client, params={"title": title})
+
+    assert len(preview_module._previews) == 2
@@ -0,0 +1,162 @@
+"""Resumable runs: stored stage results are reused and failed items run again."""
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from core.copy_generator import CopySlots
+from core.pipeline import OnepagerItem, build_onepager_pipeline
+from core.run_store import COPIED, CHECKED, DONE, FAILED, RunStore, pending_items, restore_item, stream_into_run
+from templates.registry import get_template
+
+
+@pytest.fixture
+def store(tmp_path):
+    return RunStore(tmp_path / "runs.sqlite3")
+
+
+def _run(store, run_id, output_dir):
+    """Resume a run: push its pending items through the pipeline, recording every stage."""
+    template = get_template("template_01")
+    items = [
+        restore_item(record, template, output_dir / f"{record['product_id']}.pdf")
+        for record in pending_items(store.items(run_id))
+    ]
+    pipeline = build_onepager_pipeline(
+        check=False,
+        batch_size=1,
+        render_concurrency=1,
+        after_stage=lambda item, stage: store.record_stage(run_id, item, stage),
+    )
+
+    async def _drain():
+        return [item async for item in pipeline.run(items)]
+
+    return asyncio.run(_drain())
+
+
+def _statuses(store, run_id):
+    return {record["product_id"]: record["status"] for record in store.items(run_id)}
+
+
+def test_resume_skips_finished_stages(store, fakes, tmp_path, make_brief):
+    template = get_template("template_01")
+    run_id = store.create_run("cli", [(make_brief(product_id), template.template_id) for product_id in "ABCD"])
+    # An interrupted run: A has copy, B passed QC, C is done, D was not started
+    for index, stages in enumerate([["copy"], ["copy", "qc"], ["copy", "qc", "render"]]):
+        item = OnepagerItem(index, make_brief("ABC"[index]), template, tmp_path / f"{'ABC'[index]}.pdf")
+        item.copy = CopySlots(title=f"Stored {'ABC'[index]}", intro="Intro")
+        for stage in stages:
+            if stage == "render":
+                Path(item.output_path).write_bytes(b"%PDF-1.7")
+            store.record_stage(run_id, item, stage)
+    assert _statuses(store, run_id) == {"A": COPIED, "B": CHECKED, "C": DONE, "D": "pending"}
+
+    finished = _run(store, run_id, tmp_path)
+
+    assert sorted(item.brief.product_id for item in finished) == ["A", "B", "D"]
+    assert fakes.copied == ["D"]
+    assert sorted(fakes.fitted) == ["Stored A", "Title D"]
+    assert sorted(fakes.render_service.rendered) == ["Product A", "Product B", "Product D"]
+    assert set(_statuses(store, run_id).values()) == {DONE}
+    assert pending_items(store.items(run_id)) == []
+
+
+def test_failed_items_are_retried(store, fakes, tmp_path, make_brief):
+    run_id = store.create_run("cli", [(make_brief(product_id), "template_01") for product_id in "ABC"])
+    fakes.failing = {"B"}
+
+    first = _run(store, run_id, tmp_path)
+
+    assert {item.brief.product_id: item.failed_stage for item in first} == {"A": None, "B": "copy", "C": None}
+    assert _statuses(store, run_id) == {"A": DONE, "B": FAILED, "C": DONE}
+    assert [record["product_id"] for record in pending_items(store.items(run_id))] == ["B"]
+
+    fakes.failing = set()
+    fakes.copied.clear()
+    retried = _run(store, run_id, tmp_path)
+
+    assert [item.brief.product_id for item in retried] == ["B"]
+    assert fakes.copied == ["B"]
+    assert _statuses(store, run_id) == {"A": DONE, "B": DONE, "C": DONE}
+    assert all(record["error"] is None for record in store.items(run_id))
+
+
+def test_render_failure_keeps_checked_copy(store, fakes, tmp_path, make_brief):
+    template = get_template("template_01")
+    run_id = store.create_run("cli", [(make_brief("A"), template.template_id)])
+    item = OnepagerItem(0, make_brief("A"), template, tmp_path / "A.pdf")
+    item.copy = CopySlots(title="Checked A", intro="Intro")
+    store.record_stage(run_id, item, "copy")
+    store.record_stage(run_id, item, "qc")
+    item.error, item.failed_stage = "render crashed", "render"
+    store.record_stage(run_id, item, "render")
+
+    restored = restore_item(store.items(run_id)[0], template)
+    assert restored.checked and restored.copy.title == "Checked A"
+
+    _run(store, run_id, tmp_path)
+
+    assert fakes.copied == [] and fakes.fitted == []
+    assert _statuses(store, run_id) == {"A": DONE}
+
+
+def test_done_item_without_pdf_is_pending(store, fakes, tmp_path, make_brief):
+    template = get_template("template_01")
+    run_id = store.create_run("cli", [(make_brief("A"), template.template_id)])
+    _run(store, run_id, tmp_path)
+    assert pending_items(store.items(run_id)) == []
+
+    (tmp_path / "A.pdf").unlink()
+
+    assert [record["product_id"] for record in pending_items(store.items(run_id))] == ["A"]
+
+
+def test_stream_into_run_records_items_as_they_arrive(store, make_brief):
+    run_id = store.create_run("api")
+    batches = []
+
+    async def _consume():
+        items = ((make_brief(str(index)), "template_01") for index in range(25))
+        recorded = stream_into_run(store, run_id, items, batch_size=10, on_recorded=batches.append)
+        return [record["idx"] async for record in recorded]
+
+    assert asyncio.run(_consume()) == list(range(25))
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert store.get_run(run_id)["total"] == 25
+    assert [record["idx"] for record in store.iter_items(run_id, page_size=7)] == list(range(25))
+
+
+def test_stream_into_run_records_items_read_before_a_read_error(store, make_brief):
+    run_id = store.create_run("api")
+
+    def _items():
+        for index in range(13):
+            yield make_brief(str(index)), "template_01"
+        raise ValueError("bad row")
+
+    async def _consume():
+        return [record["idx"] async for record in stream_into_run(store, run_id, _items(), batch_size=10)]
+
+    with pytest.raises(ValueError, match="bad row"):
+        asyncio.run(_consume())
+    assert store.get_run(run_id)["total"] == 13
+
+
+def test_stream_into_run_raises_write_errors_once(store, make_brief, monkeypatch):
+    run_id = store.create_run("api")
+    writes = []
+
+    def _failing_add_items(run_id, items, start=0):
+        writes.append(start)
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(store, "add_items", _failing_add_items)
+
+    async def _consume():
+        items = ((make_brief(str(index)), "template_01") for index in range(25))
+        return [record async for record in stream_into_run(store, run_id, items, batch_size=10)]
+
+    with pytest.raises(RuntimeError, match="disk full"):
+        asyncio.run(_consume())
+    assert writes == [0]
@@ -0,0 +1,132 @@
+"""Single-flight coalescing: concurrent identical calls share one in-flight result."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.singleflight import SingleFlight
+
+
+class Calls:
+    """Async function that records its calls and can be held open."""
+
+    def __init__(self, delay: float = 0.05, error: Exception = None):
+        self.delay = delay
+        self.error = error
+        self.count = 0
+
+    async def __call__(self, value):
+        self.count += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return value * 2
+
+
+def test_concurrent_async_calls_share_one_result():
+    flight = SingleFlight()
+    calls = Calls()
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("key", calls, 21) for _ in range(5)))
+
+    assert asyncio.run(main()) == [42] * 5
+    assert calls.count == 1
+    assert flight.stats() == {"calls": 1, "saved": 4, "in_flight": 0}
+
+
+def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+    calls = Calls()
+
+    async def main():
+        return await asyncio.gather(flight.ado("a", calls, 1), flight.ado("b", calls, 2))
+
+    assert asyncio.run(main()) == [2, 4]
+    assert calls.count == 2
+
+
+def test_nothing_is_cached_after_the_leader_finishes():
+    flight = SingleFlight()
+    calls = Calls(delay=0)
+
+    async def main():
+        await flight.ado("key", calls, 1)
+        await flight.ado("key", calls, 1)
+
+    asyncio.run(main())
+    assert calls.count == 2
+
+
+def test_call_errors_reach_every_follower():
+    flight = SingleFlight()
+    calls = Calls(error=ValueError("bad answer"))
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("key", calls, 1) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [type(result) for result in results] == [ValueError] * 3
+    assert calls.count == 1
+
+
+def test_cancelled_leader_hands_the_call_to_a_follower():
+    flight = SingleFlight()
+    calls = Calls(delay=0.1)
+
+    async def main():
+        leader = asyncio.create_task(flight.ado("key", calls, 5))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.create_task(flight.ado("key", calls, 5)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(main()) == [10, 10, 10]
+    assert calls.count == 2
+    assert flight.stats() == {"calls": 2, "saved": 2, "in_flight": 0}
+
+
+def test_cancelled_follower_does_not_cancel_the_leader():
+    flight = SingleFlight()
+    calls = Calls(delay=0.05)
+
+    async def main():
+        leader = asyncio.create_task(flight.ado("key", calls, 3))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.ado("key", calls, 3))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        return await leader
+
+    assert asyncio.run(main()) == 6
+    assert calls.count == 1
+
+
+def test_threads_share_one_call():
+    flight = SingleFlight()
+    count = 0
+    started = threading.Event()
+
+    def work():
+        nonlocal count
+        count += 1
+        started.set()
+        time.sleep(0.1)
+        return "done"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", work)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("key", work))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert results == ["done"] * 4
+    assert count == 1
@@ -0,0 +1,81 @@
+"""Fitting generated copy into slot limits, and the output caps sent for it."""
+import pytest
+
+from config.settings import settings
+from core.copy_generator import _slot_generation_options
+from core.llm_providers import GenerationOptions, LLMProvider
+from core.text_fitter import clean_text, fit_text
+
+
+class Provider(LLMProvider):
+    name = "test"
+
+    def generate(self, prompt, options):
+        return ""
+
+    async def agenerate(self, prompt, options):
+        return ""
+
+
+def test_clean_text_strips_markdown_quotes_and_whitespace():
+    assert clean_text('  **"Fast   Sync"**\n') == "Fast Sync"
+    assert clean_text("'Quoted'") == "Quoted"
+
+
+def test_text_within_the_limit_is_kept():
+    assert fit_text("Fast Sync", 20) == "Fast Sync"
+
+
+def test_cut_prefers_the_last_complete_sentence():
+    text = "Sync files across devices. Share folders with your whole team in one click."
+
+    assert fit_text(text, 40) == "Sync files across devices."
+
+
+def test_short_sentence_is_not_preferred_over_most_of_the_limit():
+    text = "Sync. Files across every device your team uses, instantly."
+
+    assert fit_text(text, 40) == "Sync. Files across every device"
+
+
+def test_cut_falls_back_to_a_word_boundary():
+    assert fit_text("Enterprise Cloud Security Platform for Modern Teams", 40) == "Enterprise Cloud Security Platform"
+
+
+def test_cut_never_ends_on_a_connective_or_punctuation():
+    assert fit_text("Backups, restores and audits for every team", 22) == "Backups, restores"
+    assert fit_text("Built for the modern team", 13) == "Built"
+
+
+def test_single_over_long_word_is_hard_cut():
+    assert fit_text("Supercalifragilistic", 10) == "Supercalif"
+
+
+@pytest.mark.parametrize("limit", range(5, 60, 3))
+def test_result_never_exceeds_the_limit(limit):
+    assert len(fit_text("Sync files across devices. Share folders with your whole team.", limit)) <= limit
+
+
+def test_slot_options_derive_the_cap_and_stop_sequences(monkeypatch):
+    monkeypatch.setattr(settings, "slot_output_limits_enabled", True)
+
+    options = _slot_generation_options("title", 35)
+
+    assert options.max_output_tokens == int(35 / settings.chars_per_token * 1.2) + 1 + settings.llm_output_token_headroom
+    assert options.stop_sequences == ["\n"]
+
+
+def test_regular_models_get_the_answer_budget():
+    assert Provider("gpt-4o").output_token_limit(GenerationOptions(max_output_tokens=40)) == 40
+
+
+def test_thinking_models_get_a_reasoning_allowance_on_top(monkeypatch):
+    monkeypatch.setattr(settings, "llm_thinking_token_budget", 500)
+
+    for model in ("gemini-2.5-flash", "gemini-2.5-pro", "models/gemini-2.5-flash", "o3-mini"):
+        assert Provider(model).output_token_limit(GenerationOptions(max_output_tokens=40)) == 540
+
+
+def test_no_cap_without_a_budget():
+    assert Provider("gemini-2.5-flash").output_token_limit(GenerationOptions()) is None
+    assert Provider("gpt-4o").output_token_limit(GenerationOptions()) is None
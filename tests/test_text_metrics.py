@@ -0,0 +1,147 @@
+"""Font-metric fit estimation, QC of predicted overflow, escalation and last-resort trimming."""
+import pytest
+
+import core.copy_generator as copy_generator
+import core.text_metrics as text_metrics
+from config.settings import settings
+from core.copy_generator import CopySlots, _escalation_plan, generate_copy_checked
+from core.qc_engine import check_quality
+from core.text_metrics import FontMetrics, SlotBox, box_char_limit, estimate_fit, fit_to_box, wrap_lines
+
+# 12pt = 16px: most lowercase letters are 8px wide with the fallback metrics
+BOX = SlotBox(width=200, font_size=12, max_lines=2)
+LONG_TITLE = "Enterprise Cloud Security Platform for Modern Teams and Growing Businesses"
+
+
+@pytest.fixture(autouse=True)
+def fallback_metrics(monkeypatch):
+    """Estimate with the built-in advance widths, whatever fonts are installed."""
+    metrics = FontMetrics()
+    monkeypatch.setattr(text_metrics, "get_font_metrics", lambda font_family="": metrics)
+    monkeypatch.setattr(settings, "text_fit_enabled", True)
+    return metrics
+
+
+class Template:
+    """Just enough of a template for QC: one boxed title and an unboxed intro."""
+    template_id = "test"
+
+    def get_slot_limits(self):
+        return {"title": 120, "intro": 200}
+
+    def get_text_boxes(self):
+        return {"title": BOX}
+
+
+def test_short_text_fits():
+    estimate = estimate_fit("Fast Sync", BOX)
+
+    assert estimate.fits and estimate.lines == 1 and estimate.max_lines == 2
+    assert estimate.height == pytest.approx(16 * 1.5)
+
+
+def test_text_needing_more_lines_than_the_box_overflows():
+    estimate = estimate_fit(LONG_TITLE, BOX)
+
+    assert not estimate.fits
+    assert estimate.lines > 2
+    assert all(len(line) <= 30 for line in wrap_lines(LONG_TITLE, BOX))
+
+
+def test_columns_multiply_the_line_capacity():
+    assert estimate_fit(LONG_TITLE, BOX.model_copy(update={"columns": 2})).max_lines == 4
+
+
+def test_uppercase_and_bold_take_more_room():
+    text = "sync your files today"
+    plain = estimate_fit(text, BOX).widest_word
+
+    assert estimate_fit(text, BOX.model_copy(update={"uppercase": True})).widest_word > plain
+    assert estimate_fit(text, BOX.model_copy(update={"bold": True})).widest_word > plain
+
+
+def test_word_wider_than_the_box_overflows():
+    estimate = estimate_fit("Supercalifragilisticexpialidocious", BOX)
+
+    assert estimate.lines == 1
+    assert not estimate.fits and estimate.widest_word > BOX.width
+
+
+def test_box_char_limit_is_predicted_to_fit():
+    limit = box_char_limit(LONG_TITLE, BOX)
+
+    assert 20 < limit < len(LONG_TITLE)
+    assert estimate_fit(LONG_TITLE[:limit].rsplit(" ", 1)[0], BOX).fits
+
+
+def test_fit_to_box_keeps_text_that_fits():
+    assert fit_to_box("Fast Sync", BOX) == "Fast Sync"
+
+
+def test_fit_to_box_keeps_whole_sentences():
+    text = "Sync every file. Share folders with your whole team in a single click."
+
+    assert fit_to_box(text, BOX) == "Sync every file."
+
+
+def test_fit_to_box_does_not_leave_a_dangling_word():
+    fitted = fit_to_box(LONG_TITLE, BOX)
+
+    assert estimate_fit(fitted, BOX).fits
+    assert fitted.split()[-1].lower() not in {"for", "and", "the"}
+    assert LONG_TITLE.startswith(fitted)
+
+
+def test_predicted_overflow_is_a_qc_failure():
+    result = check_quality(Template(), CopySlots(title=LONG_TITLE, intro="Intro"))
+
+    assert result.overall_status == "fail"
+    assert "predicted_overflow_title" in [check.check_name for check in result.checks if check.status == "fail"]
+
+
+def test_escalation_asks_for_what_the_box_holds(monkeypatch):
+    monkeypatch.setattr(settings, "qc_escalation_enabled", True)
+    copy = CopySlots(title=LONG_TITLE, intro="Intro")
+
+    plan = _escalation_plan(Template(), copy, check_quality(Template(), copy))
+
+    assert plan == {"title": box_char_limit(LONG_TITLE, BOX)}
+    assert plan["title"] < len(LONG_TITLE) < Template().get_slot_limits()["title"]
+
+
+@pytest.fixture
+def generation(monkeypatch):
+    """generate_copy returns LONG_TITLE; escalation answers with escalated_title."""
+    calls = {"plans": [], "escalated_title": "Cloud Security for Teams"}
+    monkeypatch.setattr(settings, "qc_escalation_enabled", True)
+    monkeypatch.setattr(copy_generator, "get_copy_cache", lambda: None)
+    monkeypatch.setattr(
+        copy_generator, "generate_copy",
+        lambda brief, template_slots, template_id=None: CopySlots(title=LONG_TITLE, intro="Intro"),
+    )
+
+    def _generate_with_llm(brief, template_slots, template_id=None, tier=None):
+        calls["plans"].append(dict(template_slots))
+        return {"title": calls["escalated_title"]}
+
+    monkeypatch.setattr(copy_generator, "_generate_with_llm", _generate_with_llm)
+    return calls
+
+
+def test_overflowing_copy_is_regenerated_before_anything_is_trimmed(generation, make_brief):
+    copy, result = generate_copy_checked(make_brief("A"), Template())
+
+    assert generation["plans"] == [{"title": box_char_limit(LONG_TITLE, BOX)}]
+    assert copy.title == "Cloud Security for Teams"
+    assert result.fixes_applied == []
+    assert not [check for check in result.checks if check.check_name == "predicted_overflow_title"]
+
+
+def test_copy_still_overflowing_after_escalation_is_trimmed_as_a_last_resort(generation, make_brief):
+    generation["escalated_title"] = LONG_TITLE
+
+    copy, result = generate_copy_checked(make_brief("A"), Template())
+
+    assert estimate_fit(copy.title, BOX).fits and LONG_TITLE.startswith(copy.title)
+    assert result.fixes_applied == ["Trimmed title to fit its box"]
+    assert not [check for check in result.checks if check.check_name == "predicted_overflow_title"]